@@ -0,0 +1,117 @@
+# backend/batcher.py
+# 동시 요청을 짧은 시간 창(window) 동안 모아 predict_proba 한 번으로 처리하는 마이크로 배처
+
+import asyncio
+import time
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    submit()으로 들어온 피처 행들을 최대 window_ms 동안(또는 max_batch개가 찰 때까지) 모아
+    score_fn((n, 5)) -> (tag, (n, k)) 를 스레드풀에서 한 번 호출하고, 각 호출자에게 (tag, 자기 행 결과)를 돌려준다.
+    tag는 배치 전체를 계산한 주체(모델 번들 등) — 호출자가 결과를 그 주체 기준으로 캐시할 수 있도록.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[np.ndarray], Tuple[Any, np.ndarray]],
+        window_ms: float = 2.0,
+        max_batch: int = 64,
+    ):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # 지표
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+
+    # ---------------- 수명주기 ----------------
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------------- 요청 ----------------
+    async def submit(self, row: np.ndarray) -> Tuple[Any, np.ndarray]:
+        """피처 한 행 (5,) -> (tag, 결과 한 행 (k,))"""
+        if self._task is None:
+            raise RuntimeError("MicroBatcher not started")
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, fut))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await fut
+
+    # ---------------- 처리 루프 ----------------
+    async def _collect(self):
+        items = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(items) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            # 대기 중 취소된 요청(클라이언트 끊김)은 제외
+            items = [(row, fut) for row, fut in items if not fut.done()]
+            if not items:
+                continue
+
+            X = np.stack([row for row, _ in items])
+            t0 = time.perf_counter()
+            try:
+                tag, out = await loop.run_in_executor(None, self.score_fn, X)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            finally:
+                self.busy_seconds += time.perf_counter() - t0
+
+            self.batches += 1
+            self.rows += len(items)
+            self.max_batch_seen = max(self.max_batch_seen, len(items))
+            for (_, fut), res in zip(items, out):
+                if not fut.done():
+                    fut.set_result((tag, res))
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": (self.rows / self.batches) if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "busy_seconds": round(self.busy_seconds, 6),
+        }
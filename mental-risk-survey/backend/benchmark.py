@@ -0,0 +1,255 @@
+# backend/benchmark.py
+# /predict_risk 부하/지연 벤치마크
+#  - inprocess: ASGI 앱을 같은 프로세스에서 직접 호출 (네트워크 없음, 앱/모델 비용만)
+#  - uvicorn:   로컬 uvicorn 서버를 띄워 HTTP로 호출 (직렬화/소켓 비용 포함)
+# 시나리오: single(매번 다른 입력, 캐시 미적중) / cached(같은 입력 반복) / batch(/predict_risk/batch)
+#          / single_async, batch_async(전용 스레드풀 엔드포인트, 503 거절은 errors와 rejected에 집계)
+#          / batch_u8(같은 배치를 application/x-risk-u8 바이너리 본문으로)
+# 결과(p50/p95/p99, RPS)는 JSON으로 저장해 모델/서빙 변경 전후를 --compare로 비교한다.
+#
+#   python -m backend.benchmark --target inprocess --requests 2000 --concurrency 16
+#   RISK_SERVING_MODE=numpy python -m backend.benchmark --target uvicorn --compare <이전 결과>.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = PROJECT_ROOT / "benchmarks"
+SCENARIOS = ("single", "cached", "batch", "single_async", "batch_async", "batch_u8")
+FIELDS = ("phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes")
+U8_HEADERS = {"content-type": "application/x-risk-u8"}
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+# ---------------- 입력 ----------------
+def make_payloads(n: int, seed: int = 0):
+    """입력 공간에서 겹치지 않게 n개 뽑은 RiskInput dict 목록 (single 시나리오가 캐시에 걸리지 않도록)"""
+    from ml.risk_table import feature_grid
+
+    grid = feature_grid()
+    rng = np.random.default_rng(seed)
+    rows = grid[rng.choice(len(grid), size=min(n, len(grid)), replace=False)]
+    return [
+        {**{k: int(v) for k, v in zip(FIELDS[:4], row[:4])}, "asq_any_yes": bool(row[4])}
+        for row in rows
+    ]
+
+
+def summarize(latencies, wall_seconds: float, errors: int, rows_per_request: int = 1, rejected: int = 0) -> dict:
+    lat_ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    n = len(lat_ms)
+    p50, p95, p99 = np.percentile(lat_ms, [50, 95, 99]) if n else (None, None, None)
+    return {
+        "requests": n,
+        "errors": errors,
+        "rejected": rejected,
+        "wall_seconds": round(wall_seconds, 4),
+        "rps": round(n / wall_seconds, 1) if wall_seconds > 0 else None,
+        "rows_per_second": round(n * rows_per_request / wall_seconds, 1) if wall_seconds > 0 else None,
+        "mean_ms": round(float(lat_ms.mean()), 4) if n else None,
+        "p50_ms": round(float(p50), 4) if n else None,
+        "p95_ms": round(float(p95), 4) if n else None,
+        "p99_ms": round(float(p99), 4) if n else None,
+        "max_ms": round(float(lat_ms.max()), 4) if n else None,
+    }
+
+
+# ---------------- 부하 ----------------
+async def run_load(client, method: str, url: str, bodies, n_requests: int, concurrency: int):
+    """동시 워커 concurrency개가 요청 n_requests개를 나눠 보냄 -> (지연 목록, 벽시계 시간, 오류 수, 503 수)"""
+    latencies = []
+    errors = 0
+    rejected = 0
+    next_i = 0
+
+    async def worker():
+        nonlocal next_i, errors, rejected
+        while next_i < n_requests:
+            i = next_i
+            next_i += 1
+            body = bodies[i % len(bodies)]
+            t0 = time.perf_counter()
+            try:
+                if isinstance(body, bytes):
+                    r = await client.request(method, url, content=body, headers=U8_HEADERS)
+                else:
+                    r = await client.request(method, url, json=body)
+                ok = r.status_code == 200
+                rejected += r.status_code == 503
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - t0, errors, rejected
+
+
+async def run_scenarios(client, args) -> dict:
+    payloads = make_payloads(args.requests + args.warmup, seed=args.seed)
+    batch_body = [payloads[i % len(payloads)] for i in range(args.batch_size)]
+    plans = {
+        "single": ("POST", "/predict_risk", payloads[args.warmup:] or payloads),
+        "cached": ("POST", "/predict_risk", payloads[:1]),
+        "batch": ("POST", "/predict_risk/batch", [batch_body]),
+        "single_async": ("POST", "/predict_risk/async", payloads[args.warmup:] or payloads),
+        "batch_async": ("POST", "/predict_risk/batch/async", [batch_body]),
+        "batch_u8": ("POST", "/predict_risk/batch", [
+            np.array([[int(p[k]) for k in FIELDS] for p in batch_body], dtype=np.uint8).tobytes()
+        ]),
+    }
+
+    # 워밍업 (첫 요청 지연/캐시 채움은 측정에서 제외)
+    await run_load(client, "POST", "/predict_risk", payloads[:max(args.warmup, 1)], max(args.warmup, 1), 1)
+
+    results = {}
+    for name in args.scenarios:
+        method, url, bodies = plans[name]
+        is_batch = name.startswith("batch")
+        n = args.batch_requests if is_batch else args.requests
+        latencies, wall, errors, rejected = await run_load(client, method, url, bodies, n, args.concurrency)
+        results[name] = summarize(latencies, wall, errors, args.batch_size if is_batch else 1, rejected)
+        results[name]["concurrency"] = args.concurrency
+        if is_batch:
+            results[name]["batch_size"] = args.batch_size
+        print(f"[bench] {name:>6}: {results[name]}")
+
+    info = (await client.get("/model_info")).json()
+    return {"scenarios": results, "model_info": info}
+
+
+# ---------------- 대상 ----------------
+async def bench_inprocess(args) -> dict:
+    import httpx
+    from backend.main import app
+
+    # ASGITransport는 startup/shutdown을 부르지 않으므로 lifespan을 직접 돌림
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_scenarios(client, args)
+
+
+async def bench_uvicorn(args) -> dict:
+    import httpx
+
+    cmd = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            deadline = time.perf_counter() + args.startup_timeout
+            while True:
+                try:
+                    if (await client.get("/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if proc.poll() is not None or time.perf_counter() > deadline:
+                    raise RuntimeError(f"uvicorn did not become ready (exit={proc.poll()})")
+                await asyncio.sleep(0.1)
+            return await run_scenarios(client, args)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ---------------- 결과 ----------------
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: dict, baseline: dict):
+    """시나리오별 p50/p95/p99/RPS 변화율 출력 (양수 = 지연 증가 / 처리량 증가)"""
+    print(f"[bench] compare vs {baseline.get('meta', {}).get('model_fingerprint')}")
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        parts = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            if cur.get(key) and base.get(key):
+                parts.append(f"{key} {base[key]} -> {cur[key]} ({(cur[key] / base[key] - 1) * 100:+.1f}%)")
+        print(f"[bench] {name:>6}: " + ", ".join(parts))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Latency/throughput benchmark for /predict_risk")
+    p.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    p.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--batch-requests", type=int, default=200)
+    p.add_argument("--batch-size", type=int, default=256)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--warmup", type=int, default=50)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--startup-timeout", type=float, default=60.0)
+    p.add_argument("--out", type=Path, default=None, help="결과 JSON 경로 (기본: benchmarks/<시각>-<target>.json)")
+    p.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = p.parse_args(argv)
+
+    # cached 시나리오가 실제 캐시 경로를 타도록 (이미 지정했으면 그대로)
+    os.environ.setdefault("RISK_CACHE_SIZE", "10000")
+
+    runner = bench_inprocess if args.target == "inprocess" else bench_uvicorn
+    out = asyncio.run(runner(args))
+
+    model = out["model_info"].get("model") or {}
+    out["meta"] = {
+        "target": args.target,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "serving_mode": out["model_info"].get("serving_mode"),
+        "model_version": model.get("version"),
+        "model_fingerprint": model.get("fingerprint"),
+        "workers": args.workers if args.target == "uvicorn" else 1,
+        "env": {k: v for k, v in os.environ.items() if k.startswith("RISK_")},
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+    path = args.out or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{args.target}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(out, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[bench] saved -> {path}")
+
+    if args.compare is not None:
+        compare(out, json.loads(args.compare.read_text(encoding="utf-8")))
+    return out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# backend/binary_codec.py
+# 예측 엔드포인트의 JSON 외 바이너리 형식 (내부 대량 호출용, Pydantic 파싱/검증을 거치지 않음)
+#
+#   요청 Content-Type                     본문                                  응답
+#   application/x-risk-u8                 행마다 uint8 5개 [PHQ, GAD, K10,      application/x-risk-f32
+#                                         item9, ASQ] (단건 5바이트, 배치 n*5)   행마다 little-endian float32 3개 (% 단위)
+#   application/msgpack (x-msgpack)       단건 [5개] 또는 {필드: 값},            application/msgpack
+#                                         배치 그 목록                           JSON 응답과 같은 구조
+#
+# u8 본문은 np.frombuffer로 복사 없이 (n, 5) 뷰로 읽음. msgpack은 선택 의존성 (없으면 415).
+# 같은 경로의 JSON 요청은 원래 엔드포인트(Pydantic)로 그대로 감.
+
+import time
+from typing import Awaitable, Callable
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+from backend.metrics import SERIALIZATION_SECONDS
+
+U8_TYPE = "application/x-risk-u8"
+F32_TYPE = "application/x-risk-f32"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+BINARY_TYPES = (U8_TYPE,) + MSGPACK_TYPES
+
+FIELDS = ("phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes")
+OUTPUT_FIELDS = ("suicidal_signal_pct", "depression_risk_pct", "stress_risk_pct")
+N_FEATURES = len(FIELDS)
+
+# (n, 5) 피처 -> (n, 3) 퍼센트
+ScoreFn = Callable[[np.ndarray], Awaitable[np.ndarray]]
+
+
+def media_type(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=415, detail="msgpack is not installed on this server")
+    return msgpack
+
+
+# ---------------- 디코딩 ----------------
+def check_asq(X: np.ndarray) -> np.ndarray:
+    if X.size and not np.all(X[:, 4] <= 1):
+        raise HTTPException(status_code=422, detail="asq_any_yes must be 0 or 1")
+    return X
+
+
+def decode_u8(body: bytes, single: bool) -> np.ndarray:
+    """uint8 본문 -> (n, 5) 읽기 전용 뷰 (복사 없음)"""
+    if len(body) % N_FEATURES or (single and len(body) != N_FEATURES):
+        expected = f"{N_FEATURES} bytes" if single else f"a multiple of {N_FEATURES} bytes"
+        raise HTTPException(status_code=400, detail=f"{U8_TYPE} body must be {expected}, got {len(body)}")
+    return check_asq(np.frombuffer(body, dtype=np.uint8).reshape(-1, N_FEATURES))
+
+
+def _msgpack_row(row) -> list:
+    if isinstance(row, dict):
+        try:
+            row = [row[k] for k in FIELDS]
+        except KeyError as e:
+            raise HTTPException(status_code=422, detail=f"missing field: {e.args[0]}")
+    if not isinstance(row, (list, tuple)) or len(row) != N_FEATURES:
+        raise HTTPException(status_code=422, detail=f"each row must have {N_FEATURES} values")
+    if not all(isinstance(v, (int, bool)) for v in row):
+        raise HTTPException(status_code=422, detail="feature values must be integers")
+    return row
+
+
+def decode_msgpack(body: bytes, single: bool) -> np.ndarray:
+    msgpack = _msgpack()
+    try:
+        obj = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+        raise HTTPException(status_code=400, detail=f"invalid msgpack body: {e}")
+    if single:
+        rows = [_msgpack_row(obj)]
+    elif isinstance(obj, (list, tuple)):
+        rows = [_msgpack_row(r) for r in obj]
+    else:
+        raise HTTPException(status_code=422, detail="batch body must be a list of rows")
+    return check_asq(np.array(rows, dtype=np.int64).reshape(-1, N_FEATURES))
+
+
+# ---------------- 인코딩 ----------------
+def encode(pct: np.ndarray, ctype: str, single: bool) -> Response:
+    """(n, 3) 퍼센트 -> 요청 형식에 맞는 응답"""
+    if ctype == U8_TYPE:
+        return Response(np.ascontiguousarray(pct, dtype="<f4").tobytes(), media_type=F32_TYPE)
+
+    cols = pct.T.tolist()
+    if single:
+        obj = {k: col[0] for k, col in zip(OUTPUT_FIELDS, cols)}
+    else:
+        obj = dict(zip(OUTPUT_FIELDS, cols))
+    return Response(_msgpack().packb(obj), media_type=MSGPACK_TYPES[0])
+
+
+# ---------------- 라우트 ----------------
+def binary_variant(kind: str, score: ScoreFn):
+    """
+    엔드포인트 데코레이터 (@app.post 아래에 둘 것): 같은 경로로 들어온 바이너리 요청은
+    본문을 (n, 5) 피처로 바로 풀어 score에 넘김. kind: "single" | "batch"
+    """
+    def deco(endpoint):
+        endpoint.binary_variant = (kind, score)
+        return endpoint
+    return deco
+
+
+class BinaryRoute(APIRoute):
+    """Content-Type이 BINARY_TYPES면 binary_variant 경로로, 아니면 원래 (JSON) 핸들러로"""
+
+    def get_route_handler(self):
+        json_handler = super().get_route_handler()
+        spec = getattr(self.endpoint, "binary_variant", None)
+        if spec is None:
+            return json_handler
+        kind, score = spec
+        single = kind == "single"
+
+        async def handler(request: Request) -> Response:
+            ctype = media_type(request)
+            if ctype not in BINARY_TYPES:
+                return await json_handler(request)
+            body = await request.body()
+            X = decode_u8(body, single) if ctype == U8_TYPE else decode_msgpack(body, single)
+            pct = await score(X)
+            t0 = time.perf_counter()
+            response = encode(pct, ctype, single)
+            fmt = "u8" if ctype == U8_TYPE else "msgpack"
+            SERIALIZATION_SECONDS.observe(time.perf_counter() - t0, endpoint=f"{kind}_{fmt}")
+            return response
+
+        return handler
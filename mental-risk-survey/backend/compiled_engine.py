@@ -0,0 +1,178 @@
+# backend/compiled_engine.py
+# sklearn 없이 numpy만으로 도는 추론 엔진
+#  - ml/train_risk_models.py의 export_compiled_models()가 만든 models/compiled/ 를 읽음
+#  - cal_logreg: 표준화를 계수에 접어 넣은 (F, d) 가중치 -> 내적 -> sigmoid 캘리브레이션 -> fold 평균
+#  - cal_rf: 모든 fold의 트리를 연속 노드 배열로 펼쳐 (행 x 트리) 단위로 한 레벨씩 동시에 내려감
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+COMPILED_FORMAT = 1
+
+
+class LinearCalibrated:
+    """fold별 z = X @ W[f] + c[f], p = 1 / (1 + exp(a[f]*z + b[f])), fold 평균"""
+
+    kind = "linear"
+
+    def __init__(self, W, c, a, b):
+        self.W = np.asarray(W, dtype=np.float64)  # (F, d)
+        self.c = np.asarray(c, dtype=np.float64)  # (F,)
+        self.a = np.asarray(a, dtype=np.float64)  # (F,)
+        self.b = np.asarray(b, dtype=np.float64)  # (F,)
+
+    @property
+    def n_folds(self) -> int:
+        return len(self.c)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        z = X @ self.W.T + self.c
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(self.a * z + self.b))
+        return p.mean(axis=1)
+
+
+class ForestCalibrated:
+    """
+    fold별 전처리 (X[:, src] * scale + offset -> float32, sklearn 트리와 동일한 비교 정밀도) 후
+    모든 트리를 배열 순회로 동시에 평가, 트리 평균 -> sigmoid 캘리브레이션 -> fold 평균.
+    리프는 left/right가 자기 자신을 가리키므로 depth번 반복하면 모든 경로가 리프에 도달한다.
+    """
+
+    kind = "forest"
+
+    def __init__(self, src, scale, offset, feature, threshold, left, right, value,
+                 roots, tree_fold, depth, a, b):
+        # 정수 배열은 저장된 dtype 그대로 사용 (변환 복사를 하면 mmap 공유가 깨짐)
+        self.src = np.asarray(src)                             # (d,)
+        self.scale = np.asarray(scale, dtype=np.float64)       # (F, d)
+        self.offset = np.asarray(offset, dtype=np.float64)     # (F, d)
+        self.feature = np.asarray(feature)                     # (N,) 모든 노드
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left)
+        self.right = np.asarray(right)
+        self.value = np.asarray(value, dtype=np.float64)       # 리프의 양성 클래스 비율
+        self.roots = np.asarray(roots)                         # (T,) 트리별 루트 노드
+        self.tree_fold = np.asarray(tree_fold)                 # (T,) 트리가 속한 fold
+        self.depth = int(depth)
+        self.a = np.asarray(a, dtype=np.float64)               # (F,)
+        self.b = np.asarray(b, dtype=np.float64)               # (F,)
+
+        # (T, F) 트리 -> fold 평균 행렬
+        onehot = (self.tree_fold[:, None] == np.arange(len(self.a))[None, :]).astype(np.float64)
+        self._tree_avg = onehot / onehot.sum(axis=0, keepdims=True)
+
+    @property
+    def n_folds(self) -> int:
+        return len(self.a)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n = len(X)
+        Xt = (X[:, self.src][None, :, :] * self.scale[:, None, :]
+              + self.offset[:, None, :]).astype(np.float32)  # (F, n, d)
+
+        rows = np.arange(n)[:, None]
+        fold = self.tree_fold[None, :]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        for _ in range(self.depth):
+            x = Xt[fold, rows, self.feature[node]]
+            node = np.where(x <= self.threshold[node], self.left[node], self.right[node])
+
+        # 트리 평균(fold별) -> sigmoid 캘리브레이션 -> fold 평균
+        score = self.value[node] @ self._tree_avg  # (n, F)
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(self.a * score + self.b))
+        return p.mean(axis=1)
+
+    def predict_proba(self, X: np.ndarray, chunk_cells: int = 1 << 20) -> np.ndarray:
+        step = max(1, chunk_cells // max(1, self.n_trees))
+        return np.concatenate(
+            [self._predict_chunk(X[i:i + step]) for i in range(0, len(X), step)]
+        ) if len(X) else np.empty(0)
+
+
+class CompiledRiskModel:
+    """predict_proba(X) -> (n, L) 라벨별 양성 확률. 모든 라벨이 linear면 행렬곱 한 번으로 처리"""
+
+    def __init__(self, labels, parts, feature_order=None, sources=None):
+        self.labels = tuple(labels)
+        self.parts = [parts[k] for k in self.labels]
+        self.feature_order = feature_order
+        self.sources = sources or {}  # 라벨 -> 컴파일에 쓴 joblib 모델의 sha256
+
+        # linear 라벨끼리는 fold를 이어 붙여 (F_total, d) 한 번에 계산
+        lin = [(j, p) for j, p in enumerate(self.parts) if p.kind == "linear"]
+        self._lin_labels = [j for j, _ in lin]
+        if lin:
+            self._W = np.concatenate([p.W for _, p in lin])
+            self._c = np.concatenate([p.c for _, p in lin])
+            self._a = np.concatenate([p.a for _, p in lin])
+            self._b = np.concatenate([p.b for _, p in lin])
+            owner = np.concatenate([np.full(p.n_folds, i) for i, (_, p) in enumerate(lin)])
+            self._avg = (owner[None, :] == np.arange(len(lin))[:, None]).astype(np.float64)
+            self._avg /= self._avg.sum(axis=1, keepdims=True)
+
+    @property
+    def n_folds(self) -> int:
+        return sum(p.n_folds for p in self.parts)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        out = np.empty((len(X), len(self.labels)))
+
+        if self._lin_labels:
+            z = X @ self._W.T + self._c
+            with np.errstate(over="ignore"):
+                p = 1.0 / (1.0 + np.exp(self._a * z + self._b))
+            out[:, self._lin_labels] = p @ self._avg.T
+        for j, part in enumerate(self.parts):
+            if j not in self._lin_labels:
+                out[:, j] = part.predict_proba(X)
+        return np.clip(out, 0.0, 1.0)
+
+    # ---------------- 저장/로드 ----------------
+    @classmethod
+    def load(cls, path: Path, mmap_mode: str = None) -> "CompiledRiskModel":
+        """mmap_mode="r"이면 .npy를 메모리 맵으로 열어 여러 워커가 같은 페이지를 공유"""
+        path = Path(path)
+        manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("format") != COMPILED_FORMAT:
+            raise ValueError(f"unsupported compiled format: {manifest.get('format')}")
+
+        parts = {}
+        for label, info in manifest["labels"].items():
+            arrays = {
+                name: np.load(path / f"{label}_{name}.npy", mmap_mode=mmap_mode)
+                for name in info["arrays"]
+            }
+            if info["kind"] == "linear":
+                parts[label] = LinearCalibrated(**arrays)
+            elif info["kind"] == "forest":
+                parts[label] = ForestCalibrated(**arrays)
+            else:
+                raise ValueError(f"[{label}] unknown compiled kind: {info['kind']}")
+        return cls(manifest["labels"].keys(), parts, manifest.get("feature_order"), manifest.get("sources"))
+
+
+def save_compiled(path: Path, labels: dict, feature_order=None, sources=None) -> Path:
+    """labels: {label: (kind, {name: ndarray})} -> path/manifest.json + path/{label}_{name}.npy
+    sources: {label: 컴파일에 쓴 joblib 모델의 sha256} (로드할 때 지금 모델과 비교)"""
+    path = Path(path)
+    path.mkdir(exist_ok=True, parents=True)
+    for old in path.glob("*.npy"):
+        old.unlink()
+    manifest = {"format": COMPILED_FORMAT, "feature_order": feature_order, "sources": sources or {}, "labels": {}}
+    for label, (kind, arrays) in labels.items():
+        for name, arr in arrays.items():
+            np.save(path / f"{label}_{name}.npy", np.asarray(arr, order="C"))
+        manifest["labels"][label] = {"kind": kind, "arrays": list(arrays)}
+    (path / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
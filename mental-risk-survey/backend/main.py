@@ -1,11 +1,22 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# 워커 콜드 스타트 측정용 (다른 임포트보다 먼저)
+_T_IMPORT_START = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import joblib
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, model_validator
+from typing import List, Optional, Tuple
 import numpy as np
 from pathlib import Path
 import traceback
+import hmac
+import threading
+import asyncio
 import sys
+import os
 
 app = FastAPI(
     title="Mental Risk Survey API (ML ver.)",
@@ -25,14 +36,52 @@ app.add_middleware(
 # ---------------- 경로/모델 경로 ----------------
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 MODELS_DIR = PROJECT_ROOT / "models"
-SUICIDAL_MODEL_PATH = MODELS_DIR / "suicidal_model.joblib"
-DEPRESSION_MODEL_PATH = MODELS_DIR / "depression_model.joblib"
-STRESS_MODEL_PATH = MODELS_DIR / "stress_model.joblib"
+
+# 서빙 모드: "model"(기본, predict_proba 직접 호출) | "table"(사전 계산 조회 테이블)
+#           | "fused"(세 모델을 합친 단일 아티팩트, 전처리 공유)
+#           | "numpy"(models/compiled/ 계수 배열, sklearn 임포트 없음)
+#           | "onnx"(models/risk_model.onnx 를 onnxruntime으로, sklearn 임포트 없음)
+SERVING_MODE = os.environ.get("RISK_SERVING_MODE", "model")
+# /predict_risk/batch 한 번에 받을 최대 행 수
+BATCH_MAX_ROWS = int(os.environ.get("RISK_BATCH_MAX_ROWS", "100000"))
+# 마이크로 배칭: 동시에 들어온 /predict_risk 요청을 window_ms 동안 모아 한 번에 예측
+MICROBATCH_ENABLED = os.environ.get("RISK_MICROBATCH", "0") == "1"
+MICROBATCH_WINDOW_MS = float(os.environ.get("RISK_MICROBATCH_WINDOW_MS", "2"))
+MICROBATCH_MAX = int(os.environ.get("RISK_MICROBATCH_MAX", "64"))
+# 모델 배열을 메모리 맵으로 로드 (fork된/여러 워커가 같은 파일 페이지를 공유)
+MMAP_MODELS = os.environ.get("RISK_MMAP", "0") == "1"
+# models/CURRENT 변경 감시 주기(초), 0이면 끔 — 바뀌면 새 버전을 백그라운드 로드 후 교체
+WATCH_SECONDS = float(os.environ.get("RISK_WATCH_SECONDS", "0"))
+# /admin/* 호출 시 X-Admin-Token 헤더로 확인할 값 (비어 있으면 /admin/*은 꺼짐 -> 404)
+ADMIN_TOKEN = os.environ.get("RISK_ADMIN_TOKEN", "")
+# /predict_risk 결과 캐시: 로컬 LRU 크기(0이면 끔), 공유 캐시 shared memory 이름(비우면 로컬만)
+CACHE_SIZE = int(os.environ.get("RISK_CACHE_SIZE", "0"))
+CACHE_SHARED_NAME = os.environ.get("RISK_CACHE_SHARED", "")
+# /predict_risk/async, /predict_risk/batch/async 전용 계산 스레드풀: 동시 계산 수, 대기열 한도, 거절 시 Retry-After(초)
+EXECUTOR_WORKERS = int(os.environ.get("RISK_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXECUTOR_QUEUE = int(os.environ.get("RISK_EXECUTOR_QUEUE", "64"))
+EXECUTOR_RETRY_AFTER = int(os.environ.get("RISK_EXECUTOR_RETRY_AFTER", "1"))
 
 # uvicorn --reload가 동작할 때도 패키지 임포트 경로가 꼬이지 않도록
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from ml.model_registry import current_version, version_dir, derived_dir, verify_version, list_versions
+from backend.model_bundle import ModelBundle
+from backend.batcher import MicroBatcher
+from backend.prediction_cache import PredictionCache
+from backend.offload import ScoringExecutor, ScoringPoolSaturated
+from backend.procinfo import process_memory
+from backend.binary_codec import BinaryRoute, binary_variant
+from backend.metrics import (
+    REGISTRY, REQUEST_SECONDS, VALIDATION_SECONDS, SERIALIZATION_SECONDS, PREDICTIONS_TOTAL, COMPONENT_STATS,
+)
+
+# 예측 엔드포인트는 같은 경로로 바이너리 요청(application/x-risk-u8, msgpack)도 받음 (backend/binary_codec.py)
+app.router.route_class = BinaryRoute
+
+_T_IMPORT_DONE = time.perf_counter()
+
 
 # ---------------- 입력/출력 스키마 ----------------
 class RiskInput(BaseModel):
@@ -42,6 +91,15 @@ class RiskInput(BaseModel):
     phq_item9: int
     asq_any_yes: bool
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _timed_validation(cls, data, handler):
+        t0 = time.perf_counter()
+        try:
+            return handler(data)
+        finally:
+            VALIDATION_SECONDS.observe(time.perf_counter() - t0)
+
 
 class RiskOutput(BaseModel):
     suicidal_signal_pct: float
@@ -49,18 +107,83 @@ class RiskOutput(BaseModel):
     stress_risk_pct: float
 
 
+class RiskBatchOutput(BaseModel):
+    suicidal_signal_pct: List[float]
+    depression_risk_pct: List[float]
+    stress_risk_pct: List[float]
+
+
 # ---------------- 모델 로딩 ----------------
-suicidal_model = None
-depression_model = None
-stress_model = None
+bundle = None  # 현재 서빙 중인 ModelBundle (교체는 참조 대입 한 번)
+batcher = None
+executor = None
+prediction_cache = None
+shared_grid = None  # prefork 부모(backend/serve.py)가 만들어 워커에 물려준 SharedGridCache
+watcher_task = None
+startup_timing = {}
+reload_history = []
+load_error = {}  # 마지막 로드 실패 (버전, 모드, 이유) — 성공하면 비움, /model_info로 노출
+_reload_lock = threading.Lock()
+
+
+def process_age_seconds():
+    """프로세스 시작 후 경과 시간 (리눅스 /proc 기준, 그 외 None)"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def resolve_model_version(version: str = None):
+    """(버전, 폴더): 레지스트리(models/CURRENT)가 있으면 그 버전, 없으면 models/ 바로 아래 파일"""
+    version = version or current_version(MODELS_DIR)
+    if version is None:
+        return None, MODELS_DIR
+    return version, version_dir(MODELS_DIR, version)
+
+
+def reload_models(version: str = None) -> ModelBundle:
+    """새 버전을 로드 -> 체크섬 확인 -> 워밍업 -> 전역 번들 교체 (진행 중 요청은 이전 번들로 끝남)"""
+    global bundle
+    with _reload_lock:
+        version, model_dir = resolve_model_version(version)
+        if version is not None:
+            verify_version(MODELS_DIR, version)
+
+        try:
+            # 게시된 버전 폴더는 검증 후 그대로 두고, 없는 파생 아티팩트는 models/derived/<버전>/에 만듦
+            new = ModelBundle(
+                model_dir, SERVING_MODE, version, MMAP_MODELS,
+                cache_dir=derived_dir(MODELS_DIR, version) if version is not None else None,
+            ).load()
+        except Exception as e:
+            load_error.clear()
+            load_error.update(version=version, mode=SERVING_MODE, error=f"{type(e).__name__}: {e}", at=time.time())
+            raise
+        load_error.clear()
+        warmup_seconds = new.warmup()
+
+        old, bundle = bundle, new
+        if prediction_cache is not None:
+            prediction_cache.invalidate()
+        reload_history.append({
+            "from": old.version if old is not None else None,
+            "to": new.version,
+            "load_seconds": round(new.load_seconds, 4),
+            "warmup_seconds": round(warmup_seconds, 4),
+            "at": time.time(),
+        })
+        del reload_history[:-20]
+        print(f"[reload] {reload_history[-1]}")
+        return new
 
 
 def load_models():
-    global suicidal_model, depression_model, stress_model
-    suicidal_model = joblib.load(SUICIDAL_MODEL_PATH)
-    depression_model = joblib.load(DEPRESSION_MODEL_PATH)
-    stress_model = joblib.load(STRESS_MODEL_PATH)
-    print("[models] loaded all.")
+    return reload_models()
 
 
 @app.on_event("startup")
@@ -68,22 +191,122 @@ def on_startup():
     # 모델 로드
     print(f"[startup] PROJECT_ROOT={PROJECT_ROOT}")
     print(f"[startup] MODELS_DIR={MODELS_DIR}")
-    try:
-        load_models()
-    except Exception as e:
-        print(f"[models] 로드 실패: {e}")
-        traceback.print_exc()
+    t0 = time.perf_counter()
+    preloaded = bundle is not None
+    if preloaded:
+        # backend.serve가 fork 전에 부모에서 로드한 번들 (다시 로드하면 공유 페이지가 풀림)
+        print(f"[models] {bundle.version}: preloaded by parent pid={os.getppid()}")
+    else:
+        try:
+            load_models()
+        except Exception as e:
+            print(f"[models] 로드 실패: {e}")
+            traceback.print_exc()
+    t1 = time.perf_counter()
+
+    age = process_age_seconds()
+    startup_timing.update({
+        "import_seconds": round(_T_IMPORT_DONE - _T_IMPORT_START, 4),
+        "model_load_seconds": round(t1 - t0, 4),
+        "process_to_ready_seconds": round(age, 3) if age is not None else None,
+        "mmap": MMAP_MODELS,
+        "preloaded": preloaded,
+        "sklearn_imported": "sklearn" in sys.modules,
+    })
+    print(f"[startup] timing={startup_timing}")
+
+
+@app.on_event("startup")
+def start_cache():
+    global prediction_cache
+    if CACHE_SIZE > 0 or CACHE_SHARED_NAME:
+        prediction_cache = PredictionCache(max(CACHE_SIZE, 1), CACHE_SHARED_NAME or None, shared_grid)
+        print(f"[cache] on (lru={CACHE_SIZE}, shared={CACHE_SHARED_NAME or None})")
+
+
+@app.on_event("startup")
+async def start_batcher():
+    global batcher
+    if MICROBATCH_ENABLED:
+        batcher = MicroBatcher(score_features, MICROBATCH_WINDOW_MS, MICROBATCH_MAX)
+        await batcher.start()
+        print(f"[batcher] on (window={MICROBATCH_WINDOW_MS}ms, max={MICROBATCH_MAX})")
+
+
+async def watch_current_version():
+    """models/CURRENT가 가리키는 버전이 바뀌면 백그라운드에서 로드 후 교체"""
+    while True:
+        await asyncio.sleep(WATCH_SECONDS)
+        version = current_version(MODELS_DIR)
+        if version is None or (bundle is not None and bundle.version == version):
+            continue
+        try:
+            await run_in_threadpool(reload_models, version)
+        except Exception as e:
+            print(f"[reload] {version} 로드 실패, 기존 버전 유지: {e}")
+
+
+@app.on_event("startup")
+def start_executor():
+    global executor
+    executor = ScoringExecutor(EXECUTOR_WORKERS, EXECUTOR_QUEUE, EXECUTOR_RETRY_AFTER)
+    executor.start()
+    print(f"[executor] workers={EXECUTOR_WORKERS} queue={EXECUTOR_QUEUE}")
+
+
+@app.on_event("startup")
+async def start_watcher():
+    global watcher_task
+    if WATCH_SECONDS > 0:
+        watcher_task = asyncio.create_task(watch_current_version())
+        print(f"[reload] watching {MODELS_DIR / 'CURRENT'} every {WATCH_SECONDS}s")
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    if batcher is not None:
+        await batcher.stop()
+    if executor is not None:
+        executor.stop()
+    if watcher_task is not None:
+        watcher_task.cancel()
+    if prediction_cache is not None:
+        prediction_cache.close()
 
 
 # ---------------- 유틸 ----------------
-def clamp01(x: float) -> float:
-    return max(0.0, min(1.0, x))
+def json_response(model: BaseModel, endpoint: str) -> Response:
+    """응답 모델을 직접 JSON으로 직렬화 (직렬화 시간 측정용, 결과는 response_model과 동일)"""
+    t0 = time.perf_counter()
+    body = model.model_dump_json()
+    SERIALIZATION_SECONDS.observe(time.perf_counter() - t0, endpoint=endpoint)
+    return Response(content=body, media_type="application/json")
+
+
+def features_from_inputs(payloads) -> np.ndarray:
+    """RiskInput 목록 -> (n, 5) 피처 행렬 (학습 시와 동일한 피처 순서)"""
+    return np.array(
+        [
+            [
+                p.phq_total,
+                p.gad_total,
+                p.k10_total,
+                p.phq_item9,
+                1 if p.asq_any_yes else 0,
+            ]
+            for p in payloads
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 5)
 
 
-def predict_proba_01(model, features):
-    """predict_proba([[...]] )의 양성 클래스 확률(0~1) 반환"""
-    proba = model.predict_proba(features)[0, 1]
-    return float(clamp01(float(proba)))
+def score_features(X: np.ndarray) -> Tuple[ModelBundle, np.ndarray]:
+    """
+    마이크로 배처용: (n, 5) -> (계산한 번들, (n, 3) 확률 [suicidal, depression, stress]).
+    번들은 배치마다 한 번만 잡음 -> 대기 중에 교체(reload)돼도 계산과 캐시 키가 같은 번들 기준
+    """
+    b = get_bundle()
+    return b, b.score(X)
 
 
 def soften(p: float, eps: float = 0.005) -> float:
@@ -92,33 +315,136 @@ def soften(p: float, eps: float = 0.005) -> float:
 
 
 # ---------------- API ----------------
-@app.post("/predict_risk", response_model=RiskOutput)
-def predict_risk(payload: RiskInput):
-    if suicidal_model is None or depression_model is None or stress_model is None:
+def get_bundle() -> ModelBundle:
+    """요청 시작 시점의 번들 (이 요청은 끝까지 이 번들로 처리)"""
+    b = bundle
+    if b is None or not b.ready:
         raise HTTPException(status_code=500, detail="Models not loaded")
+    return b
 
-    # 학습 시와 동일한 피처 순서
-    X = np.array(
-        [
-            [
-                payload.phq_total,
-                payload.gad_total,
-                payload.k10_total,
-                payload.phq_item9,
-                1 if payload.asq_any_yes else 0,
-            ]
-        ]
-    )
 
-    suicidal_p = predict_proba_01(suicidal_model, X)
-    depression_p = predict_proba_01(depression_model, X)
-    stress_p = predict_proba_01(stress_model, X)
+async def offload(fn, *args):
+    """전용 스레드풀에서 실행, 풀과 대기열이 가득 차면 503 + Retry-After"""
+    if executor is None:
+        raise HTTPException(status_code=503, detail="scoring pool not started")
+    try:
+        return await executor.run(fn, *args)
+    except ScoringPoolSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
-    return RiskOutput(
+
+def single_response(b: ModelBundle, probs, endpoint: str) -> Response:
+    suicidal_p, depression_p, stress_p = probs
+    PREDICTIONS_TOTAL.inc(model_version=b.version, endpoint=endpoint)
+
+    return json_response(RiskOutput(
         suicidal_signal_pct=suicidal_p * 100.0,
         depression_risk_pct=depression_p * 100.0,
         stress_risk_pct=stress_p * 100.0,
-    )
+    ), endpoint)
+
+
+def check_batch_size(rows):
+    if len(rows) > BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"batch too large: {len(rows)} > {BATCH_MAX_ROWS}",
+        )
+
+
+async def predict_single(b: ModelBundle, X: np.ndarray, use_pool: bool = False):
+    """피처 한 행 (1, 5) -> 확률 3개 (캐시 -> 마이크로 배처 / 기본 스레드풀, use_pool이면 전용 스레드풀)"""
+    probs = prediction_cache.get(b.fingerprint, X[0]) if prediction_cache is not None else None
+    if probs is None:
+        scored_by = b
+        if use_pool:
+            probs = await offload(b.predict_one, X)
+        elif batcher is not None:
+            # 배치는 flush 시점의 번들로 계산됨 -> 캐시도 그 번들의 fingerprint로
+            scored_by, row = await batcher.submit(X[0])
+            probs = tuple(float(p) for p in row)
+        else:
+            probs = await run_in_threadpool(b.predict_one, X)
+        if prediction_cache is not None:
+            prediction_cache.put(scored_by.fingerprint, X[0], probs)
+    return probs
+
+
+def binary_scorer(single: bool, use_pool: bool, endpoint: str):
+    """바이너리 요청용: (n, 5) 피처 -> (n, 3) 퍼센트 (JSON 엔드포인트와 같은 계산 경로)"""
+    async def score(X: np.ndarray) -> np.ndarray:
+        b = get_bundle()
+        if single:
+            pct = np.array([await predict_single(b, X, use_pool)]) * 100.0
+        else:
+            check_batch_size(X)
+            run = offload if use_pool else run_in_threadpool
+            pct = (await run(b.score, X)) * 100.0
+        PREDICTIONS_TOTAL.inc(len(pct), model_version=b.version, endpoint=endpoint)
+        return pct
+    return score
+
+
+@app.post("/predict_risk", response_model=RiskOutput)
+@binary_variant("single", binary_scorer(single=True, use_pool=False, endpoint="single_binary"))
+async def predict_risk(payload: RiskInput):
+    b = get_bundle()
+    probs = await predict_single(b, features_from_inputs([payload]))
+    return single_response(b, probs, "single")
+
+
+@app.post("/predict_risk/async", response_model=RiskOutput)
+@binary_variant("single", binary_scorer(single=True, use_pool=True, endpoint="single_async_binary"))
+async def predict_risk_async(payload: RiskInput):
+    """/predict_risk와 같은 결과, 계산은 크기가 정해진 전용 스레드풀에서 (가득 차면 503)"""
+    b = get_bundle()
+    probs = await predict_single(b, features_from_inputs([payload]), use_pool=True)
+    return single_response(b, probs, "single_async")
+
+
+def batch_response(b: ModelBundle, pct: np.ndarray, stream: bool, endpoint: str) -> Response:
+    PREDICTIONS_TOTAL.inc(len(pct), model_version=b.version, endpoint=endpoint)
+
+    if stream:
+        def iter_ndjson():
+            for s_p, d_p, t_p in pct.tolist():
+                yield RiskOutput(
+                    suicidal_signal_pct=s_p,
+                    depression_risk_pct=d_p,
+                    stress_risk_pct=t_p,
+                ).model_dump_json() + "\n"
+
+        return StreamingResponse(iter_ndjson(), media_type="application/x-ndjson")
+
+    return json_response(RiskBatchOutput(
+        suicidal_signal_pct=pct[:, 0].tolist(),
+        depression_risk_pct=pct[:, 1].tolist(),
+        stress_risk_pct=pct[:, 2].tolist(),
+    ), endpoint)
+
+
+@app.post("/predict_risk/batch", response_model=RiskBatchOutput)
+@binary_variant("batch", binary_scorer(single=False, use_pool=False, endpoint="batch_binary"))
+def predict_risk_batch(payloads: List[RiskInput], stream: bool = False):
+    """여러 응답을 한 번에 채점. stream=true면 행 단위 NDJSON(RiskOutput)으로 응답"""
+    b = get_bundle()
+    check_batch_size(payloads)
+    pct = b.score(features_from_inputs(payloads)) * 100.0
+    return batch_response(b, pct, stream, "batch")
+
+
+@app.post("/predict_risk/batch/async", response_model=RiskBatchOutput)
+@binary_variant("batch", binary_scorer(single=False, use_pool=True, endpoint="batch_async_binary"))
+async def predict_risk_batch_async(payloads: List[RiskInput], stream: bool = False):
+    """/predict_risk/batch와 같은 결과, 계산은 전용 스레드풀에서 (가득 차면 503)"""
+    b = get_bundle()
+    check_batch_size(payloads)
+    pct = (await offload(b.score, features_from_inputs(payloads))) * 100.0
+    return batch_response(b, pct, stream, "batch_async")
 
 
 @app.get("/")
@@ -131,14 +457,74 @@ def model_info():
     return {
         "project_root": str(PROJECT_ROOT),
         "models_dir": str(MODELS_DIR),
-        "files": {
-            "suicidal": str(SUICIDAL_MODEL_PATH),
-            "depression": str(DEPRESSION_MODEL_PATH),
-            "stress": str(STRESS_MODEL_PATH),
-        },
-        "exists": {
-            "suicidal": SUICIDAL_MODEL_PATH.exists(),
-            "depression": DEPRESSION_MODEL_PATH.exists(),
-            "stress": STRESS_MODEL_PATH.exists(),
+        "serving_mode": SERVING_MODE,
+        "startup": startup_timing,
+        "process": {"pid": os.getpid(), "memory": process_memory(os.getpid())},
+        "model": bundle.info() if bundle is not None else None,
+        "registry": {
+            "current": current_version(MODELS_DIR),
+            "versions": list_versions(MODELS_DIR),
+            "watch_seconds": WATCH_SECONDS,
         },
+        "reloads": reload_history,
+        "load_error": load_error or None,
+        "microbatch": batcher.stats() if batcher is not None else None,
+        "executor": executor.stats() if executor is not None else None,
+        "cache": prediction_cache.stats(bundle.fingerprint if bundle is not None else None)
+        if prediction_cache is not None else None,
+    }
+
+
+# ---------------- 지표 ----------------
+@app.middleware("http")
+async def record_request_latency(request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - t0,
+        method=request.method,
+        path=route.path if route is not None else "unmatched",
+        status=response.status_code,
+    )
+    return response
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus 텍스트 포맷"""
+    sources = {
+        "batcher": batcher.stats() if batcher is not None else {},
+        "executor": executor.stats() if executor is not None else {},
+        "cache_lru": prediction_cache.lru.stats() if prediction_cache is not None else {},
+        "cache_shared": (prediction_cache.stats(bundle.fingerprint if bundle is not None else None)["shared"] or {})
+        if prediction_cache is not None else {},
+        "model": {"load_seconds": bundle.load_seconds} if bundle is not None else {},
     }
+    for component, stats in sources.items():
+        for stat, value in stats.items():
+            if isinstance(value, (int, float)):
+                COMPONENT_STATS.set(value, component=component, stat=stat)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+# ---------------- 관리자 ----------------
+def check_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+@app.post("/admin/reload")
+async def admin_reload(version: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """지정 버전(기본: models/CURRENT)을 백그라운드 스레드에서 로드/워밍업 후 교체"""
+    check_admin(x_admin_token)
+    # 레지스트리에 게시된 버전 이름만 (경로로 쓰이므로 임의 문자열은 거절)
+    if version is not None and version not in list_versions(MODELS_DIR):
+        raise HTTPException(status_code=404, detail=f"unknown model version: {version}")
+    try:
+        new = await run_in_threadpool(reload_models, version)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=409, detail=f"reload failed, keeping current model: {e}")
+    return {"version": new.version, "reload": reload_history[-1]}
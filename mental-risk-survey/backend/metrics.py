@@ -0,0 +1,169 @@
+# backend/metrics.py
+# 외부 의존성 없이 쓰는 최소한의 Prometheus 지표 (Counter / Gauge / Histogram + 텍스트 포맷 출력)
+
+import bisect
+import threading
+from typing import Dict, Sequence, Tuple
+
+# 요청 지연은 수십 µs(조회 테이블) ~ 수백 ms(RF) 범위
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, value in items:
+            yield from self._render_series(key, value)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _render_series(self, key, value):
+        yield f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(value)}"
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def _render_series(self, key, value):
+        yield f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(value)}"
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [버킷별 개수..., +Inf 개수], 합계
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def _render_series(self, key, value):
+        counts, total = value
+        cum = 0
+        for le, c in zip(self.buckets + (float("inf"),), counts):
+            cum += c
+            le_label = 'le="' + _fmt_value(le) + '"'
+            yield f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le_label)} {cum}"
+        yield f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(total)}"
+        yield f"{self.name}_count{_fmt_labels(self.labelnames, key)} {cum}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ---------------- 서버 공용 지표 ----------------
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "risk_http_request_duration_seconds",
+    "Total HTTP request latency (middleware to response start)",
+    ("method", "path", "status"),
+))
+MODEL_PREDICT_SECONDS = REGISTRY.register(Histogram(
+    "risk_model_predict_seconds",
+    "Time spent in model prediction per model (single row: predict_proba_01, batch: whole matrix)",
+    ("model", "kind"),
+))
+VALIDATION_SECONDS = REGISTRY.register(Histogram(
+    "risk_input_validation_seconds",
+    "Pydantic validation time per RiskInput",
+))
+SERIALIZATION_SECONDS = REGISTRY.register(Histogram(
+    "risk_response_serialization_seconds",
+    "Response model JSON serialization time",
+    ("endpoint",),
+))
+PREDICTIONS_TOTAL = REGISTRY.register(Counter(
+    "risk_predictions_total",
+    "Scored survey rows per model version",
+    ("model_version", "endpoint"),
+))
+EXECUTOR_QUEUE_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "risk_executor_queue_wait_seconds",
+    "Time an accepted scoring job waited for a free worker in the dedicated pool",
+))
+EXECUTOR_RUN_SECONDS = REGISTRY.register(Histogram(
+    "risk_executor_run_seconds",
+    "Scoring job run time inside the dedicated pool",
+))
+CACHE_LOOKUPS_TOTAL = REGISTRY.register(Counter(
+    "risk_prediction_cache_lookups_total",
+    "Prediction cache lookups per cache (lru: per-process, shared: cross-worker grid) and result",
+    ("cache", "result"),
+))
+EXECUTOR_REJECTED_TOTAL = REGISTRY.register(Counter(
+    "risk_executor_rejected_total",
+    "Scoring jobs rejected with 503 because the dedicated pool and its queue were full",
+))
+COMPONENT_STATS = REGISTRY.register(Gauge(
+    "risk_component_stat",
+    "Micro-batcher / scoring pool / cache / model bundle counters, sampled at scrape time",
+    ("component", "stat"),
+))
@@ -0,0 +1,261 @@
+# backend/model_bundle.py
+# 한 모델 버전을 서빙하는 데 필요한 것(세 모델 / 조회 테이블 / 합친 모델)을 묶은 단위.
+# 서버는 ModelBundle 하나를 전역으로 들고 있다가 새 버전을 다 로드/워밍업한 뒤 통째로 교체한다.
+# (요청 처리 중에는 시작할 때 잡은 번들만 쓰므로 교체 중에도 이전 버전으로 끝까지 처리됨)
+
+import hashlib
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ml.risk_table import (
+    LABELS, build_risk_table, save_risk_table, load_risk_table, risk_table_sources, in_bounds, lookup, feature_grid,
+)
+from ml.fused_model import FusedRiskModel
+from ml.model_registry import model_sources
+from backend.compiled_engine import CompiledRiskModel
+from backend.onnx_engine import ONNX_FILE, OnnxRiskModel
+from backend.metrics import MODEL_PREDICT_SECONDS
+
+SERVING_MODES = ("model", "table", "fused", "numpy", "onnx")
+
+
+# ---------------- 유틸 ----------------
+def clamp01(x: float) -> float:
+    return max(0.0, min(1.0, x))
+
+
+def predict_proba_01(model, features):
+    """predict_proba([[...]] )의 양성 클래스 확률(0~1) 반환"""
+    proba = model.predict_proba(features)[0, 1]
+    return float(clamp01(float(proba)))
+
+
+def predict_proba_batch(model, features):
+    """predict_proba(X)의 양성 클래스 확률(0~1) 벡터 반환 — 배치 전체를 한 번에"""
+    return np.clip(model.predict_proba(features)[:, 1], 0.0, 1.0)
+
+
+# ---------------- 번들 ----------------
+class ModelBundle:
+    def __init__(
+        self, model_dir: Path, mode: str = "model", version: str = None, mmap: bool = False, cache_dir: Path = None
+    ):
+        """cache_dir: model_dir에 없는 파생 아티팩트(compiled/, onnx, 조회 테이블)를 만들어 둘 폴더
+        (기본 model_dir — 게시된 버전 폴더는 manifest로 검증한 뒤 바뀌면 안 되므로 따로 지정)"""
+        if mode not in SERVING_MODES:
+            raise ValueError(f"unknown serving mode: {mode} (expected one of {SERVING_MODES})")
+        self.model_dir = Path(model_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.model_dir
+        self.mode = mode
+        self.version = version or "unversioned"
+        self.mmap = mmap
+
+        self.models = {}         # label -> sklearn 모델 (model / table / 즉석 fused 모드)
+        self.risk_table = None   # (N_CELLS, 3) 조회 테이블 (table 모드)
+        self.joint_model = None  # (n, 3)을 한 번에 내는 모델 (fused / numpy / onnx 모드)
+        self.load_seconds = None
+        self.loaded_at = None
+        self.fingerprint = None  # 결과 캐시 키 (같은 모델 파일/모드면 워커가 달라도 같음)
+        self.record_metrics = True  # False면 예측 시간을 지표에 남기지 않음 (워밍업)
+
+    # ---------------- 경로 ----------------
+    def model_path(self, label: str) -> Path:
+        return self.model_dir / f"{label}_model.joblib"
+
+    def _artifact(self, name: str, marker: str = None) -> Path:
+        """model_dir에 있으면 그것, 없으면 cache_dir 쪽 경로 (marker: 폴더 아티팩트의 존재 확인 파일)"""
+        path = self.model_dir / name
+        return path if (path / marker if marker else path).exists() else self.cache_dir / name
+
+    @property
+    def risk_table_path(self) -> Path:
+        return self._artifact("risk_table.npy")
+
+    @property
+    def fused_path(self) -> Path:
+        return self.model_dir / "fused_risk_model.joblib"
+
+    @property
+    def compiled_dir(self) -> Path:
+        return self._artifact("compiled", "manifest.json")
+
+    @property
+    def onnx_path(self) -> Path:
+        return self._artifact(ONNX_FILE)
+
+    # ---------------- 로딩 ----------------
+    def _compute_fingerprint(self) -> str:
+        """버전 폴더면 버전 이름, 아니면 모델 파일들의 (이름, 크기, 수정 시각)으로 만든 해시"""
+        if self.version != "unversioned":
+            return f"{self.version}:{self.mode}"
+        h = hashlib.sha1(self.mode.encode("utf-8"))
+        for path in sorted(self.model_dir.glob("*.joblib")) + sorted(self.compiled_dir.glob("*")) + sorted(self.model_dir.glob("*.onnx")):
+            st = path.stat()
+            h.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+        return f"unversioned:{h.hexdigest()[:16]}"
+
+    def _load_joblib(self, path: Path):
+        """joblib.load — joblib(와 피클 안의 sklearn)은 실제로 필요할 때만 임포트"""
+        import joblib
+        return joblib.load(path, mmap_mode="r" if self.mmap else None)
+
+    def _load_risk_table(self):
+        """지금 모델(sha256)로 만든 risk_table.npy가 있으면 로드, 없으면 지금 계산해서 저장
+        (수정 시각 비교는 checkout / 복사로 순서가 바뀌면 틀리므로 내용 해시로 비교)"""
+        sources = model_sources({k: self.model_path(k) for k in LABELS})
+        for path in (self.model_dir / "risk_table.npy", self.cache_dir / "risk_table.npy"):
+            if path.exists() and risk_table_sources(path) == sources:
+                print(f"[table] load {path}")
+                return load_risk_table(path, mmap_mode="r" if self.mmap else None)
+
+        path = self.cache_dir / "risk_table.npy"
+        print("[table] building lookup table from models...")
+        table = build_risk_table(self.models)
+        try:
+            save_risk_table(table, path, sources)
+        except OSError as e:
+            print(f"[table] 저장 실패(메모리에서만 사용): {e}")
+        return table
+
+    def _check_sources(self, recorded: dict, artifact: Path):
+        """파생 아티팩트에 기록된 joblib sha256이 지금 폴더의 모델과 다르면 거부 (이전 학습의 잔여물)"""
+        current = model_sources({k: self.model_path(k) for k in LABELS if self.model_path(k).exists()})
+        stale = sorted(k for k, digest in current.items() if recorded.get(k) != digest)
+        if stale:
+            raise ValueError(
+                f"[{self.version}] {artifact} was not built from the current models ({', '.join(stale)}); "
+                f"delete it or re-export with ml/train_risk_models.py"
+            )
+
+    def load(self) -> "ModelBundle":
+        t0 = time.perf_counter()
+        if self.mode == "numpy":
+            if not (self.compiled_dir / "manifest.json").exists():
+                # 아티팩트가 없으면 joblib 모델에서 컴파일 (이때만 sklearn 임포트)
+                from ml.train_risk_models import export_compiled_models
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                export_compiled_models({k: self.model_path(k) for k in LABELS}, self.cache_dir)
+            self.joint_model = CompiledRiskModel.load(
+                self.compiled_dir, mmap_mode="r" if self.mmap else None
+            )
+            self._check_sources(self.joint_model.sources, self.compiled_dir)
+            print(f"[models] {self.version}: compiled numpy model ({self.joint_model.n_folds} folds).")
+        elif self.mode == "onnx":
+            if not self.onnx_path.exists():
+                # 아티팩트가 없으면 joblib 모델에서 변환 (이때만 sklearn / skl2onnx 임포트)
+                # 변환기 미설치 / 트리 노드 상한 초과(기본 RF)는 이유를 담아 로드 실패로 올림
+                from ml.train_risk_models import export_onnx_model
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                try:
+                    export_onnx_model({k: self.model_path(k) for k in LABELS}, self.cache_dir)
+                except (ImportError, NotImplementedError) as e:
+                    raise ValueError(f"[{self.version}] onnx serving unavailable: {type(e).__name__}: {e}") from e
+            self.joint_model = OnnxRiskModel.load(self.onnx_path)
+            self._check_sources(self.joint_model.sources, self.onnx_path)
+            print(f"[models] {self.version}: onnx model ({self.onnx_path.name}).")
+        elif self.mode == "fused" and self.fused_path.exists():
+            self.joint_model = self._load_joblib(self.fused_path)
+            self._check_sources(getattr(self.joint_model, "sources", {}), self.fused_path)
+            print(f"[models] {self.version}: fused model ({self.joint_model.n_folds} folds).")
+        else:
+            self.models = {k: self._load_joblib(self.model_path(k)) for k in LABELS}
+            print(f"[models] {self.version}: loaded all.")
+            if self.mode == "table":
+                self.risk_table = self._load_risk_table()
+            elif self.mode == "fused":
+                # 아티팩트가 아직 없으면 로드한 세 모델로 즉석에서 합침
+                self.joint_model = FusedRiskModel(self.models)
+                print(f"[models] {self.version}: fused in memory ({self.joint_model.n_folds} folds).")
+
+        self.fingerprint = self._compute_fingerprint()
+        self.load_seconds = time.perf_counter() - t0
+        self.loaded_at = time.time()
+        return self
+
+    def warmup(self, n_rows: int = 256) -> float:
+        """교체 전에 한 번씩 돌려서 지연 초기화/페이지 폴트 비용을 미리 치름"""
+        t0 = time.perf_counter()
+        grid = feature_grid()
+        X = grid[np.linspace(0, len(grid) - 1, n_rows).astype(int)]
+        # 합성 입력이라 서빙 지연 히스토그램(MODEL_PREDICT_SECONDS)에는 남기지 않음
+        self.record_metrics = False
+        try:
+            self.predict_one(X[:1])
+            out = self.score(X)
+        finally:
+            self.record_metrics = True
+        if not np.all(np.isfinite(out)):
+            raise ValueError(f"[{self.version}] warmup produced non-finite probabilities")
+        return time.perf_counter() - t0
+
+    @property
+    def ready(self) -> bool:
+        return self.joint_model is not None or all(k in self.models for k in LABELS)
+
+    # ---------------- 예측 ----------------
+    def _observe(self, seconds: float, **labels):
+        if self.record_metrics:
+            MODEL_PREDICT_SECONDS.observe(seconds, **labels)
+
+    def predict_one(self, X: np.ndarray):
+        """피처 한 행 (1, 5) -> (suicidal, depression, stress) 확률"""
+        t0 = time.perf_counter()
+        if self.risk_table is not None and in_bounds(X)[0]:
+            # O(1) 조회 (범위 밖 입력은 아래 모델 경로로)
+            out = tuple(float(p) for p in lookup(self.risk_table, X)[0])
+            self._observe(time.perf_counter() - t0, model="table", kind="single")
+            return out
+        if self.joint_model is not None:
+            out = tuple(float(p) for p in self.joint_model.predict_proba(X)[0])
+            self._observe(time.perf_counter() - t0, model="joint", kind="single")
+            return out
+
+        out = []
+        for k in LABELS:
+            out.append(predict_proba_01(self.models[k], X))
+            t1 = time.perf_counter()
+            self._observe(t1 - t0, model=k, kind="single")
+            t0 = t1
+        return tuple(out)
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """(n, 5) -> (n, 3) 확률 [suicidal, depression, stress], 모델당 predict_proba 한 번"""
+        out = np.empty((len(X), len(LABELS)), dtype=np.float64)
+        todo = np.ones(len(X), dtype=bool)
+        if self.risk_table is not None:
+            todo = ~in_bounds(X)
+            out[~todo] = lookup(self.risk_table, X[~todo])
+        t0 = time.perf_counter()
+        if todo.any() and self.joint_model is not None:
+            out[todo] = self.joint_model.predict_proba(X[todo])
+            self._observe(time.perf_counter() - t0, model="joint", kind="batch")
+        elif todo.any():
+            Xm = X[todo]
+            for j, k in enumerate(LABELS):
+                out[todo, j] = predict_proba_batch(self.models[k], Xm)
+                t1 = time.perf_counter()
+                self._observe(t1 - t0, model=k, kind="batch")
+                t0 = t1
+        return out
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "model_dir": str(self.model_dir),
+            "mode": self.mode,
+            "mmap": self.mmap,
+            "load_seconds": round(self.load_seconds, 4) if self.load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+            "risk_table_loaded": self.risk_table is not None,
+            "joint_model": type(self.joint_model).__name__ if self.joint_model is not None else None,
+            "files": {k: str(self.model_path(k)) for k in LABELS},
+            "exists": {
+                **{k: self.model_path(k).exists() for k in LABELS},
+                "fused": self.fused_path.exists(),
+                "compiled": (self.compiled_dir / "manifest.json").exists(),
+                "onnx": self.onnx_path.exists(),
+            },
+        }
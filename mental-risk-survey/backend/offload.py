@@ -0,0 +1,124 @@
+# backend/offload.py
+# 모델 계산 전용 스레드풀 (Starlette 기본 스레드풀과 분리, 대기열 길이 제한)
+#  - workers개가 동시에 계산하고, 그 뒤로 max_queue개까지만 줄을 세움
+#  - 그 이상 들어오면 바로 ScoringPoolSaturated -> 엔드포인트가 503 + Retry-After로 응답
+#    (무한정 쌓이며 지연이 늘어나는 대신 일찍 거절해서 받아들인 요청의 지연을 일정하게 유지)
+#  - numpy / sklearn / onnxruntime 계산은 대부분 GIL을 풀기 때문에 스레드로 충분함
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from backend.metrics import EXECUTOR_QUEUE_WAIT_SECONDS, EXECUTOR_RUN_SECONDS, EXECUTOR_REJECTED_TOTAL
+
+
+class ScoringPoolSaturated(Exception):
+    """실행 중 + 대기 중 작업이 한도에 도달함"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"scoring pool saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ScoringExecutor:
+    """
+    run(fn, *args)를 전용 스레드풀에서 실행하고 결과를 await로 돌려준다.
+    동시에 받아들이는 작업 수는 workers + max_queue개로 제한.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64, retry_after: int = 1):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.retry_after = max(1, int(retry_after))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # 지표
+        self.in_flight = 0       # 받아들였지만 아직 안 끝난 작업 (실행 중 + 대기 중)
+        self.running = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    # ---------------- 수명주기 ----------------
+    def start(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="risk-score")
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ---------------- 요청 ----------------
+    def _admit(self):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                EXECUTOR_REJECTED_TOTAL.inc()
+                raise ScoringPoolSaturated(self.retry_after)
+            self.in_flight += 1
+            self.submitted += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _release(self, fut):
+        with self._lock:
+            self.in_flight -= 1
+            if fut.cancelled() or fut.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def run(self, fn: Callable, *args):
+        if self._pool is None:
+            raise RuntimeError("ScoringExecutor not started")
+        self._admit()
+        t_submit = time.perf_counter()
+
+        def call():
+            t0 = time.perf_counter()
+            EXECUTOR_QUEUE_WAIT_SECONDS.observe(t0 - t_submit)
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                dt = time.perf_counter() - t0
+                EXECUTOR_RUN_SECONDS.observe(dt)
+                with self._lock:
+                    self.running -= 1
+                    self.busy_seconds += dt
+
+        # 클라이언트가 끊겨 await가 취소돼도 이미 실행 중인 작업은 끝날 때까지 자리를 차지함
+        # -> 슬롯 반납은 스레드풀 future 완료 시점에
+        cf = self._pool.submit(call)
+        cf.add_done_callback(self._release)
+        return await asyncio.wrap_future(cf)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = max(0, self.in_flight - self.running)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": queued,
+                "saturation": self.in_flight / self.capacity,
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "busy_seconds": round(self.busy_seconds, 6),
+            }
@@ -0,0 +1,43 @@
+# backend/onnx_engine.py
+# onnxruntime(CPU)로 도는 추론 엔진
+#  - ml/train_risk_models.py의 export_onnx_model()이 만든 models/risk_model.onnx 를 읽음
+#  - 그래프 하나에 세 라벨의 전처리 / 분류기 / sigmoid 캘리브레이션 / fold 평균이 다 들어 있어
+#    호출 한 번으로 (n, 3) 확률이 나옴 (sklearn / joblib 임포트 없음)
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+ONNX_FILE = "risk_model.onnx"
+
+
+class OnnxRiskModel:
+    """predict_proba(X) -> (n, 3) [suicidal, depression, stress] 양성 확률"""
+
+    def __init__(self, session, labels, sources=None):
+        self.session = session
+        self.labels = tuple(labels)
+        self.sources = sources or {}  # 라벨 -> 변환에 쓴 joblib 모델의 sha256
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+        self.n_features_in_ = session.get_inputs()[0].shape[1]
+
+    @classmethod
+    def load(cls, path: Path, n_threads: int = 1) -> "OnnxRiskModel":
+        """n_threads: 세션 내부 스레드 수 (요청 하나는 작으므로 기본 1, 병렬은 워커/스레드풀로)"""
+        import onnxruntime as ort  # onnx 모드에서만 필요
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = n_threads
+        opts.inter_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(str(path), sess_options=opts, providers=["CPUExecutionProvider"])
+
+        meta = session.get_modelmeta().custom_metadata_map
+        labels = meta.get("labels", "suicidal,depression,stress").split(",")
+        return cls(session, labels, json.loads(meta.get("sources", "{}")))
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features_in_)
+        return self.session.run([self.output_name], {self.input_name: X})[0]
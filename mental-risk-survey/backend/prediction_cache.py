@@ -0,0 +1,202 @@
+# backend/prediction_cache.py
+# /predict_risk 결과 캐시 (입력 5-튜플 -> 세 확률)
+#  - LRUCache: 프로세스 안 LRU (OrderedDict), 적중/실패/퇴출 카운터
+#  - SharedGridCache: 여러 워커가 공유하는 shared memory 캐시. 입력 공간이 작고 이산적이라
+#    해시 대신 risk_table의 flat_index로 바로 찾아가는 direct-mapped 배열을 쓴다.
+#    칸마다 모델 세대(generation)를 같이 적어 두어 모델이 바뀌면 예전 칸은 자동으로 무효.
+#    칸 = [gen, crc32(gen + 값), 값 3개] 32바이트 — 읽는 쪽은 칸을 복사한 뒤 체크섬을 확인하므로
+#    다른 워커가 쓰는 도중의 반쯤 쓰인 칸은 적중 대신 실패로 처리된다.
+#    블록은 prefork 부모(backend/serve.py)가 만들고 지움, 워커는 fork로 물려받거나 붙기만 함.
+#  - 키에 모델 지문(fingerprint)을 넣으므로 교체 중 이전 번들이 넣은 값은 새 버전에서 적중하지 않는다.
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from backend.metrics import CACHE_LOOKUPS_TOTAL
+from ml.risk_table import N_CELLS, LABELS, in_bounds, flat_index
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = int(maxsize)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                CACHE_LOOKUPS_TOTAL.inc(cache="lru", result="miss")
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            CACHE_LOOKUPS_TOTAL.inc(cache="lru", result="hit")
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _untrack(shm):
+    """이 프로세스가 종료할 때 resource_tracker가 블록을 지우지 않도록 (지우는 건 만든 부모만)"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class SharedGridCache:
+    """
+    shared memory 블록 하나: 칸 N_CELLS개 x 32바이트 [gen: uint32][crc: uint32][values: float64 x 3] (약 6.4MB)
+    create=True: 새로 만들고 close() 때 지움 (prefork 부모 전용, 이전 실행이 남긴 같은 이름의 블록은 지우고 새로)
+    create=False: 있는 블록에 붙음. 없으면 (부모 없이 단독 실행) 만들되 지우지 않음 -> /dev/shm에 남고 다음 실행이 다시 붙음
+    """
+
+    RECORD = np.dtype([("gen", "<u4"), ("crc", "<u4"), ("values", "<f8", (len(LABELS),))])
+
+    def __init__(self, name: str, create: bool = False):
+        from multiprocessing import shared_memory
+
+        size = N_CELLS * self.RECORD.itemsize
+        if create:
+            try:
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                try:
+                    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                except FileExistsError:
+                    shm = shared_memory.SharedMemory(name=name)
+            _untrack(shm)
+            if shm.size < size:
+                shm.close()
+                raise ValueError(f"shared memory {name!r} is {shm.size} bytes, expected {size}")
+
+        self._shm = shm
+        self.name = name
+        self.owner = create
+        self._owner_pid = os.getpid()
+        self.records = np.ndarray((N_CELLS,), dtype=self.RECORD, buffer=shm.buf)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def generation(fingerprint: str) -> int:
+        return (zlib.crc32(fingerprint.encode("utf-8")) | 1) & 0xFFFFFFFF  # 0 = 빈 칸
+
+    @staticmethod
+    def _checksum(rec) -> int:
+        return zlib.crc32(rec["values"].tobytes(), int(rec["gen"]))
+
+    def get(self, gen: int, idx: int) -> Optional[Tuple[float, ...]]:
+        rec = self.records[idx].copy()  # 한 번 복사한 값으로 확인 (읽는 중 다른 워커가 써도 일관)
+        if rec["gen"] != gen or rec["crc"] != self._checksum(rec):
+            self.misses += 1
+            CACHE_LOOKUPS_TOTAL.inc(cache="shared", result="miss")
+            return None
+        self.hits += 1
+        CACHE_LOOKUPS_TOTAL.inc(cache="shared", result="hit")
+        return tuple(float(v) for v in rec["values"])
+
+    def put(self, gen: int, idx: int, value):
+        rec = np.zeros((), dtype=self.RECORD)
+        rec["gen"] = gen
+        rec["values"] = value
+        rec["crc"] = self._checksum(rec)
+        self.records[idx] = rec
+
+    def filled(self, gen: int) -> int:
+        return int(np.count_nonzero(self.records["gen"] == gen))
+
+    def close(self):
+        self.records = None
+        self._shm.close()
+        # fork된 워커도 owner 객체를 물려받으므로 만든 프로세스에서만 지움
+        if self.owner and os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+
+class PredictionCache:
+    """
+    get/put(fingerprint, row) — row는 (5,) 정수 피처.
+    shared가 켜져 있으면 테이블 범위 안의 입력은 SharedGridCache, 나머지는 로컬 LRU.
+    """
+
+    def __init__(self, maxsize: int = 10_000, shared_name: str = None, shared: SharedGridCache = None):
+        self.lru = LRUCache(maxsize)
+        # shared: prefork 부모가 만들어 fork로 물려준 블록 (있으면 이름으로 다시 붙지 않음)
+        self.shared = shared if shared is not None else (SharedGridCache(shared_name) if shared_name else None)
+
+    def _shared_slot(self, fingerprint: str, row: np.ndarray):
+        if self.shared is None or not in_bounds(row[None, :])[0]:
+            return None
+        return SharedGridCache.generation(fingerprint), int(flat_index(row[None, :])[0])
+
+    def get(self, fingerprint: str, row: np.ndarray):
+        slot = self._shared_slot(fingerprint, row)
+        if slot is not None:
+            return self.shared.get(*slot)
+        return self.lru.get((fingerprint, *row.tolist()))
+
+    def put(self, fingerprint: str, row: np.ndarray, value):
+        slot = self._shared_slot(fingerprint, row)
+        if slot is not None:
+            self.shared.put(*slot, value)
+        else:
+            self.lru.put((fingerprint, *row.tolist()), tuple(value))
+
+    def invalidate(self):
+        """모델 교체 시 호출. 키에 지문이 있으므로 로컬 메모리만 비우면 됨 (shared는 세대로 무효화)"""
+        self.lru.clear()
+
+    def stats(self, fingerprint: str = None) -> dict:
+        out = {"lru": self.lru.stats(), "shared": None}
+        if self.shared is not None:
+            out["shared"] = {
+                "name": self.shared.name,
+                "hits": self.shared.hits,
+                "misses": self.shared.misses,
+                "filled": self.shared.filled(SharedGridCache.generation(fingerprint))
+                if fingerprint else None,
+                "capacity": N_CELLS,
+            }
+        return out
+
+    def close(self):
+        if self.shared is not None:
+            self.shared.close()
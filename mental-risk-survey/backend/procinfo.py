@@ -0,0 +1,23 @@
+# backend/procinfo.py
+# 프로세스 정보 (리눅스 /proc) — 앱(backend/main.py)과 프리포크 런처(backend/serve.py)가 같이 씀
+
+from typing import Dict, Optional
+
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """/proc/<pid>/smaps_rollup 기준 MB: rss, pss(공유 페이지를 나눠 가진 몫), shared, private"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            kb = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    kb[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss_mb": round(kb.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(kb.get("Pss", 0) / 1024, 1),
+        "shared_mb": round((kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)) / 1024, 1),
+        "private_mb": round((kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024, 1),
+    }
@@ -0,0 +1,185 @@
+# backend/serve.py
+# 멀티 프로세스 서빙 진입점 (프리포크)
+#  - 부모 프로세스가 모델을 한 번 로드/워밍업하고 gc.freeze() 후 워커를 fork
+#    -> 모델 페이지를 copy-on-write로 공유 (uvicorn --workers는 워커마다 따로 언피클해서 모델이 N벌)
+#  - gc.freeze(): 로드된 객체를 GC 추적 대상에서 빼서, 워커의 GC가 객체 헤더를 건드려 페이지가 복사되는 것을 막음
+#  - 모든 워커가 부모가 연 소켓 하나를 같이 accept
+#  - 부모는 워커를 감시(죽으면 다시 fork)하고 워커별 RSS / PSS / 공유 메모리를 주기적으로 출력
+#
+#   PYTHONPATH=. python -m backend.serve --workers 4 --port 8000
+#   RISK_SERVING_MODE=numpy RISK_MMAP=1 PYTHONPATH=. python -m backend.serve --workers 8 --rss-interval 60
+#
+# RISK_CACHE_SHARED가 있으면 공유 캐시 블록도 부모가 만들어 워커에 물려주고, 종료할 때 부모만 지움.
+# 나머지 설정(RISK_*)은 backend/main.py와 같음. 워커는 부모가 로드한 번들로 시작하고,
+# /admin/reload 또는 RISK_WATCH_SECONDS로 교체한 새 버전은 워커마다 따로 로드됨 (그 버전은 공유되지 않음).
+# Linux 전용 (os.fork, /proc).
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.procinfo import process_memory  # noqa: E402
+
+
+# ---------------- 메모리 ----------------
+def report_memory(parent: int, workers: Dict[int, int]):
+    rows = [("parent", parent)] + [(f"worker{slot}", pid) for pid, slot in sorted(workers.items(), key=lambda x: x[1])]
+    total_pss = 0.0
+    for name, pid in rows:
+        mem = process_memory(pid)
+        if mem is None:
+            continue
+        total_pss += mem["pss_mb"]
+        print(f"[serve] {name:>8} pid={pid} " + " ".join(f"{k}={v}" for k, v in mem.items()))
+    print(f"[serve] total pss={total_pss:.1f}MB ({len(workers)} workers)")
+
+
+# ---------------- 워커 ----------------
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args):
+    """fork된 자식: 부모의 소켓으로 uvicorn 서버 하나 실행 (startup 이벤트는 여기서 돎)"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_keep_alive=args.keep_alive,
+        lifespan="on",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock: socket.socket, args, slot: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, args)
+        except BaseException as e:
+            print(f"[serve] worker{slot} 종료: {e!r}")
+            code = 1
+        finally:
+            os._exit(code)
+    print(f"[serve] worker{slot} pid={pid}")
+    return pid
+
+
+# ---------------- 부모 ----------------
+def preload():
+    """부모에서 모델 로드 + 워밍업 후 gc.freeze() -> 반환된 app을 워커가 그대로 씀"""
+    from backend import main
+
+    t0 = time.perf_counter()
+    main.load_models()
+    if main.CACHE_SHARED_NAME:
+        from backend.prediction_cache import SharedGridCache
+
+        main.shared_grid = SharedGridCache(main.CACHE_SHARED_NAME, create=True)
+    gc.collect()
+    gc.freeze()  # 지금까지의 객체를 영구 세대로 (이후 GC가 훑지 않으므로 refcount 외의 쓰기 없음)
+    print(
+        f"[serve] preloaded {main.bundle.version} ({main.SERVING_MODE}) in {time.perf_counter() - t0:.2f}s, "
+        f"frozen objects={gc.get_freeze_count():,}"
+    )
+    return main.app
+
+
+def serve(args):
+    app = preload()
+    from backend.main import shared_grid
+
+    sock = bind_socket(args.host, args.port)
+    print(f"[serve] listening on {args.host}:{args.port} with {args.workers} workers")
+
+    stopping = False
+
+    def on_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    workers = {spawn(app, sock, args, slot): slot for slot in range(args.workers)}
+    next_report = time.monotonic() + args.rss_delay
+    try:
+        while not stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid, status = 0, 0
+            if pid and pid in workers:
+                slot = workers.pop(pid)
+                print(f"[serve] worker{slot} pid={pid} exited ({os.waitstatus_to_exitcode(status)}), restarting")
+                workers[spawn(app, sock, args, slot)] = slot
+                continue
+
+            if args.rss_interval >= 0 and time.monotonic() >= next_report:
+                report_memory(os.getpid(), workers)
+                if args.rss_interval == 0:
+                    args.rss_interval = -1  # 시작 후 한 번만
+                next_report = time.monotonic() + max(args.rss_interval, 0)
+            time.sleep(0.2)
+    finally:
+        print("[serve] stopping workers")
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + args.graceful_timeout
+        while workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                workers.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in workers:
+            os.kill(pid, signal.SIGKILL)
+        sock.close()
+        if shared_grid is not None:
+            shared_grid.close()  # 워커가 모두 끝난 뒤 부모만 unlink
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Prefork server: load models once, fork workers sharing model memory")
+    p.add_argument("--host", default=os.environ.get("RISK_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.environ.get("RISK_PORT", "8000")))
+    p.add_argument("--workers", type=int, default=int(os.environ.get("RISK_WORKERS", str(os.cpu_count() or 1))))
+    p.add_argument("--log-level", default="warning")
+    p.add_argument("--keep-alive", type=int, default=5)
+    p.add_argument("--graceful-timeout", type=float, default=10.0)
+    p.add_argument("--rss-delay", type=float, default=5.0, help="첫 메모리 보고까지 대기(초)")
+    p.add_argument("--rss-interval", type=float, default=0.0,
+                   help="워커별 메모리 보고 주기(초), 0 = 시작 후 한 번, 음수 = 끔")
+    args = p.parse_args(argv)
+    if not hasattr(os, "fork"):
+        raise SystemExit("backend.serve는 os.fork가 있는 플랫폼(Linux)에서만 동작")
+    serve(args)
+
+
+if __name__ == "__main__":
+    main()
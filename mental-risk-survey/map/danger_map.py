@@ -1,10 +1,30 @@
 import folium
 import pandas as pd
 import json
-import requests
-from sklearn.ensemble import RandomForestRegressor
+import os
+import sys
 from pathlib import Path
 
+from data_store import open_dataset
+from forecast import forecast_frame
+from geo_cache import load_geometry
+from incremental import IncrementalBuild
+
+# 예측 설정: 방법(linear / theil_sen / holt / rf), 마지막 연도 이후 몇 해까지, 병렬 작업 수
+FORECAST_METHOD = os.environ.get("MAP_FORECAST_METHOD", "theil_sen")
+FORECAST_HORIZON = int(os.environ.get("MAP_FORECAST_HORIZON", "3"))
+FORECAST_JOBS = int(os.environ.get("MAP_FORECAST_JOBS", "1"))
+# 지도 도형 단순화 단계 (geo_cache.ZOOMS 중 하나, 클수록 원본에 가까움)
+GEO_ZOOM = int(os.environ.get("MAP_GEO_ZOOM", "7"))
+# 증분 빌드: 바뀐 연도/시계열만 다시 계산하고 나머지는 map/build_cache/에서 재사용 (map/incremental.py)
+INCREMENTAL = os.environ.get("MAP_INCREMENTAL", "0") == "1"
+# 출력 형식: single — HTML 하나에 데이터/도형을 모두 넣음
+#           split  — OUTPUT_DIR/index.html(틀)만 먼저 받고, 연도x지표 데이터 조각과 도형은 필요할 때 fetch
+#                    (file://로는 fetch가 막히므로 정적 서버로 열 것: python -m http.server -d 지역_위험_지도)
+OUTPUT_MODE = os.environ.get("MAP_OUTPUT", "single")
+OUTPUT_DIR = Path("지역_위험_지도")
+OUTPUT_HTML = str(OUTPUT_DIR / "index.html") if OUTPUT_MODE == "split" else "지역_위험_지도.html"
+
 # ============================
 # 1) 데이터 로드
 # ============================
@@ -12,8 +32,8 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent  # danger_map.py가 있는 map 폴더
 file_path = BASE_DIR / "mental_socioeconomic_dataset.xlsx"
 try:
-    mental = pd.read_excel(file_path, sheet_name="mental_health_status")
-    socio = pd.read_excel(file_path, sheet_name="socioeconomic_status")
+    # 엑셀은 처음 한 번만 읽고 이후에는 map/data_cache/의 병합표 사용 (region은 category)
+    df = open_dataset(file_path).merged("mental_health_status", "socioeconomic_status")
 except FileNotFoundError:
     print("⚠ 파일이 없어서 더미데이터 사용합니다.")
     data = {
@@ -26,8 +46,7 @@ except FileNotFoundError:
     }
     mental = pd.DataFrame(data)
     socio = pd.DataFrame(data)
-
-df = pd.merge(mental, socio, on=["year", "region"])
+    df = pd.merge(mental, socio, on=["year", "region"])
 
 # ============================
 # 2) 지표 목록
@@ -39,45 +58,47 @@ metrics = {
     "청년 실업률": "youth_unemployment_rate",
 }
 
+# 데이터에 없는 지표는 제외 (시트마다 열 구성이 다름)
+missing = [col for col in metrics.values() if col not in df.columns]
+if missing:
+    print(f"⚠ 데이터에 없는 지표 제외: {missing}")
+metrics = {label: col for label, col in metrics.items() if col in df.columns}
+
 metric_keys = list(metrics.keys())
 
 # ============================
 # 3) 과거 데이터 JSON 생성
 # ============================
-base_year_list = sorted(df["year"].unique())
-data_dict = {}
-
-for year in base_year_list:
-    year_df = df[df["year"] == year]
-    metric_dict = {}
-    for label, col in metrics.items():
-        vals = year_df[["region", col]].dropna()
-        metric_dict[label] = dict(zip(vals["region"], vals[col]))
-    data_dict[str(year)] = metric_dict
+build = IncrementalBuild() if INCREMENTAL else None
+
+if build is not None:
+    data_dict = build.observed(df, metrics)
+else:
+    base_year_list = sorted(df["year"].unique())
+    data_dict = {}
+
+    for year in base_year_list:
+        year_df = df[df["year"] == year]
+        metric_dict = {}
+        for label, col in metrics.items():
+            vals = year_df[["region", col]].dropna()
+            metric_dict[label] = dict(zip(vals["region"], vals[col]))
+        data_dict[str(year)] = metric_dict
 
 # ============================
-# 4) 예측값 생성 (다음 해)
+# 4) 예측값 생성 (다음 해 ~ FORECAST_HORIZON년 뒤)
 # ============================
-pred_year = max(base_year_list) + 1
-regions = df["region"].unique()
+# 모든 지역 x 지표 시계열을 한 번에 적합 (map/forecast.py), 2년 미만 관측은 None
+forecast = (build.forecast if build is not None else forecast_frame)(
+    df, metrics,
+    horizons=range(1, FORECAST_HORIZON + 1),
+    method=FORECAST_METHOD,
+    n_jobs=FORECAST_JOBS,
+)
+pred_years = sorted(int(y) for y in forecast)
 
 # 예측 결과를 data_dict에 바로 추가
-data_dict[str(pred_year)] = {label: {} for label in metrics.keys()}
-
-for region in regions:
-    region_data = df[df["region"] == region]
-    for label, col in metrics.items():
-        X = region_data[["year"]].values
-        y = region_data[col].values
-
-        if len(y) >= 2:  # 최소 2년 이상 있어야 예측 가능
-            model = RandomForestRegressor(n_estimators=200, random_state=42)
-            model.fit(X, y)
-            pred = float(model.predict([[pred_year]])[0])
-        else:
-            pred = None
-
-        data_dict[str(pred_year)][label][region] = pred
+data_dict.update(forecast)
 
 # 최종 연도 목록 (과거 + 예측)
 year_list_all = sorted(int(y) for y in data_dict.keys())
@@ -91,25 +112,62 @@ initial_metric = metric_keys[0]
 # ============================
 # 5) GeoJSON
 # ============================
-geo_url = "https://raw.githubusercontent.com/southkorea/southkorea-maps/master/kostat/2013/json/skorea_provinces_geo.json"
-geo_data = requests.get(geo_url).json()
+# 원본은 map/geo_cache/에 한 번만 받아 두고, 줌 단계에 맞게 단순화된 도형 사용
+geo_data, region_index = load_geometry(zoom=GEO_ZOOM)
+unmatched = sorted(set(df["region"]) - set(region_index))
+if unmatched:
+    print(f"[geo] 지도에 없는 지역 (색칠되지 않음): {unmatched}")
+
+# 증분 빌드: 데이터, 도형, 이 스크립트가 모두 그대로면 HTML을 다시 만들지 않음
+if build is not None:
+    changed = build.emit(
+        data_dict, geo_data, OUTPUT_MODE, Path(__file__).read_text(encoding="utf-8"), output_path=OUTPUT_HTML
+    )
+    if not changed:
+        print(f"변경 없음: {OUTPUT_HTML}")
+        sys.exit(0)
 
 # ============================
 # 6) 지도 생성
 # ============================
 m = folium.Map(location=[36.5, 127.8], zoom_start=7)
 
-geo_layer = folium.GeoJson(
-    geo_data,
-    name="region_layer",
-    style_function=lambda f: {
-        "fillColor": "white",
-        "color": "black",
-        "weight": 1,
-        "fillOpacity": 0.8,
-    },
-)
-geo_layer.add_to(m)
+if OUTPUT_MODE == "split":
+    # 데이터 조각: <연도>/<지표 번호>.json = regions 순서의 값 배열 (없으면 null), 내용이 같으면 다시 쓰지 않음
+    shard_regions = sorted(region_index)
+    shard_files = {OUTPUT_DIR / "geo.json": json.dumps(geo_data, ensure_ascii=False, separators=(",", ":"))}
+    for year, block in data_dict.items():
+        for i, label in enumerate(metric_keys):
+            values = block.get(label, {})
+            shard_files[OUTPUT_DIR / "data" / year / f"{i}.json"] = json.dumps(
+                [values.get(r) for r in shard_regions], separators=(",", ":")
+            )
+    written = 0
+    for path, text in shard_files.items():
+        if not path.exists() or path.read_text(encoding="utf-8") != text:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            written += 1
+    print(f"[split] shards={len(shard_files) - 1} written={written} -> {OUTPUT_DIR}/")
+
+    data_json = "{}"
+    shard_json = json.dumps(
+        {"path": "data", "regions": shard_regions, "metrics": metric_keys}, ensure_ascii=False
+    )
+    geo_url_json = json.dumps("geo.json")
+else:
+    geo_layer = folium.GeoJson(
+        geo_data,
+        name="region_layer",
+        style_function=lambda f: {
+            "fillColor": "white",
+            "color": "black",
+            "weight": 1,
+            "fillOpacity": 0.8,
+        },
+    )
+    geo_layer.add_to(m)
+    shard_json = geo_url_json = "null"
 
 # ============================
 # 7) JS 코드 (5단계 위험도 + 예측연도 + 차트)
@@ -118,7 +176,7 @@ geo_layer.add_to(m)
 # 연도 콤보박스 옵션 HTML (예측연도는 표시만 다르게)
 year_options_html = ""
 for y in year_list_all:
-    if y == pred_year:
+    if y in pred_years:
         year_options_html += f'<option value="{y}">{y} (예측)</option>'
     else:
         year_options_html += f'<option value="{y}">{y}</option>'
@@ -128,7 +186,44 @@ metric_options_html = ''.join([f'<option value="{k}">{k}</option>' for k in metr
 custom_js = f"""
 <script>
 var regionData = {data_json};
-var predYear = "{pred_year}";
+var yearList = {json.dumps([str(y) for y in year_list_all])};
+var predYears = {json.dumps([str(y) for y in pred_years])};
+var dataShards = {shard_json};   // 분할 출력일 때만: 조각 경로, 지역 순서, 지표 순서
+var geoUrl = {geo_url_json};     // 분할 출력일 때만: 도형 파일
+
+/////////////////////////////////////////////////////////////////////
+// 분할 출력: 연도/지표 조각을 처음 필요할 때 받아 regionData에 채움
+/////////////////////////////////////////////////////////////////////
+var shardRequests = {{}};
+
+function loadShard(year, metric) {{
+    if (!dataShards || (regionData[year] && regionData[year][metric])) {{
+        return Promise.resolve();
+    }}
+    var key = year + "|" + metric;
+    if (!shardRequests[key]) {{
+        var url = dataShards.path + "/" + year + "/" + dataShards.metrics.indexOf(metric) + ".json";
+        shardRequests[key] = fetch(url).then(function(resp) {{
+            if (!resp.ok) throw new Error(url + " " + resp.status);
+            return resp.json();
+        }}).then(function(values) {{
+            var block = {{}};
+            dataShards.regions.forEach(function(name, i) {{
+                if (values[i] !== null) block[name] = values[i];
+            }});
+            regionData[year] = regionData[year] || {{}};
+            regionData[year][metric] = block;
+        }}).catch(function(err) {{
+            delete shardRequests[key];  // 다음 선택 때 다시 시도
+            console.log("데이터 조각 로드 실패:", err);
+        }});
+    }}
+    return shardRequests[key];
+}}
+
+function isPredYear(year) {{
+    return predYears.indexOf(String(year)) >= 0;
+}}
 
 /////////////////////////////////////////////////////////////////////
 // 5단계 색상 기준 (고정 위험도 구간)
@@ -147,19 +242,59 @@ function getColor(value) {{
 /////////////////////////////////////////////////////////////////////
 // 지도 업데이트
 /////////////////////////////////////////////////////////////////////
-function updateMap() {{
-    var mapObj = null;
+// 지도 객체와 지역 이름 -> 레이어 목록은 한 번만 찾아 둠 (분할 출력이면 도형도 이때 받음)
+var mapObj = null;
+var layerIndexReady = null;
+
+function getLayerIndex() {{
+    if (layerIndexReady) return layerIndexReady;
     for (var k in window) {{
         if (window[k] instanceof L.Map) {{
             mapObj = window[k];
             break;
         }}
     }}
-    if (!mapObj) return;
+    if (!mapObj) return Promise.resolve(null);
+
+    var geoReady = Promise.resolve();
+    if (geoUrl) {{
+        geoReady = fetch(geoUrl).then(function(resp) {{ return resp.json(); }}).then(function(geo) {{
+            L.geoJSON(geo, {{
+                style: function() {{
+                    return {{ fillColor: "white", color: "black", weight: 1, fillOpacity: 0.8 }};
+                }}
+            }}).addTo(mapObj);
+        }});
+    }}
 
+    layerIndexReady = geoReady.then(function() {{
+        var layerIndex = {{}};
+        mapObj.eachLayer(function(layer) {{
+            if (layer.feature && layer.feature.properties && layer.setStyle) {{
+                var name = layer.feature.properties.name;
+                (layerIndex[name] = layerIndex[name] || []).push(layer);
+            }}
+        }});
+        return layerIndex;
+    }});
+    return layerIndexReady;
+}}
+
+function updateMap() {{
     var year = document.getElementById("yearSelect").value;
     var metric = document.getElementById("metricSelect").value;
 
+    Promise.all([getLayerIndex(), loadShard(year, metric)]).then(function(ready) {{
+        // 받는 사이에 선택이 바뀌었으면 새 선택의 updateMap이 칠함
+        if (document.getElementById("yearSelect").value !== year ||
+            document.getElementById("metricSelect").value !== metric) return;
+        paintMap(ready[0], year, metric);
+    }});
+}}
+
+function paintMap(index, year, metric) {{
+    if (!index) return;
+
     if (!regionData[year] || !regionData[year][metric]) {{
         console.log("선택된 연도/지표 데이터 없음");
         return;
@@ -171,7 +306,7 @@ function updateMap() {{
     var legendTitleElement = document.getElementById("colorBarTitle");
     if (legendTitleElement) {{
         var titleText = metric + " (" + year;
-        if (year === predYear) {{
+        if (isPredYear(year)) {{
             titleText += "년, 예측값";
         }} else {{
             titleText += "년";
@@ -180,10 +315,9 @@ function updateMap() {{
         legendTitleElement.innerText = titleText;
     }}
 
-    mapObj.eachLayer(function(layer) {{
-        if (layer.feature && layer.feature.properties && layer.setStyle) {{
-            let name = layer.feature.properties.name;
-            let val = selectedData[name];
+    Object.keys(index).forEach(function(name) {{
+        let val = selectedData[name];
+        index[name].forEach(function(layer) {{
 
             layer.off('mouseover').off('mouseout').off('click');
 
@@ -213,7 +347,7 @@ function updateMap() {{
                 layer.on("click", function(e) {{
                     // 팝업 + 그래프 둘 다
                     var currentYearLabel = year;
-                    if (year === predYear) {{
+                    if (isPredYear(year)) {{
                         currentYearLabel = year + " (예측)";
                     }}
                     var valueText = val.toFixed(2);
@@ -253,7 +387,7 @@ function updateMap() {{
                     showTrendChart(name, metric); // 그래프는 0으로 들어감
                 }});
             }}
-        }}
+        }});
     }});
 }}
 
@@ -261,17 +395,22 @@ function updateMap() {{
 // 오른쪽 차트 패널 + Chart.js 그래프 출력
 /////////////////////////////////////////////////////////////////////
 function showTrendChart(regionName, metric) {{
+    // 분할 출력이면 이 지표의 모든 연도 조각을 받은 뒤 그림
+    Promise.all(yearList.map(function(y) {{ return loadShard(y, metric); }})).then(function() {{
+        drawTrendChart(regionName, metric);
+    }});
+}}
+
+function drawTrendChart(regionName, metric) {{
     var panel = document.getElementById("infoPanel");
     panel.style.display = "block";
 
     // 연도 정렬 (숫자 기준)
-    var years = Object.keys(regionData).sort(function(a, b) {{
-        return parseInt(a) - parseInt(b);
-    }});
+    var years = yearList.slice();
 
     // 그래프용 라벨(예측연도는 표시만 다르게)
     var labels = years.map(function(y) {{
-        if (y === predYear) {{
+        if (isPredYear(y)) {{
             return y + " (예측)";
         }}
         return y;
@@ -289,7 +428,7 @@ function showTrendChart(regionName, metric) {{
     // 현재 콤보박스에서 선택된 연도 값 표시
     var currentYear = document.getElementById("yearSelect").value;
     var currentLabel = currentYear;
-    if (currentYear === predYear) {{
+    if (isPredYear(currentYear)) {{
         currentLabel = currentYear + " (예측)";
     }}
 
@@ -449,12 +588,12 @@ document.addEventListener("DOMContentLoaded", function() {{
     font-size:14px;
 ">
     <label><b>연도:</b></label>
-    <select id="yearSelect">
+    <select id="yearSelect" onchange="updateMap()">
         {year_options_html}
     </select>
 
     <label style="margin-left:8px;"><b>지표:</b></label>
-    <select id="metricSelect">
+    <select id="metricSelect" onchange="updateMap()">
         {metric_options_html}
     </select>
 
@@ -467,5 +606,18 @@ m.get_root().html.add_child(folium.Element(custom_js))
 # ============================
 # 저장
 # ============================
-m.save("지역_위험_지도.html")
-print("생성 완료: 지역_위험_지도.html")
\ No newline at end of file
+m.save(OUTPUT_HTML)
+print(f"생성 완료: {OUTPUT_HTML}")
+if OUTPUT_MODE == "split":
+    # 새 index.html이 가리키지 않는 이전 조각(없어진 연도/지표) 삭제 — index를 다 쓴 뒤에 지움
+    removed = 0
+    for path in sorted((OUTPUT_DIR / "data").rglob("*.json")):
+        if path not in shard_files:
+            path.unlink()
+            removed += 1
+    for year_dir in (OUTPUT_DIR / "data").iterdir():
+        if year_dir.is_dir() and not any(year_dir.iterdir()):
+            year_dir.rmdir()
+    print(f"[split] stale shards removed={removed}")
+if build is not None:
+    build.save(OUTPUT_HTML)
\ No newline at end of file
@@ -0,0 +1,140 @@
+# map/data_store.py
+# 엑셀 시트 읽기 앞단의 열 기반 캐시 (danger_map.py, xgbosst_model.py 공용)
+#  - 처음 한 번만 pd.read_excel로 읽어 data_cache/<파일명>.<해시 앞 16자>.<시트>.parquet 로 저장
+#    (pyarrow가 없으면 같은 이름의 .pkl — 선택 의존성)
+#  - 캐시 키: 원본의 (크기, mtime)가 manifest와 같으면 해시도 다시 안 읽음, 다르면 sha256을 다시 계산해
+#    내용이 같으면(복사/터치만 된 경우) 기존 캐시를 그대로 씀
+#  - year + region으로 병합한 표도 같이 저장, region은 category dtype
+#  - 시트/병합표는 처음 요청될 때 읽음 (프로세스 안에서는 한 번만)
+#
+#   ds = open_dataset(BASE_DIR / "mental_socioeconomic_dataset.xlsx")
+#   df = ds.merged("mental_health_status", "socioeconomic_status")
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.environ.get("MAP_DATA_CACHE", BASE_DIR / "data_cache"))
+MERGE_KEYS = ("year", "region")
+CATEGORY_COLUMNS = ("region",)
+
+
+def _columnar():
+    """parquet 엔진이 있으면 (확장자, 쓰기, 읽기), 없으면 pickle"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ".pkl", pd.DataFrame.to_pickle, pd.read_pickle
+    return ".parquet", lambda df, path: df.to_parquet(path, index=False), pd.read_parquet
+
+
+def file_sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+class Dataset:
+    """엑셀 파일 하나에 대한 캐시 접근자 (시트별 / 병합표)"""
+
+    def __init__(self, source: Path, cache_dir: Path = CACHE_DIR):
+        self.source = Path(source)
+        self.cache_dir = Path(cache_dir)
+        self.ext, self._write, self._read = _columnar()
+        self._sha: Optional[str] = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    # ---------------- 키 ----------------
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / "manifest.json"
+
+    def _manifest(self) -> dict:
+        path = self.manifest_path
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    @property
+    def sha(self) -> str:
+        """원본 내용 해시 ((크기, mtime)가 그대로면 manifest 값 재사용)"""
+        if self._sha is None:
+            st = self.source.stat()  # 없으면 FileNotFoundError (호출 쪽에서 처리)
+            key = str(self.source.resolve())
+            manifest = self._manifest()
+            entry = manifest.get(key)
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                self._sha = entry["sha256"]
+            else:
+                self._sha = file_sha256(self.source)
+                manifest[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": self._sha}
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = self.manifest_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.manifest_path)
+        return self._sha
+
+    def cache_path(self, name: str) -> Path:
+        return self.cache_dir / f"{self.source.stem}.{self.sha[:16]}.{name}{self.ext}"
+
+    # ---------------- 읽기 ----------------
+    def _cached(self, name: str, build) -> pd.DataFrame:
+        if name in self._frames:
+            return self._frames[name]
+        path = self.cache_path(name)
+        t0 = time.perf_counter()
+        if path.exists():
+            df = self._read(path)
+            how = "cache"
+        else:
+            df = build()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            self._write(df, tmp)
+            os.replace(tmp, path)
+            how = "excel"
+        print(f"[data] {self.source.name}:{name} {df.shape} from {how} in {time.perf_counter() - t0:.3f}s")
+        self._frames[name] = df
+        return df
+
+    def sheet(self, name: str) -> pd.DataFrame:
+        return self._cached(name, lambda: _categorize(pd.read_excel(self.source, sheet_name=name)))
+
+    def merged(self, *sheets: str, on: Sequence[str] = MERGE_KEYS) -> pd.DataFrame:
+        """시트들을 on 기준 내부 조인 (겹치는 열은 pandas 기본 _x/_y 접미사)"""
+        name = "+".join(sheets)
+
+        def build():
+            frames = [self.sheet(s) for s in sheets]
+            # category끼리는 범주 집합이 달라도 병합되도록 문자열로 맞춘 뒤 다시 category로
+            frames = [f.astype({c: "object" for c in CATEGORY_COLUMNS if c in f.columns}) for f in frames]
+            df = frames[0]
+            for other in frames[1:]:
+                df = pd.merge(df, other, on=list(on))
+            return _categorize(df)
+
+        return self._cached(name, build)
+
+
+_datasets: Dict[Tuple[str, str], Dataset] = {}
+
+
+def open_dataset(source: Path, cache_dir: Path = CACHE_DIR) -> Dataset:
+    """같은 파일은 같은 Dataset (읽은 표를 프로세스 안에서 공유)"""
+    key = (str(Path(source).resolve()), str(Path(cache_dir).resolve()))
+    if key not in _datasets:
+        _datasets[key] = Dataset(source, cache_dir)
+    return _datasets[key]
@@ -0,0 +1,197 @@
+# map/forecast.py
+# 지역 x 지표 시계열을 한 번에 예측하는 모듈 (danger_map.py의 다음 해 예측용)
+#  - (지표, 지역)마다 한 행, 연도마다 한 열인 행렬 Y를 만들어 모든 시계열을 벡터 연산으로 동시에 적합
+#      linear    — 최소제곱 직선 (닫힌 해)
+#      theil_sen — 두 점 기울기들의 중앙값 (이상치에 강한 직선)
+#      holt      — Holt 선형 지수평활 (수준 + 추세)
+#      rf        — 기존 방식: 시계열마다 RandomForestRegressor(200) (느림, 비교용)
+#  - horizons=(1, 2, 3)이면 마지막 연도 +1, +2, +3년을 한꺼번에 예측
+#  - n_jobs > 1이면 행을 나눠 joblib으로 병렬 처리 (rf는 시계열 단위)
+#  - 관측이 min_points(기본 2)개 미만인 시계열은 None
+
+import time
+import warnings
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("linear", "theil_sen", "holt", "rf")
+
+
+# ---------------- 행렬 ----------------
+def series_matrix(
+    df: pd.DataFrame,
+    metrics: Dict[str, str],
+    year_col: str = "year",
+    region_col: str = "region"
+) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]:
+    """
+    긴 형식 df -> (행 키 [(지표 라벨, 지역)], 연도 (T,), Y (n, T))
+    연도는 최소~최대를 빠짐없이 채우고, 값이 없는 칸(빠진 해 포함)은 NaN. 같은 (연도, 지역)이 여러 번 있으면 평균.
+    """
+    cols = list(metrics.values())
+    regions = pd.unique(df[region_col])
+    years = np.arange(int(df[year_col].min()), int(df[year_col].max()) + 1)
+
+    long = df.melt(id_vars=[year_col, region_col], value_vars=cols, var_name="metric")
+    wide = long.pivot_table(index=["metric", region_col], columns=year_col, values="value", aggfunc="mean")
+    wide = wide.reindex(
+        index=pd.MultiIndex.from_product([cols, regions], names=["metric", region_col]),
+        columns=years,
+    )
+
+    label_of = {col: label for label, col in metrics.items()}
+    keys = [(label_of[col], region) for col, region in wide.index]
+    return keys, years, wide.to_numpy(dtype=np.float64)
+
+
+# ---------------- 방법별 (Y (n, T) -> 예측 (n, H)) ----------------
+def _ols(Y: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """행마다 관측된 칸만으로 최소제곱 -> (x 평균, y 평균, 기울기), 관측이 1개 이하면 기울기 NaN"""
+    W = ~np.isnan(Y)
+    n = W.sum(axis=1)
+    Yz = np.where(W, Y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xm = (W * x).sum(axis=1) / n
+        ym = Yz.sum(axis=1) / n
+        dx = np.where(W, x - xm[:, None], 0.0)
+        slope = (dx * (Yz - ym[:, None])).sum(axis=1) / (dx ** 2).sum(axis=1)
+    return xm, ym, slope
+
+
+def _linear(Y: np.ndarray, x: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    xm, ym, slope = _ols(Y, x)
+    return ym[:, None] + slope[:, None] * (targets[None, :] - xm[:, None])
+
+
+def _theil_sen(Y: np.ndarray, x: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    i, j = np.triu_indices(len(x), k=1)
+    slopes = (Y[:, j] - Y[:, i]) / (x[j] - x[i])   # 빠진 해가 끼면 NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 관측 1개 이하인 행 (All-NaN)
+        slope = np.nanmedian(slopes, axis=1)
+        # 절편 = median(y) - 기울기 * median(x) (관측된 해만, scipy.stats.theilslopes와 같음)
+        x_obs = np.where(np.isnan(Y), np.nan, x)
+        intercept = np.nanmedian(Y, axis=1) - slope * np.nanmedian(x_obs, axis=1)
+    return intercept[:, None] + slope[:, None] * targets[None, :]
+
+
+def _holt(
+    Y: np.ndarray,
+    x: np.ndarray,
+    targets: np.ndarray,
+    alpha: float = 0.5,
+    beta: float = 0.3
+) -> np.ndarray:
+    """연 단위 Holt 평활. 첫 관측을 수준, 최소제곱 기울기를 추세 초깃값으로 두고 빠진 해는 예측값으로 건너뜀"""
+    W = ~np.isnan(Y)
+    first = np.where(W.any(axis=1), W.argmax(axis=1), Y.shape[1])
+    rows = np.arange(len(Y))
+    level = Y[rows, np.minimum(first, Y.shape[1] - 1)]
+    trend = np.nan_to_num(_ols(Y, x)[2])
+
+    for t in range(Y.shape[1]):
+        active = t > first
+        pred = level + trend
+        upd = active & W[:, t]
+        new_level = np.where(upd, alpha * Y[:, t] + (1 - alpha) * pred, np.where(active, pred, level))
+        trend = np.where(upd, beta * (new_level - level) + (1 - beta) * trend, trend)
+        level = new_level
+    return level[:, None] + trend[:, None] * (targets[None, :] - x[-1])
+
+
+def _rf_one(y: np.ndarray, x: np.ndarray, targets: np.ndarray, n_estimators: int, random_state: int) -> np.ndarray:
+    from sklearn.ensemble import RandomForestRegressor
+
+    ok = ~np.isnan(y)
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
+    model.fit(x[ok].reshape(-1, 1), y[ok])
+    return model.predict(targets.reshape(-1, 1))
+
+
+def _rf(
+    Y: np.ndarray,
+    x: np.ndarray,
+    targets: np.ndarray,
+    n_estimators: int = 200,
+    random_state: int = 42
+) -> np.ndarray:
+    out = np.full((len(Y), len(targets)), np.nan)
+    for r in np.flatnonzero((~np.isnan(Y)).sum(axis=1) >= 2):
+        out[r] = _rf_one(Y[r], x, targets, n_estimators, random_state)
+    return out
+
+
+_METHOD_FN = {"linear": _linear, "theil_sen": _theil_sen, "holt": _holt, "rf": _rf}
+
+
+# ---------------- 예측 ----------------
+def forecast_matrix(
+    Y: np.ndarray,
+    years: np.ndarray,
+    horizons: Sequence[int] = (1,),
+    method: str = "theil_sen",
+    n_jobs: int = 1,
+    min_points: int = 2,
+    lower: float = 0.0,
+    **params
+) -> np.ndarray:
+    """
+    Y (n, T), years (T,) -> 마지막 연도 + h 예측 (n, len(horizons)).
+    lower: 예측값 하한 (비율/지표는 음수가 되지 않도록, None이면 자르지 않음)
+    params: 방법별 인자 (holt: alpha, beta / rf: n_estimators, random_state)
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown forecast method: {method} (expected one of {METHODS})")
+    Y = np.asarray(Y, dtype=np.float64)
+    # 마지막 연도를 0으로 (연도 값 그대로 쓰면 절편 계산에서 자릿수 손실)
+    x = np.asarray(years, dtype=np.float64) - float(years[-1])
+    targets = np.asarray(horizons, dtype=np.float64)
+    fn = _METHOD_FN[method]
+
+    if n_jobs == 1 or len(Y) < 2:
+        out = fn(Y, x, targets, **params)
+    else:
+        from joblib import Parallel, delayed, effective_n_jobs
+
+        # 벡터 방법은 numpy가 GIL을 풀므로 스레드, rf는 프로세스
+        backend = "loky" if method == "rf" else "threading"
+        n_chunks = min(len(Y), effective_n_jobs(n_jobs) * (4 if method == "rf" else 1))
+        chunks = np.array_split(np.arange(len(Y)), n_chunks)
+        parts = Parallel(n_jobs=n_jobs, backend=backend)(
+            delayed(fn)(Y[idx], x, targets, **params) for idx in chunks
+        )
+        out = np.concatenate(parts, axis=0)
+
+    out[(~np.isnan(Y)).sum(axis=1) < min_points] = np.nan
+    if lower is not None:
+        out = np.where(np.isnan(out), out, np.maximum(out, lower))
+    return out
+
+
+def forecast_frame(
+    df: pd.DataFrame,
+    metrics: Dict[str, str],
+    horizons: Sequence[int] = (1,),
+    method: str = "theil_sen",
+    n_jobs: int = 1,
+    **kwargs
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    danger_map의 data_dict 형식으로 예측: {"연도": {지표 라벨: {지역: 값 또는 None}}}
+    """
+    t0 = time.perf_counter()
+    keys, years, Y = series_matrix(df, metrics)
+    pred = forecast_matrix(Y, years, horizons, method, n_jobs, **kwargs)
+
+    out = {}
+    for h_i, h in enumerate(horizons):
+        block = out[str(int(years[-1]) + int(h))] = {label: {} for label in metrics}
+        for (label, region), v in zip(keys, pred[:, h_i].tolist()):
+            block[label][region] = None if np.isnan(v) else float(v)
+    print(
+        f"[forecast] method={method} series={len(keys)} years={years[0]}-{years[-1]} "
+        f"horizons={list(horizons)} in {time.perf_counter() - t0:.3f}s"
+    )
+    return out
@@ -0,0 +1,293 @@
+# map/geo_cache.py
+# 지도용 GeoJSON 캐시 + 줌 단계별 단순화 도형
+#  - 원본은 한 번만 내려받아 내용 해시(sha256)로 저장: geo_cache/<해시 앞 16자>.geojson
+#    (url -> 해시는 geo_cache/index.json, 오프라인이면 마지막으로 받은 파일 사용, MAP_GEO_FILE로 로컬 파일 지정 가능
+#     — index에 없으면(MAP_GEO_FILE로만 채운 캐시) 가장 최근 원본 파일 사용)
+#  - 줌 레벨마다 Douglas-Peucker 단순화 결과를 미리 만들어 둠: <해시>.z<줌>.geojson
+#    이웃한 지역이 공유하는 경계는 교차점 사이 구간(arc)으로 잘라 한 번만 단순화 -> 양쪽이 같은 선을 써서 틈/겹침 없음
+#  - 지역 이름 -> feature 번호 색인도 같이 저장: <해시>.meta.json
+#
+#   geo, index = load_geometry(zoom=7)
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / "geo_cache"
+GEO_URL = os.environ.get(
+    "MAP_GEO_URL",
+    "https://raw.githubusercontent.com/southkorea/southkorea-maps/master/kostat/2013/json/skorea_provinces_geo.json",
+)
+GEO_FILE = os.environ.get("MAP_GEO_FILE", "")  # 지정하면 내려받지 않고 이 파일을 원본으로 사용
+
+ZOOMS = (5, 7, 9, 11)
+PRECISION = 5          # 좌표 소수 자리 (1e-5도 ~ 1m)
+NAME_KEY = "name"
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """Web 메르카토르 256px 타일에서 반 픽셀 크기(도)"""
+    return 360.0 / (256 * 2 ** zoom) / 2
+
+
+# ---------------- 원본 캐시 ----------------
+def _read_index(cache_dir: Path) -> dict:
+    path = cache_dir / "index.json"
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _write_index(cache_dir: Path, index: dict):
+    tmp = cache_dir / "index.json.tmp"
+    tmp.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, cache_dir / "index.json")
+
+
+def _store(cache_dir: Path, raw: bytes) -> str:
+    sha = hashlib.sha256(raw).hexdigest()
+    path = cache_dir / f"{sha[:16]}.geojson"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+    return sha
+
+
+def _latest_raw(cache_dir: Path):
+    """캐시의 원본 <해시 앞 16자>.geojson 중 가장 최근 것 -> (경로, sha256), 없으면 None"""
+    raws = [p for p in cache_dir.glob("*.geojson") if "." not in p.stem]
+    if not raws:
+        return None
+    path = max(raws, key=lambda p: p.stat().st_mtime)
+    return path, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def fetch_geojson(
+    url: str = GEO_URL,
+    cache_dir: Path = CACHE_DIR,
+    refresh: bool = False,
+    local_file: str = GEO_FILE
+) -> Tuple[Path, str]:
+    """원본 GeoJSON -> (캐시 파일 경로, sha256). 캐시에 있으면 네트워크 없이 바로 반환"""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    if local_file:
+        sha = _store(cache_dir, Path(local_file).read_bytes())
+        return cache_dir / f"{sha[:16]}.geojson", sha
+
+    index = _read_index(cache_dir)
+    entry = index.get(url)
+    cached = cache_dir / f"{entry['sha256'][:16]}.geojson" if entry else None
+    if cached is not None and cached.exists() and not refresh:
+        return cached, entry["sha256"]
+
+    import requests
+
+    try:
+        t0 = time.perf_counter()
+        resp = requests.get(url, timeout=30)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        if cached is not None and cached.exists():
+            print(f"[geo] 내려받기 실패, 캐시 사용: {e}")
+            return cached, entry["sha256"]
+        latest = _latest_raw(cache_dir)
+        if latest is not None:
+            # index에 없는 원본 (MAP_GEO_FILE로 채운 캐시 등) -> 가장 최근 파일
+            print(f"[geo] 내려받기 실패, 가장 최근 원본 사용 ({latest[0].name}): {e}")
+            return latest
+        raise RuntimeError(f"GeoJSON을 받을 수 없고 캐시도 없음 (MAP_GEO_FILE로 로컬 파일 지정): {e}") from e
+
+    sha = _store(cache_dir, resp.content)
+    index[url] = {"sha256": sha, "bytes": len(resp.content), "fetched_at": time.time()}
+    _write_index(cache_dir, index)
+    print(f"[geo] fetched {len(resp.content) / 1024:.0f}KB in {time.perf_counter() - t0:.2f}s -> {sha[:16]}")
+    return cache_dir / f"{sha[:16]}.geojson", sha
+
+
+# ---------------- 단순화 ----------------
+def douglas_peucker(pts: np.ndarray, tol: float) -> np.ndarray:
+    """열린 선 (n, 2) -> 남길 점 마스크 (양 끝점은 항상 남김)"""
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = pts[i], pts[j]
+        seg = pts[i + 1:j] - a
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            d = np.hypot(seg[:, 0], seg[:, 1])
+        else:
+            d = np.abs(ab[0] * seg[:, 1] - ab[1] * seg[:, 0]) / norm
+        k = int(np.argmax(d))
+        if d[k] > tol:
+            m = i + 1 + k
+            keep[m] = True
+            stack += [(i, m), (m, j)]
+    return keep
+
+
+def _rings(geometry: dict) -> List[List[list]]:
+    """Polygon/MultiPolygon -> 폴리곤별 링 목록 [[외곽, 구멍...], ...]"""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"unsupported geometry: {geometry['type']}")
+
+
+def _open_ring(ring) -> List[tuple]:
+    pts = [tuple(p[:2]) for p in ring]
+    return pts[:-1] if len(pts) > 1 and pts[0] == pts[-1] else pts
+
+
+def simplify_features(
+    features: Sequence[dict],
+    tolerance: float,
+    precision: int = PRECISION,
+    keep_properties: Sequence[str] = (NAME_KEY,)
+) -> List[dict]:
+    """
+    경계를 공유하는 폴리곤들을 같은 결과로 단순화.
+    점마다 그 점을 지나는 링 집합을 구하고, 링 집합이 바뀌는 점(교차점/해안선 시작)을 고정점으로 삼아
+    링을 고정점 사이 구간으로 자름 -> 같은 구간은 방향과 상관없이 한 번만 단순화해서 재사용.
+    """
+    # 1) 링 목록과 점별 링 집합
+    rings = []  # (feature 번호, 폴리곤 번호, 링 번호, 점 목록)
+    for fi, feat in enumerate(features):
+        for pi, poly in enumerate(_rings(feat["geometry"])):
+            for ri, ring in enumerate(poly):
+                rings.append((fi, pi, ri, _open_ring(ring)))
+    owners: Dict[tuple, set] = {}
+    for r_id, (_, _, _, pts) in enumerate(rings):
+        for p in pts:
+            owners.setdefault(p, set()).add(r_id)
+
+    # 2) 구간별 단순화 (정방향/역방향 중 작은 쪽을 키로 캐시)
+    arc_cache: Dict[tuple, List[tuple]] = {}
+
+    def simplify_arc(arc: List[tuple]) -> List[tuple]:
+        fwd = tuple(arc)
+        rev = fwd[::-1]
+        key, reverse = (fwd, False) if fwd <= rev else (rev, True)
+        out = arc_cache.get(key)
+        if out is None:
+            pts = np.asarray(key, dtype=np.float64)
+            out = arc_cache[key] = [key[i] for i in np.flatnonzero(douglas_peucker(pts, tolerance))]
+        return out[::-1] if reverse else out
+
+    simplified = {}
+    for r_id, (fi, pi, ri, pts) in enumerate(rings):
+        n = len(pts)
+        fixed = [
+            i for i in range(n)
+            if owners[pts[i]] != owners[pts[i - 1]] or owners[pts[i]] != owners[pts[(i + 1) % n]]
+        ]
+        if not fixed:
+            # 공유하지 않는 링(섬 등): 시작점과 가장 먼 점에서 나눔
+            p = np.asarray(pts)
+            fixed = [0, int(np.argmax(np.hypot(*(p - p[0]).T)))] if n > 2 else [0]
+        out = []
+        for a, b in zip(fixed, fixed[1:] + [fixed[0] + n]):
+            arc = [pts[i % n] for i in range(a, b + 1)]
+            out += simplify_arc(arc)[:-1]
+        simplified[(fi, pi, ri)] = out
+
+    # 3) 다시 조립 (너무 작아져 링이 안 되는 섬/구멍은 버림)
+    result = []
+    for fi, feat in enumerate(features):
+        polys = []
+        for pi, poly in enumerate(_rings(feat["geometry"])):
+            new_poly = []
+            for ri in range(len(poly)):
+                pts = simplified[(fi, pi, ri)]
+                if len(set(pts)) < 3:
+                    if ri == 0:
+                        break
+                    continue
+                coords = [[round(x, precision), round(y, precision)] for x, y in pts]
+                new_poly.append(coords + [coords[0]])
+            if new_poly:
+                polys.append(new_poly)
+        if not polys:
+            # 전부 사라지면 원래 도형 유지 (지역이 지도에서 없어지지 않도록)
+            polys = [[[[round(x, precision), round(y, precision)] for x, y in ring[:]] for ring in poly]
+                     for poly in _rings(feat["geometry"])]
+        geometry = (
+            {"type": "Polygon", "coordinates": polys[0]} if len(polys) == 1
+            else {"type": "MultiPolygon", "coordinates": polys}
+        )
+        props = {k: v for k, v in feat.get("properties", {}).items() if k in keep_properties}
+        result.append({"type": "Feature", "properties": props, "geometry": geometry})
+    return result
+
+
+def count_vertices(features: Sequence[dict]) -> int:
+    return sum(len(ring) for f in features for poly in _rings(f["geometry"]) for ring in poly)
+
+
+# ---------------- 색인 ----------------
+def region_index(features: Sequence[dict], key: str = NAME_KEY) -> Dict[str, List[int]]:
+    """지역 이름 -> feature 번호 목록 (같은 이름이 여러 feature로 나뉘어 있을 수 있음)"""
+    index: Dict[str, List[int]] = {}
+    for i, f in enumerate(features):
+        index.setdefault(str(f.get("properties", {}).get(key)), []).append(i)
+    return index
+
+
+# ---------------- 진입점 ----------------
+def build_cache(
+    src: Path,
+    sha: str,
+    zooms: Sequence[int] = ZOOMS,
+    precision: int = PRECISION,
+    cache_dir: Path = CACHE_DIR
+) -> dict:
+    """원본 하나에 대해 줌별 단순화 파일과 meta.json(색인, 점 수)을 만듦"""
+    t0 = time.perf_counter()
+    features = json.loads(Path(src).read_text(encoding="utf-8"))["features"]
+    meta = {
+        "sha256": sha,
+        "zooms": {},
+        "vertices": {"full": count_vertices(features)},
+        "index": region_index(features),
+    }
+    for z in zooms:
+        out = simplify_features(features, tolerance_for_zoom(z), precision)
+        path = Path(cache_dir) / f"{sha[:16]}.z{z}.geojson"
+        path.write_text(
+            json.dumps({"type": "FeatureCollection", "features": out}, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        meta["zooms"][str(z)] = {"file": path.name, "tolerance": tolerance_for_zoom(z), "bytes": path.stat().st_size}
+        meta["vertices"][f"z{z}"] = count_vertices(out)
+    (Path(cache_dir) / f"{sha[:16]}.meta.json").write_text(
+        json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    print(
+        f"[geo] simplified {sha[:16]} in {time.perf_counter() - t0:.2f}s  vertices "
+        + "  ".join(f"{k}={v:,}" for k, v in meta["vertices"].items())
+    )
+    return meta
+
+
+def load_geometry(zoom: int = 7, url: str = GEO_URL, cache_dir: Path = CACHE_DIR) -> Tuple[dict, Dict[str, List[int]]]:
+    """(단순화된 FeatureCollection, 지역 이름 색인) — 없는 캐시만 새로 만듦"""
+    cache_dir = Path(cache_dir)
+    src, sha = fetch_geojson(url, cache_dir)
+    meta_path = cache_dir / f"{sha[:16]}.meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else None
+    if meta is None or str(zoom) not in meta["zooms"] or not (cache_dir / meta["zooms"][str(zoom)]["file"]).exists():
+        meta = build_cache(src, sha, sorted(set(ZOOMS) | {zoom}), cache_dir=cache_dir)
+    geo = json.loads((cache_dir / meta["zooms"][str(zoom)]["file"]).read_text(encoding="utf-8"))
+    return geo, meta["index"]
@@ -0,0 +1,184 @@
+# map/incremental.py
+# danger_map.py 증분 빌드 (MAP_INCREMENTAL=1)
+#  - 입력 행을 (연도, 지역, 지표) 단위로 지문(sha1)을 떠서 build_cache/state.json에 저장
+#  - 과거 데이터: 연도별 블록 {지표: {지역: 값}}을 그 연도 행 지문이 같으면 그대로 재사용
+#  - 예측: (지표, 지역) 시계열마다 키 = 방법/인자/예측 연도 + 관측된 (연도, 값) 목록
+#          캐시에 없는 시계열만 forecast_matrix로 다시 계산 (방법들이 모두 행 단위로 독립이라 결과 동일)
+#  - 합친 data_dict는 build_cache/region_data.json으로 다시 씀, 출력 지문이 같고 HTML이 지난번에 쓴 그대로면
+#    HTML도 다시 쓰지 않음 (상태는 HTML을 다 쓴 뒤에 저장 -> 중간에 멈추면 다음 실행이 다시 생성)
+#
+#   MAP_INCREMENTAL=1 python danger_map.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from forecast import forecast_matrix, series_matrix
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.environ.get("MAP_BUILD_CACHE", BASE_DIR / "build_cache"))
+STATE_VERSION = 1
+
+
+def _sha1(obj) -> str:
+    return hashlib.sha1(json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _file_sha1(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def _value(v) -> Optional[float]:
+    return None if pd.isna(v) else float(v)
+
+
+def row_fingerprints(df: pd.DataFrame, metrics: Dict[str, str]) -> Dict[str, str]:
+    """'연도|지역|지표 라벨' -> 값 지문 (같은 칸이 여러 행이면 값 목록 전체)"""
+    cols = list(metrics.values())
+    long = df.melt(id_vars=["year", "region"], value_vars=cols, var_name="metric").dropna(subset=["region"])
+    label_of = {col: label for label, col in metrics.items()}
+    fps = {}
+    for (year, region, col), vals in long.groupby(["year", "region", "metric"], observed=True, sort=True)["value"]:
+        fps[f"{int(year)}|{region}|{label_of[col]}"] = _sha1([_value(v) for v in vals])
+    return fps
+
+
+class IncrementalBuild:
+    """build_cache/state.json 하나로 이전 빌드의 지문/블록/예측을 들고 있는 빌더"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.state_path = self.cache_dir / "state.json"
+        state = json.loads(self.state_path.read_text(encoding="utf-8")) if self.state_path.exists() else {}
+        if state.get("version") != STATE_VERSION:
+            state = {}
+        self.prev_rows: Dict[str, str] = state.get("rows", {})
+        self.prev_years: Dict[str, dict] = state.get("years", {})
+        self.prev_forecasts: Dict[str, list] = state.get("forecasts", {})
+        self.prev_output: Optional[str] = state.get("output")
+        self.prev_html: Optional[str] = state.get("html")
+
+        self.rows: Dict[str, str] = {}
+        self.years: Dict[str, dict] = {}
+        self.forecasts: Dict[str, list] = {}
+        self.output: Optional[str] = None
+        self.stats = {}
+
+    # ---------------- 과거 데이터 ----------------
+    def observed(self, df: pd.DataFrame, metrics: Dict[str, str]) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{"연도": {지표 라벨: {지역: 값}}} — 행 지문이 그대로인 연도는 이전 블록 사용"""
+        self.rows = row_fingerprints(df, metrics)
+        changed = {k for k in self.rows.keys() | self.prev_rows.keys() if self.rows.get(k) != self.prev_rows.get(k)}
+
+        by_year: Dict[str, list] = {}
+        for key, fp in self.rows.items():
+            by_year.setdefault(key.split("|", 1)[0], []).append((key, fp))
+
+        data_dict, rebuilt = {}, []
+        for year in sorted(df["year"].unique()):
+            y = str(int(year))
+            fp = _sha1([sorted(by_year.get(y, [])), list(metrics)])
+            prev = self.prev_years.get(y)
+            if prev is not None and prev["fp"] == fp:
+                block = prev["block"]
+            else:
+                year_df = df[df["year"] == year]
+                block = {}
+                for label, col in metrics.items():
+                    vals = year_df[["region", col]].dropna()
+                    block[label] = dict(zip(vals["region"], vals[col]))
+                rebuilt.append(y)
+            self.years[y] = {"fp": fp, "block": block}
+            data_dict[y] = block
+
+        self.stats.update(rows=len(self.rows), rows_changed=len(changed), years_rebuilt=rebuilt)
+        return data_dict
+
+    # ---------------- 예측 ----------------
+    def forecast(
+        self,
+        df: pd.DataFrame,
+        metrics: Dict[str, str],
+        horizons: Sequence[int] = (1,),
+        method: str = "theil_sen",
+        n_jobs: int = 1,
+        **kwargs
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """forecast.forecast_frame과 같은 형식, 캐시에 없는 시계열만 계산"""
+        t0 = time.perf_counter()
+        keys, years, Y = series_matrix(df, metrics)
+        targets = [int(years[-1]) + int(h) for h in horizons]
+        spec = {"method": method, "targets": targets, "params": kwargs}
+
+        series_keys = []
+        for row in Y:
+            ok = ~np.isnan(row)
+            series_keys.append(_sha1([spec, years[ok].tolist(), row[ok].tolist()]))
+
+        todo = [i for i, k in enumerate(series_keys) if k not in self.prev_forecasts]
+        pred = np.full((len(keys), len(targets)), np.nan)
+        if todo:
+            pred[todo] = forecast_matrix(Y[todo], years, horizons, method, n_jobs, **kwargs)
+        for i, k in enumerate(series_keys):
+            if i in todo:
+                self.forecasts[k] = [None if np.isnan(v) else float(v) for v in pred[i]]
+            else:
+                self.forecasts[k] = self.prev_forecasts[k]
+                pred[i] = [np.nan if v is None else v for v in self.forecasts[k]]
+
+        out = {}
+        for h_i, year in enumerate(targets):
+            block = out[str(year)] = {label: {} for label in metrics}
+            for (label, region), v in zip(keys, pred[:, h_i].tolist()):
+                block[label][region] = None if np.isnan(v) else float(v)
+
+        self.stats.update(series=len(keys), series_recomputed=len(todo))
+        print(
+            f"[forecast] method={method} series={len(keys)} recomputed={len(todo)} "
+            f"horizons={list(horizons)} in {time.perf_counter() - t0:.3f}s"
+        )
+        return out
+
+    # ---------------- 출력 ----------------
+    def emit(self, data_dict: dict, *inputs, output_path: Path = None) -> bool:
+        """
+        합친 data_dict를 region_data.json으로 쓰고 출력 지문 계산 (상태는 아직 저장하지 않음 -> save()).
+        inputs: 출력에 영향을 주는 나머지 값(도형 등) — 데이터와 함께 이전과 같고
+        output_path(HTML)가 이전 빌드가 쓴 그대로면 False (HTML 다시 쓸 필요 없음)
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_json = json.dumps(data_dict, ensure_ascii=False, sort_keys=True)
+        (self.cache_dir / "region_data.json").write_text(data_json, encoding="utf-8")
+        self.output = _sha1([data_json, list(inputs)])
+        changed = self.output != self.prev_output
+        if not changed and output_path is not None:
+            # 이전 빌드가 HTML을 다 쓰기 전에 중단됐거나 누가 지우고/고쳤으면 다시 생성
+            changed = not Path(output_path).exists() or _file_sha1(output_path) != self.prev_html
+        print(
+            f"[build] rows changed={self.stats.get('rows_changed')}/{self.stats.get('rows')} "
+            f"years rebuilt={self.stats.get('years_rebuilt')} "
+            f"series recomputed={self.stats.get('series_recomputed')}/{self.stats.get('series')} "
+            f"output {'changed' if changed else 'unchanged'}"
+        )
+        return changed
+
+    def save(self, output_path: Path = None):
+        """출력(HTML)을 다 쓴 뒤 호출 — 상태와 함께 그 파일의 지문을 저장"""
+        state = {
+            "version": STATE_VERSION,
+            "rows": self.rows,
+            "years": self.years,
+            "forecasts": self.forecasts,   # 이번 빌드에서 쓴 시계열만 남김
+            "output": self.output,
+            "html": _file_sha1(output_path) if output_path is not None else None,
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
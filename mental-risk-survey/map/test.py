@@ -1,10 +1,14 @@
 import json
-import requests
 
-geo_url = "https://raw.githubusercontent.com/southkorea/southkorea-maps/master/kostat/2013/json/skorea_provinces_geo.json"
+from geo_cache import fetch_geojson, load_geometry
 
-response = requests.get(geo_url)
-geo_data = response.json()
+# 원본 (map/geo_cache/에 한 번만 받아 둔 파일)
+src, sha = fetch_geojson()
+geo_data = json.loads(src.read_text(encoding="utf-8"))
 
 for f in geo_data["features"]:
     print(f["properties"])
+
+# 단순화된 도형 + 지역 이름 색인
+simplified, index = load_geometry(zoom=7)
+print(sha[:16], {name: ids for name, ids in index.items()})
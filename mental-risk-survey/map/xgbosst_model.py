@@ -2,17 +2,14 @@ from xgboost import XGBRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 import numpy as np
-import pandas as pd
 
+from data_store import BASE_DIR, open_dataset
 
-# 엑셀 파일 로드
-file_path = "../mental_health_data.xlsx"
 
-mental = pd.read_excel(file_path, sheet_name="mental_health_stats")
-socio = pd.read_excel(file_path, sheet_name="socioeconomic_stats")
+# 엑셀 파일 로드 (map/data_cache/에 캐시된 병합표, year + region 기준)
+file_path = BASE_DIR / "mental_health_data.xlsx"
 
-# year + region 기준으로 병합
-df = pd.merge(mental, socio, on=["year", "region"])
+df = open_dataset(file_path).merged("mental_health_stats", "socioeconomic_stats")
 
 # 예측 목표(Y)
 target = "youth_suicide_rate"
@@ -0,0 +1,125 @@
+# ml/fused_model.py
+# 세 라벨(suicidal/depression/stress)의 CalibratedClassifierCV를 하나로 합친 서빙용 아티팩트
+#  - 모든 fold의 ColumnTransformer(StandardScaler/passthrough)를 (열 선택, scale, offset)으로 펼쳐
+#    한 번의 브로드캐스트 연산으로 전처리
+#  - LogisticRegression / SGDClassifier fold는 einsum 한 번으로 decision_function 계산
+#  - 그 외(RF 등)는 전처리된 행렬로 분류기만 직접 호출 (Pipeline/ColumnTransformer 우회)
+#  - sigmoid 캘리브레이션 + fold 평균도 벡터화
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from ml.risk_table import LABELS
+
+
+def affine_from_preprocessor(pre, n_features: int):
+    """fit된 ColumnTransformer -> (src 열 인덱스, scale, offset): out = X[:, src] * scale + offset"""
+    from sklearn.preprocessing import StandardScaler, FunctionTransformer
+
+    src, scale, offset = [], [], []
+    for name, trans, cols in pre.transformers_:
+        cols = list(np.arange(n_features)[cols])
+        if trans == "drop" or len(cols) == 0:
+            continue
+        # fit 후 "passthrough"는 항등 FunctionTransformer로 바뀌어 있음
+        if trans == "passthrough" or (isinstance(trans, FunctionTransformer) and trans.func is None):
+            src += cols
+            scale += [1.0] * len(cols)
+            offset += [0.0] * len(cols)
+        elif isinstance(trans, StandardScaler):
+            s = trans.scale_ if trans.scale_ is not None else np.ones(len(cols))
+            m = trans.mean_ if trans.mean_ is not None else np.zeros(len(cols))
+            src += cols
+            scale += list(1.0 / s)
+            offset += list(-m / s)
+        else:
+            raise ValueError(f"fuse 불가한 전처리 단계: {name}={type(trans).__name__}")
+    return np.array(src), np.array(scale, dtype=np.float64), np.array(offset, dtype=np.float64)
+
+
+class FusedRiskModel:
+    """predict_proba(X) -> (n, 3) [suicidal, depression, stress] 양성 확률"""
+
+    def __init__(self, models: Dict[str, object], labels: Sequence[str] = LABELS):
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+        self.labels = tuple(labels)
+        n_features = None
+        src, scale, offset = [], [], []
+        fold_label, cal_a, cal_b = [], [], []
+        kinds, estimators, coef, intercept = [], [], [], []
+
+        for j, label in enumerate(self.labels):
+            cal = models[label]
+            if getattr(cal, "method", "sigmoid") != "sigmoid":
+                raise ValueError(f"[{label}] sigmoid 캘리브레이션만 지원: {cal.method}")
+            n_features = cal.n_features_in_
+            for cc in cal.calibrated_classifiers_:
+                pre = cc.estimator.named_steps["pre"]
+                clf = cc.estimator.named_steps["clf"]
+                s, sc, off = affine_from_preprocessor(pre, n_features)
+                src.append(s)
+                scale.append(sc)
+                offset.append(off)
+                fold_label.append(j)
+                cal_a.append(float(cc.calibrators[0].a_))
+                cal_b.append(float(cc.calibrators[0].b_))
+
+                # CalibratedClassifierCV와 같은 응답 우선순위: decision_function -> predict_proba
+                if isinstance(clf, (LogisticRegression, SGDClassifier)):
+                    kinds.append("linear")
+                    coef.append(clf.coef_.ravel())
+                    intercept.append(float(clf.intercept_[0]))
+                    estimators.append(None)
+                else:
+                    kinds.append("decision" if hasattr(clf, "decision_function") else "proba")
+                    estimators.append(clf)
+
+        if any((s.shape != src[0].shape) or np.any(s != src[0]) for s in src):
+            raise ValueError("fold마다 전처리 열 배치가 달라 fuse할 수 없음")
+
+        self.n_features_in_ = n_features
+        self.sources = {}  # 라벨 -> 합친 joblib 모델의 sha256 (export_fused_model이 채움)
+        self.src = src[0]
+        self.scale = np.stack(scale)    # (F, d)
+        self.offset = np.stack(offset)  # (F, d)
+        self.cal_a = np.array(cal_a)
+        self.cal_b = np.array(cal_b)
+        self.kinds = kinds
+        self.estimators = estimators
+        self.linear_idx = np.array([f for f, k in enumerate(kinds) if k == "linear"], dtype=int)
+        self.coef = np.stack(coef) if coef else np.zeros((0, len(self.src)))
+        self.intercept = np.array(intercept)
+
+        # fold -> 라벨 평균 행렬 (L, F)
+        fold_label = np.array(fold_label)
+        self.avg = (fold_label[None, :] == np.arange(len(self.labels))[:, None]).astype(np.float64)
+        self.avg /= self.avg.sum(axis=1, keepdims=True)
+
+    @property
+    def n_folds(self) -> int:
+        return len(self.kinds)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features_in_)
+
+        # 모든 fold 전처리를 한 번에: (F, n, d)
+        Xt = X[:, self.src][None, :, :] * self.scale[:, None, :] + self.offset[:, None, :]
+
+        scores = np.empty((self.n_folds, len(X)))
+        if self.linear_idx.size:
+            scores[self.linear_idx] = (
+                np.einsum("fnd,fd->fn", Xt[self.linear_idx], self.coef)
+                + self.intercept[:, None]
+            )
+        for f, kind in enumerate(self.kinds):
+            if kind == "decision":
+                scores[f] = self.estimators[f].decision_function(Xt[f])
+            elif kind == "proba":
+                scores[f] = self.estimators[f].predict_proba(Xt[f])[:, 1]
+
+        # sigmoid 캘리브레이션 p = 1 / (1 + exp(a*f + b)), 라벨별 fold 평균
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(self.cal_a[:, None] * scores + self.cal_b[:, None]))
+        return np.clip((self.avg @ p).T, 0.0, 1.0)
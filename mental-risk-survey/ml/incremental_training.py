@@ -0,0 +1,370 @@
+# ml/incremental_training.py
+# 메모리에 다 올릴 수 없는 데이터용 증분 학습 (SGD 로지스틱 + 스트리밍 sigmoid 캘리브레이션)
+#  - ml.synthetic_dataset 형식의 디스크 데이터셋을 청크 단위로 읽음
+#      1) 표준화 통계/클래스 수 누적 (StandardScaler.partial_fit)
+#      2) SGDClassifier(log_loss, 평균 SGD).partial_fit — 학습용 행만
+#         고정 학습률 + 가중치 평균(average=True): 기본 "optimal" 학습률은 초반 스텝이 너무 커서
+#         한 번의 패스로는 cal_logreg보다 ROC-AUC가 0.1 가까이 낮았음 (평균 SGD는 같은 데이터에서 차이 0.002 이내)
+#      3) 캘리브레이션용 행(전역 행 번호 % calib_every == 0)의 점수를 히스토그램으로 모아 Platt (a, b) 적합
+#  - 이미 저장된 모델에 새 설문 배치를 이어서 학습(update_incremental_models)할 수 있음
+#  - 저장 모델은 CalibratedClassifierCV와 같은 모양(calibrated_classifiers_ / named_steps / calibrators)이라
+#    서버의 model / table / fused / numpy 모드와 export 함수들이 그대로 사용
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+import joblib
+
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+# `python ml/incremental_training.py`로 실행해도 ml 패키지를 임포트할 수 있도록
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from ml.risk_table import LABELS
+from ml.synthetic_dataset import iter_dataset_chunks
+from ml.model_registry import publish_version
+from ml.train_risk_models import RANDOM_STATE, make_preprocessor, export_serving_artifacts, stage
+
+ChunkSource = Callable[[], Iterable[Tuple[np.ndarray, Dict[str, np.ndarray]]]]
+
+
+# ---------------- 캘리브레이션 ----------------
+class SigmoidCalibrator:
+    """sklearn _SigmoidCalibration과 같은 속성/식: p = 1 / (1 + exp(a*f + b))"""
+
+    def __init__(self, a: float = -1.0, b: float = 0.0):
+        self.a_ = a
+        self.b_ = b
+
+    def predict(self, f: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore"):
+            return 1.0 / (1.0 + np.exp(self.a_ * np.asarray(f) + self.b_))
+
+
+class StreamingPlatt:
+    """
+    decision 점수를 고정 폭 구간별 (양성 수, 음성 수)로만 누적 -> 메모리는 구간 수만큼.
+    fit()은 구간 중심점에 가중치를 준 Platt 로지스틱 회귀 (Newton), 목표값은 Platt의 사전 보정값 사용.
+    """
+
+    def __init__(self, lo: float = -20.0, hi: float = 20.0, n_bins: int = 4000):
+        self.edges = np.linspace(lo, hi, n_bins + 1)
+        self.centers = 0.5 * (self.edges[:-1] + self.edges[1:])
+        self.reset()
+
+    def reset(self):
+        self.pos = np.zeros(len(self.centers), dtype=np.int64)
+        self.neg = np.zeros(len(self.centers), dtype=np.int64)
+
+    @property
+    def n(self) -> int:
+        return int(self.pos.sum() + self.neg.sum())
+
+    def update(self, f: np.ndarray, y: np.ndarray):
+        idx = np.clip(np.searchsorted(self.edges, f, side="right") - 1, 0, len(self.centers) - 1)
+        y = np.asarray(y).astype(bool)
+        self.pos += np.bincount(idx[y], minlength=len(self.centers))
+        self.neg += np.bincount(idx[~y], minlength=len(self.centers))
+
+    def fit(self, n_iter: int = 100, tol: float = 1e-10) -> SigmoidCalibrator:
+        n_pos, n_neg = int(self.pos.sum()), int(self.neg.sum())
+        if n_pos == 0 or n_neg == 0:
+            raise ValueError(f"캘리브레이션 데이터에 두 클래스가 모두 필요 (pos={n_pos}, neg={n_neg})")
+        t_pos = (n_pos + 1.0) / (n_pos + 2.0)
+        t_neg = 1.0 / (n_neg + 2.0)
+
+        keep = (self.pos + self.neg) > 0
+        f = self.centers[keep]
+        w_pos, w_neg = self.pos[keep].astype(np.float64), self.neg[keep].astype(np.float64)
+        w = w_pos + w_neg
+        t = (w_pos * t_pos + w_neg * t_neg) / w
+
+        # q = sigmoid(-(a f + b)) 에 대한 가중 로그손실을 (a, b)로 최소화
+        a, b = -1.0, float(np.log((n_neg + 1.0) / (n_pos + 1.0)))
+        for _ in range(n_iter):
+            with np.errstate(over="ignore"):
+                q = 1.0 / (1.0 + np.exp(a * f + b))
+            r = w * (t - q)                 # d(loss)/d(a f + b)
+            h = w * q * (1.0 - q) + 1e-12
+            g = np.array([np.sum(r * f), np.sum(r)])
+            H = np.array([[np.sum(h * f * f), np.sum(h * f)], [np.sum(h * f), np.sum(h)]])
+            step = np.linalg.solve(H + 1e-9 * np.eye(2), g)
+            a, b = a - step[0], b - step[1]
+            if np.max(np.abs(step)) < tol:
+                break
+        return SigmoidCalibrator(float(a), float(b))
+
+
+class _CalibratedFold:
+    """CalibratedClassifierCV.calibrated_classifiers_ 원소와 같은 모양 (estimator + calibrators)"""
+
+    def __init__(self, estimator: Pipeline, calibrator: SigmoidCalibrator):
+        self.estimator = estimator
+        self.calibrators = [calibrator]
+
+
+# ---------------- 모델 ----------------
+class IncrementalRiskModel:
+    """
+    전처리(ColumnTransformer, 표준화는 partial_fit) + 평균 SGDClassifier(log_loss) + sigmoid 캘리브레이션.
+    predict_proba / calibrated_classifiers_ 는 CalibratedClassifierCV(fold 1개)와 같은 인터페이스.
+    """
+
+    method = "sigmoid"
+
+    def __init__(
+        self,
+        alpha: float = 1e-5,
+        learning_rate: str = "constant",
+        eta0: float = 0.01,
+        average: bool = True,
+        random_state: int = RANDOM_STATE
+    ):
+        self.pre = make_preprocessor()
+        self.clf = SGDClassifier(
+            loss="log_loss", alpha=alpha, learning_rate=learning_rate, eta0=eta0, average=average,
+            random_state=random_state,
+        )
+        self.calibrator = SigmoidCalibrator()
+        self.classes_ = np.array([0, 1])
+        self.class_counts = np.zeros(2, dtype=np.int64)  # 학습에 쓴 행의 누적 클래스 수 (균형 가중치용)
+        self.n_features_in_ = None
+        self.pre_fitted = False
+        self.history = []  # 학습/업데이트 기록
+
+    # ---------------- 학습 단계 ----------------
+    def partial_fit_scaler(self, X: np.ndarray):
+        """1단계: 표준화 통계 누적 (첫 청크로 ColumnTransformer fit, 이후 StandardScaler.partial_fit)"""
+        X = np.asarray(X, dtype=np.float64)
+        if not self.pre_fitted:
+            self.pre.fit(X)
+            self.n_features_in_ = X.shape[1]
+            self.pre_fitted = True
+        else:
+            self.pre.named_transformers_["num_std"].partial_fit(X[:, :4])
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray):
+        """2단계: SGD 한 스텝 — class_weight="balanced"와 같은 가중치를 누적 클래스 수로 계산"""
+        y = np.asarray(y).astype(np.int64)
+        self.class_counts += np.bincount(y, minlength=2)
+        balanced = self.class_counts.sum() / (2.0 * np.maximum(self.class_counts, 1))
+        Xt = self.pre.transform(np.asarray(X, dtype=np.float64))
+        self.clf.partial_fit(Xt, y, classes=self.classes_, sample_weight=balanced[y])
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.clf.decision_function(self.pre.transform(np.asarray(X, dtype=np.float64)))
+
+    # ---------------- 예측 ----------------
+    def predict_proba(self, X) -> np.ndarray:
+        p = np.clip(self.calibrator.predict(self.decision_function(X)), 0.0, 1.0)
+        return np.column_stack([1.0 - p, p])
+
+    @property
+    def calibrated_classifiers_(self):
+        pipe = Pipeline([("pre", self.pre), ("clf", self.clf)])
+        return [_CalibratedFold(pipe, self.calibrator)]
+
+
+# ---------------- 스트리밍 패스 ----------------
+def _holdout_mask(start: int, n: int, calib_every: int) -> np.ndarray:
+    return np.arange(start, start + n) % calib_every == 0
+
+
+def _run_passes(
+    models: Dict[str, IncrementalRiskModel],
+    chunks: ChunkSource,
+    n_epochs: int = 1,
+    calib_every: int = 10,
+    fit_scaler: bool = True,
+    recalibrate: bool = True,
+    max_eval_rows: int = 500_000,
+    seed: int = RANDOM_STATE,
+    timing: Dict = None
+) -> Dict[str, Dict]:
+    """
+    chunks()를 여러 번 순회 (세 라벨을 같은 패스에서 함께 갱신해서 디스크 읽기는 패스당 한 번).
+    반환: 라벨별 캘리브레이션 행 기준 평가 지표
+    """
+    timing = timing if timing is not None else {}
+    rng = np.random.default_rng(seed)
+
+    if fit_scaler:
+        with stage(timing, "scaler_pass"):
+            for X, _ in chunks():
+                for m in models.values():
+                    m.partial_fit_scaler(X)
+
+    n_train = 0
+    with stage(timing, "sgd_passes"):
+        for _ in range(n_epochs):
+            start = 0
+            for X, ys in chunks():
+                train = ~_holdout_mask(start, len(X), calib_every)
+                order = rng.permutation(np.flatnonzero(train))  # 청크 안에서 섞기
+                for label, m in models.items():
+                    m.partial_fit(X[order], ys[label][order])
+                start += len(X)
+                n_train += len(order)
+
+    metrics = {}
+    with stage(timing, "calibration_pass"):
+        platts = {label: StreamingPlatt() for label in models}
+        scores = {label: [] for label in models}
+        ys_eval = {label: [] for label in models}
+        start = n_eval = 0
+        for X, ys in chunks():
+            hold = _holdout_mask(start, len(X), calib_every)
+            for label, m in models.items():
+                f = m.decision_function(X[hold])
+                platts[label].update(f, ys[label][hold])
+                if n_eval < max_eval_rows:
+                    scores[label].append(f)
+                    ys_eval[label].append(ys[label][hold])
+            start += len(X)
+            n_eval += int(hold.sum())
+
+        for label, m in models.items():
+            if recalibrate:
+                m.calibrator = platts[label].fit()
+            y = np.concatenate(ys_eval[label])
+            p = m.calibrator.predict(np.concatenate(scores[label]))
+            metrics[label] = {
+                "pr_auc": round(float(average_precision_score(y, p)), 4),
+                "roc_auc": round(float(roc_auc_score(y, p)), 4) if 0 < y.sum() < len(y) else None,
+                "calibration_rows": platts[label].n,
+                "train_rows": n_train // max(n_epochs, 1),
+                "a": m.calibrator.a_,
+                "b": m.calibrator.b_,
+            }
+            m.history.append({"at": time.time(), "epochs": n_epochs, **metrics[label]})
+            print(
+                f"[incremental:{label}] PR-AUC={metrics[label]['pr_auc']:.4f} "
+                f"ROC-AUC={metrics[label]['roc_auc']}  calib rows={metrics[label]['calibration_rows']:,}"
+            )
+    return metrics
+
+
+def _finish(
+    models: Dict[str, IncrementalRiskModel],
+    outdir: Path,
+    report: Dict,
+    timing: Dict,
+    t_start: float,
+    build_table: bool,
+    fuse: bool,
+    compile_numpy: bool,
+    publish: bool
+) -> Dict[str, Path]:
+    outdir.mkdir(exist_ok=True, parents=True)
+    paths = {}
+    for label, m in models.items():
+        paths[label] = outdir / f"{label}_model.joblib"
+        joblib.dump(m, paths[label])
+
+    export_serving_artifacts(paths, outdir, build_table, fuse, compile_numpy, None, timing)
+
+    timing["total"] = round(time.perf_counter() - t_start, 3)
+    paths["report"] = outdir / "training_report.json"
+    paths["report"].write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print("[incremental] timing: " + "  ".join(f"{k}={v:.2f}s" for k, v in timing.items()))
+
+    # 버전 폴더로 등록하고 CURRENT 교체 -> 서버가 무중단으로 교체 로드
+    if publish:
+        paths["version"] = publish_version(outdir)
+    return paths
+
+
+# ---------------- 진입점 ----------------
+def train_incremental_all(
+    dataset_path: Path,
+    outdir: Path = None,
+    chunk_size: int = 1_000_000,
+    n_epochs: int = 1,
+    calib_every: int = 10,
+    alpha: float = 1e-5,
+    build_table: bool = True,
+    fuse: bool = True,
+    compile_numpy: bool = True,
+    publish: bool = True
+) -> Dict[str, Path]:
+    """디스크 데이터셋(ml.synthetic_dataset 형식)으로 세 라벨 모델을 처음부터 증분 학습"""
+    outdir = Path(outdir) if outdir is not None else _PROJECT_ROOT / "models"
+    timing = {}
+    t_start = time.perf_counter()
+
+    models = {k: IncrementalRiskModel(alpha=alpha) for k in LABELS}
+    metrics = _run_passes(
+        models, lambda: iter_dataset_chunks(dataset_path, chunk_size),
+        n_epochs=n_epochs, calib_every=calib_every, timing=timing,
+    )
+    report = {
+        "mode": "incremental",
+        "dataset": str(dataset_path),
+        "chunk_size": chunk_size,
+        "n_epochs": n_epochs,
+        "calib_every": calib_every,
+        "metrics": metrics,
+        "timing": timing,
+    }
+    return _finish(models, outdir, report, timing, t_start, build_table, fuse, compile_numpy, publish)
+
+
+def update_incremental_models(
+    dataset_path: Path,
+    model_dir: Path = None,
+    outdir: Path = None,
+    chunk_size: int = 1_000_000,
+    n_epochs: int = 1,
+    calib_every: int = 10,
+    recalibrate: bool = True,
+    build_table: bool = True,
+    fuse: bool = True,
+    compile_numpy: bool = True,
+    publish: bool = True
+) -> Dict[str, Path]:
+    """
+    저장된 증분 모델에 새 설문 배치(같은 디스크 형식)를 이어서 학습.
+    표준화 통계는 고정 (바꾸면 기존 계수의 의미가 달라짐), 캘리브레이션은 새 배치의 캘리브레이션 행으로 다시 적합.
+    """
+    model_dir = Path(model_dir) if model_dir is not None else _PROJECT_ROOT / "models"
+    outdir = Path(outdir) if outdir is not None else model_dir
+    timing = {}
+    t_start = time.perf_counter()
+
+    models = {k: joblib.load(model_dir / f"{k}_model.joblib") for k in LABELS}
+    for k, m in models.items():
+        if not isinstance(m, IncrementalRiskModel):
+            raise ValueError(f"[{k}] 증분 모델이 아님 ({type(m).__name__}) — train_incremental_all로 먼저 학습")
+
+    metrics = _run_passes(
+        models, lambda: iter_dataset_chunks(dataset_path, chunk_size),
+        n_epochs=n_epochs, calib_every=calib_every, fit_scaler=False, recalibrate=recalibrate,
+        timing=timing,
+    )
+    report = {
+        "mode": "incremental_update",
+        "base_model_dir": str(model_dir),
+        "dataset": str(dataset_path),
+        "chunk_size": chunk_size,
+        "n_epochs": n_epochs,
+        "calib_every": calib_every,
+        "recalibrate": recalibrate,
+        "metrics": metrics,
+        "timing": timing,
+    }
+    return _finish(models, outdir, report, timing, t_start, build_table, fuse, compile_numpy, publish)
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    train_incremental_all(_PROJECT_ROOT / "data" / "synthetic")
@@ -0,0 +1,153 @@
+# ml/model_registry.py
+# models/ 아래 버전별 모델 저장소
+#
+#   models/
+#     CURRENT                  <- 서빙할 버전 이름 (원자적으로 교체)
+#     versions/<version>/
+#       manifest.json          <- 버전, 생성 시각, 파일별 sha256
+#       suicidal_model.joblib, ..., compiled/..., risk_table.npy
+#     derived/<version>/         <- 버전에 없던 파생 아티팩트를 서버가 로드하며 만든 것 (버전 폴더는 그대로 둠)
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+DERIVED_DIR = "derived"
+MANIFEST_FILE = "manifest.json"
+
+# 버전에 담을 아티팩트 (없는 것은 건너뜀)
+ARTIFACT_PATTERNS = (
+    "*_model.joblib",
+    "feature_order.joblib",
+    "fused_risk_model.joblib",
+    "risk_table.npy",
+    "risk_table.json",
+    "compiled/*",
+    "risk_model.onnx",
+    "training_report.json",
+)
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def model_sources(paths: Dict[str, Path]) -> Dict[str, str]:
+    """라벨 -> joblib 모델의 sha256 (파생 아티팩트(compiled/, onnx)에 기록해 두고 로드할 때 비교)"""
+    return {k: sha256_file(Path(p)) for k, p in paths.items()}
+
+
+def _atomic_write_text(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def version_dir(models_dir: Path, version: str) -> Path:
+    return Path(models_dir) / VERSIONS_DIR / version
+
+
+def derived_dir(models_dir: Path, version: str) -> Path:
+    return Path(models_dir) / DERIVED_DIR / version
+
+
+def list_versions(models_dir: Path) -> List[str]:
+    root = Path(models_dir) / VERSIONS_DIR
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / MANIFEST_FILE).exists())
+
+
+def current_version(models_dir: Path) -> Optional[str]:
+    path = Path(models_dir) / CURRENT_FILE
+    if not path.exists():
+        return None
+    version = path.read_text(encoding="utf-8").strip()
+    return version or None
+
+
+def set_current(models_dir: Path, version: str):
+    if not (version_dir(models_dir, version) / MANIFEST_FILE).exists():
+        raise FileNotFoundError(f"unknown model version: {version}")
+    _atomic_write_text(Path(models_dir) / CURRENT_FILE, version + "\n")
+
+
+def read_manifest(models_dir: Path, version: str) -> Dict:
+    path = version_dir(models_dir, version) / MANIFEST_FILE
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def verify_version(models_dir: Path, version: str) -> Dict:
+    """manifest의 sha256과 실제 파일 비교, 다르면 ValueError"""
+    vdir = version_dir(models_dir, version)
+    manifest = read_manifest(models_dir, version)
+    for rel, digest in manifest["files"].items():
+        path = vdir / rel
+        if not path.exists():
+            raise ValueError(f"[{version}] missing file: {rel}")
+        if sha256_file(path) != digest:
+            raise ValueError(f"[{version}] checksum mismatch: {rel}")
+    return manifest
+
+
+def publish_version(
+    src_dir: Path,
+    models_dir: Path = None,
+    version: str = None,
+    make_current: bool = True
+) -> str:
+    """src_dir의 아티팩트를 새 버전 폴더로 복사하고 manifest 작성 (기본: CURRENT도 교체)"""
+    src_dir = Path(src_dir)
+    models_dir = Path(models_dir) if models_dir is not None else src_dir
+    if version is None:
+        version = time.strftime("%Y%m%d-%H%M%S")
+        base, n = version, 1
+        while version_dir(models_dir, version).exists():
+            n += 1
+            version = f"{base}-{n}"
+
+    vdir = version_dir(models_dir, version)
+    if vdir.exists():
+        raise FileExistsError(f"model version already exists: {version}")
+
+    # 임시 폴더에 다 채운 뒤 rename -> 반쯤 복사된 버전이 보이지 않도록
+    tmp = vdir.with_name(f".{version}.tmp-{os.getpid()}")
+    files = {}
+    for pattern in ARTIFACT_PATTERNS:
+        for path in sorted(src_dir.glob(pattern)):
+            if not path.is_file():
+                continue
+            rel = path.relative_to(src_dir).as_posix()
+            (tmp / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, tmp / rel)
+            files[rel] = sha256_file(tmp / rel)
+    if not files:
+        raise FileNotFoundError(f"no model artifacts in {src_dir}")
+
+    manifest = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "files": files,
+    }
+    (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, vdir)
+
+    if make_current:
+        set_current(models_dir, version)
+    print(f"[registry] published {version} ({len(files)} files) -> {vdir}")
+    return version
+
+
+if __name__ == "__main__":
+    # models/ 의 현재 아티팩트를 새 버전으로 등록
+    publish_version(Path(__file__).resolve().parents[1] / "models")
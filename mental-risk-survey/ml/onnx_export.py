@@ -0,0 +1,206 @@
+# ml/onnx_export.py
+# 세 라벨의 CalibratedClassifierCV -> ONNX 그래프 하나 (입력 X (n, 5) double -> 출력 risk (n, 3) double)
+#  - fold마다 전처리(ColumnTransformer)와 분류기를 skl2onnx로 따로 변환해 이어 붙이고
+#    (skl2onnx의 CalibratedClassifierCV 변환기는 현재 sklearn의 sigmoid 캘리브레이션과 결과가 달라 쓰지 않음)
+#  - 트리 모델은 sklearn처럼 float32로 바꾼 입력을 받게 함
+#    (double 입력으로 변환하면 float32 임계값과 double 값을 비교해 분기 경계 근처 셀이 달라짐)
+#  - sigmoid 캘리브레이션 p = 1 / (1 + exp(a*s + b)), fold 평균, 라벨 concat은 ONNX 기본 연산으로 추가
+#  - 응답 점수는 CalibratedClassifierCV와 같은 우선순위: decision_function(raw_scores) -> predict_proba
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
+from ml.risk_table import LABELS
+
+INPUT_NAME = "X"
+OUTPUT_NAME = "risk"
+TARGET_OPSET = {"": 17, "ai.onnx.ml": 3}
+
+# 예측 전에 입력을 float32로 바꾸는 분류기 (sklearn 트리 계열)
+FLOAT32_INPUT = (
+    DecisionTreeClassifier,
+    RandomForestClassifier,
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+)
+
+# 트리 노드 수 상한: 노드 하나가 ONNX 속성 여러 개로 펼쳐져 변환 중 메모리가 노드당 ~1KB씩 듦
+# 기본 cal_rf(250그루 x 3 fold x 3 라벨)는 천만 노드 수준이라 이 상한을 넘음 -> RF가 선택된 학습에서는
+# ONNX를 만들지 않고(training_report.json의 "skipped"에 이유), onnx 모드 서버는 시작 로그와
+# /model_info의 load_error에 이유를 남기고 뜨지 않음 -> RF는 numpy 모드로 서빙
+MAX_TREE_NODES = 2_000_000
+
+
+def _inline(model, prefix: str, input_name: str = INPUT_NAME):
+    """변환된 ModelProto의 노드/상수를 이름 충돌 없이 꺼냄 (입력은 input_name으로 연결)"""
+    g = model.graph
+    rename = {i.name: input_name for i in g.input}
+
+    def name(n: str) -> str:
+        return rename.get(n, prefix + n) if n else n
+
+    nodes = []
+    for node in g.node:
+        new = type(node)()
+        new.CopyFrom(node)
+        new.name = prefix + node.name
+        del new.input[:]
+        new.input.extend(name(n) for n in node.input)
+        del new.output[:]
+        new.output.extend(name(n) for n in node.output)
+        nodes.append(new)
+
+    inits = []
+    for init in g.initializer:
+        new = type(init)()
+        new.CopyFrom(init)
+        new.name = prefix + init.name
+        inits.append(new)
+
+    outputs = {o.name: name(o.name) for o in g.output}
+    return nodes, inits, outputs
+
+
+def count_tree_nodes(models: Dict[str, object]) -> int:
+    """모든 라벨/fold의 트리 노드 수 합 (선형 모델은 0)"""
+    total = 0
+    for cal in models.values():
+        for cc in cal.calibrated_classifiers_:
+            clf = cc.estimator.named_steps["clf"]
+            trees = getattr(clf, "estimators_", None)
+            if trees is None and hasattr(clf, "tree_"):
+                trees = [clf]
+            for est in np.ravel(trees) if trees is not None else ():
+                total += est.tree_.node_count
+    return total
+
+
+def build_risk_onnx(
+    models: Dict[str, object],
+    labels: Sequence[str] = LABELS,
+    max_tree_nodes: int = MAX_TREE_NODES,
+    metadata: Dict[str, str] = None
+):
+    """{라벨: CalibratedClassifierCV(sigmoid)} -> onnx.ModelProto (metadata: 모델 속성에 추가할 문자열)"""
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import DoubleTensorType, FloatTensorType
+
+    n_nodes = count_tree_nodes({k: models[k] for k in labels})
+    if max_tree_nodes is not None and n_nodes > max_tree_nodes:
+        raise NotImplementedError(f"트리 노드 {n_nodes:,}개 > 상한 {max_tree_nodes:,} (numpy 모드 사용)")
+
+    nodes, inits = [], []
+    opsets = {}
+    ir_version = None
+    n_features = None
+
+    def const(name: str, value) -> str:
+        inits.append(numpy_helper.from_array(np.asarray(value, dtype=np.float64), name))
+        return name
+
+    one_idx = "#idx1"
+    inits.append(numpy_helper.from_array(np.array([1], dtype=np.int64), one_idx))
+
+    label_outputs = []
+    for label in labels:
+        cal = models[label]
+        if getattr(cal, "method", "sigmoid") != "sigmoid":
+            raise ValueError(f"[{label}] sigmoid 캘리브레이션만 지원: {cal.method}")
+        n_features = cal.n_features_in_
+        fold_probs = []
+        for f, cc in enumerate(cal.calibrated_classifiers_):
+            pipe = cc.estimator
+            pre, clf = pipe.named_steps["pre"], pipe.named_steps["clf"]
+            p = f"{label}.f{f}#"  # 추가 노드 이름 (변환된 그래프 안의 이름과 겹치지 않도록 다른 구분자)
+            use_decision = hasattr(clf, "decision_function")
+            float_input = isinstance(clf, FLOAT32_INPUT)
+            clf_type = FloatTensorType if float_input else DoubleTensorType
+            try:
+                onx_pre = convert_sklearn(
+                    pre,
+                    initial_types=[(INPUT_NAME, DoubleTensorType([None, n_features]))],
+                    target_opset=TARGET_OPSET,
+                )
+                onx_clf = convert_sklearn(
+                    clf,
+                    initial_types=[("Xt", clf_type([None, clf.n_features_in_]))],
+                    options={id(clf): {"zipmap": False, **({"raw_scores": True} if use_decision else {})}},
+                    target_opset=TARGET_OPSET,
+                )
+            except Exception as e:
+                raise NotImplementedError(f"[{label}] {type(clf).__name__} ONNX 변환 실패: {e}") from e
+
+            for onx in (onx_pre, onx_clf):
+                ir_version = max(ir_version or 0, onx.ir_version)
+                for op in onx.opset_import:
+                    opsets[op.domain] = max(opsets.get(op.domain, 0), op.version)
+
+            n, i, outs = _inline(onx_pre, f"{label}.f{f}.pre.")
+            nodes += n
+            inits += i
+            xt = outs[onx_pre.graph.output[0].name]
+            if float_input:
+                nodes.append(helper.make_node("Cast", [xt], [p + "xt32"], to=TensorProto.FLOAT))
+                xt = p + "xt32"
+
+            n, i, outs = _inline(onx_clf, f"{label}.f{f}.clf.", input_name=xt)
+            nodes += n
+            inits += i
+            # 두 번째 출력 (n, 2): 양성 클래스 열 = 점수 s (float 출력도 double로 맞춤)
+            scores = outs[onx_clf.graph.output[1].name]
+            nodes += [
+                helper.make_node("Gather", [scores, one_idx], [p + "score_raw"], axis=1),
+                helper.make_node("Cast", [p + "score_raw"], [p + "score"], to=TensorProto.DOUBLE),
+            ]
+
+            # p = sigmoid(-(a*s + b))
+            a = float(cc.calibrators[0].a_)
+            b = float(cc.calibrators[0].b_)
+            nodes += [
+                helper.make_node("Mul", [p + "score", const(p + "a", -a)], [p + "as"]),
+                helper.make_node("Add", [p + "as", const(p + "b", -b)], [p + "z"]),
+                helper.make_node("Sigmoid", [p + "z"], [p + "prob"]),
+            ]
+            fold_probs.append(p + "prob")
+
+        # fold 평균
+        out = f"{label}#prob"
+        nodes += [
+            helper.make_node("Sum", fold_probs, [f"{label}#sum"]),
+            helper.make_node("Mul", [f"{label}#sum", const(f"{label}#inv_folds", 1.0 / len(fold_probs))], [out]),
+        ]
+        label_outputs.append(out)
+
+    nodes += [
+        helper.make_node("Concat", label_outputs, ["#risk_raw"], axis=1),
+        helper.make_node("Clip", ["#risk_raw", const("#clip_lo", 0.0), const("#clip_hi", 1.0)], [OUTPUT_NAME]),
+    ]
+
+    graph = helper.make_graph(
+        nodes,
+        "mental_risk",
+        [helper.make_tensor_value_info(INPUT_NAME, TensorProto.DOUBLE, [None, n_features])],
+        [helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.DOUBLE, [None, len(labels)])],
+        initializer=inits,
+    )
+    model = helper.make_model(
+        graph,
+        opset_imports=[helper.make_opsetid(d, v) for d, v in sorted(opsets.items())],
+        producer_name="mental-risk-survey",
+    )
+    model.ir_version = ir_version
+    helper.set_model_props(model, {"labels": ",".join(labels), **(metadata or {})})
+    onnx.checker.check_model(model)
+    return model
@@ -0,0 +1,83 @@
+# ml/risk_table.py
+# RiskInput의 이산 입력 공간 전체를 미리 평가해 둔 조회 테이블 (생성/저장/조회)
+
+import json
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+# 피처 순서: [PHQ, GAD, K10, item9, ASQ] / (최소, 최대) — 학습 데이터 생성 범위와 동일
+FEATURE_BOUNDS = ((0, 27), (0, 21), (10, 50), (0, 3), (0, 1))
+LABELS = ("suicidal", "depression", "stress")
+
+_LOWS = np.array([lo for lo, _ in FEATURE_BOUNDS])
+_HIGHS = np.array([hi for _, hi in FEATURE_BOUNDS])
+_SIZES = tuple(int(hi - lo + 1) for lo, hi in FEATURE_BOUNDS)
+N_CELLS = int(np.prod(_SIZES))  # 28*22*41*4*2 = 202,048
+
+
+def feature_grid() -> np.ndarray:
+    """입력 공간 전체 (N_CELLS x 5), 행 순서 = flat_index 순서(C-order)"""
+    axes = [np.arange(lo, hi + 1) for lo, hi in FEATURE_BOUNDS]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return np.stack([m.ravel() for m in mesh], axis=1)
+
+
+def in_bounds(X: np.ndarray) -> np.ndarray:
+    """행별로 테이블 범위 안에 있는지 (범위 밖이면 모델로 직접 예측해야 함)"""
+    X = np.asarray(X)
+    return np.all((X >= _LOWS) & (X <= _HIGHS), axis=1)
+
+
+def flat_index(X: np.ndarray) -> np.ndarray:
+    """(n, 5) 정수 피처 -> 테이블 행 인덱스 (범위 안의 행만 넘길 것)"""
+    X = np.asarray(X, dtype=np.int64)
+    return np.ravel_multi_index(tuple((X - _LOWS).T), _SIZES)
+
+
+def cell_features(idx: np.ndarray) -> np.ndarray:
+    """flat_index의 역: 테이블 행 인덱스 -> (n, 5) 정수 피처"""
+    return np.stack(np.unravel_index(np.asarray(idx), _SIZES), axis=1) + _LOWS
+
+
+def build_risk_table(models: Dict[str, object], chunk_size: int = 50_000) -> np.ndarray:
+    """세 모델의 predict_proba를 입력 공간 전체에 대해 한 번씩 평가 -> (N_CELLS, 3) float32"""
+    grid = feature_grid()
+    table = np.empty((N_CELLS, len(LABELS)), dtype=np.float32)
+    for j, label in enumerate(LABELS):
+        model = models[label]
+        for start in range(0, N_CELLS, chunk_size):
+            stop = start + chunk_size
+            table[start:stop, j] = model.predict_proba(grid[start:stop])[:, 1]
+    np.clip(table, 0.0, 1.0, out=table)
+    return table
+
+
+def lookup(table: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """(n, 5) -> (n, 3) 확률 [suicidal, depression, stress]"""
+    return table[flat_index(X)]
+
+
+def save_risk_table(table: np.ndarray, path: Path, sources: Dict[str, str] = None) -> Path:
+    """sources: {라벨: 테이블을 만든 joblib 모델의 sha256} -> 옆에 <이름>.json으로 저장 (로드할 때 비교)"""
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    np.save(path, table)
+    if sources is not None:
+        path.with_suffix(".json").write_text(json.dumps({"sources": sources}, indent=2), encoding="utf-8")
+    return path
+
+
+def risk_table_sources(path: Path) -> Dict[str, str]:
+    """save_risk_table이 기록한 원본 모델 sha256 (기록이 없으면 빈 dict)"""
+    meta = Path(path).with_suffix(".json")
+    return json.loads(meta.read_text(encoding="utf-8")).get("sources", {}) if meta.exists() else {}
+
+
+def load_risk_table(path: Path, mmap_mode: str = None) -> np.ndarray:
+    """mmap_mode="r"이면 파일 페이지를 여러 워커가 공유"""
+    table = np.load(path, mmap_mode=mmap_mode)
+    if table.shape != (N_CELLS, len(LABELS)):
+        raise ValueError(f"risk table shape mismatch: {table.shape}")
+    return table
@@ -0,0 +1,216 @@
+# ml/synthetic_dataset.py
+# 대용량 합성 데이터: 고정 크기 청크로 생성해 디스크(.npy 메모리 맵)에 바로 씀 -> 메모리는 청크 크기만큼만 사용
+#
+#   data/<name>/
+#     X.npy      (n, 5) uint8  [PHQ, GAD, K10, item9, ASQ]
+#     y.npy      (n, 3) uint8  [suicidal, depression, stress]
+#     meta.json  행 수, 청크 크기, 시드, 정규화 범위, 유병률
+#
+# 청크 i는 SeedSequence(seed).spawn()의 i번째 Generator로 만들어서 청크 크기/순서가 같으면 항상 같은 결과.
+
+import json
+import sys
+from pathlib import Path
+from statistics import NormalDist
+from typing import Callable, Dict, Iterator, Tuple
+
+import numpy as np
+
+# `python ml/synthetic_dataset.py`로 실행해도 ml 패키지를 임포트할 수 있도록
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from ml.risk_table import LABELS
+
+# PHQ/GAD/K10 잠재 변수의 상관 구조
+LATENT_COV = np.array([
+    [1.0, 0.6, 0.5],
+    [0.6, 1.0, 0.5],
+    [0.5, 0.5, 1.0]
+])
+NORMALIZATIONS = ("analytic", "two_pass")
+
+
+def sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def simulate_from_unit(
+    U: np.ndarray,
+    randint: Callable,
+    rand: Callable,
+    normal: Callable
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    0~1로 정규화한 잠재 변수 U (n, 3) -> 피처 X (n, 5)와 세 라벨.
+    난수 함수를 인자로 받아서 전역 np.random(기존 generate_synthetic_data)과
+    np.random.Generator(청크 생성) 양쪽에서 같은 식을 쓴다.
+    """
+    n_samples = len(U)
+    phq_total = np.round(U[:, 0] * 27).astype(int)      # 0~27
+    gad_total = np.round(U[:, 1] * 21).astype(int)      # 0~21
+    k10_total = np.round(10 + U[:, 2] * 40).astype(int) # 10~50
+
+    # 약간의 잡음
+    phq_total = np.clip(phq_total + randint(-1, 2, size=n_samples), 0, 27)
+    gad_total = np.clip(gad_total + randint(-1, 2, size=n_samples), 0, 21)
+    k10_total = np.clip(k10_total + randint(-2, 3, size=n_samples), 10, 50)
+
+    # item9/ASQ 생성 (PHQ와 느슨히 연동)
+    phq_item9 = np.clip((phq_total // 7) + randint(-1, 2, size=n_samples), 0, 3)
+    base_prob = 0.03 + 0.03*(phq_total/27) + 0.20*(phq_item9/3)
+    base_prob = np.clip(base_prob + normal(0, 0.02, size=n_samples), 0, 0.85)
+    asq_any_yes = (rand(n_samples) < base_prob).astype(int)
+
+    # ---- 확률 라벨링 (로지스틱 링크) ----
+    suic_logit = (
+        -3.2
+        + 0.12 * phq_total
+        + 0.85 * phq_item9
+        + 1.10 * asq_any_yes
+        + normal(0, 0.25, size=n_samples)
+    )
+    suicidal = (rand(n_samples) < sigmoid(suic_logit)).astype(int)
+
+    depr_logit = (
+        -2.6
+        + 0.11 * phq_total
+        + 0.10 * gad_total
+        + normal(0, 0.25, size=n_samples)
+    )
+    depression = (rand(n_samples) < sigmoid(depr_logit)).astype(int)
+
+    stress_logit = (
+        -3.0
+        + 0.09 * k10_total
+        + 0.05 * gad_total
+        + normal(0, 0.25, size=n_samples)
+    )
+    stress = (rand(n_samples) < sigmoid(stress_logit)).astype(int)
+
+    # 피처: [PHQ, GAD, K10, item9, ASQ]
+    X = np.column_stack([phq_total, gad_total, k10_total, phq_item9, asq_any_yes])
+    return X, suicidal, depression, stress
+
+
+# ---------------- 청크 생성 ----------------
+def chunk_generators(n_samples: int, chunk_size: int, seed: int):
+    """청크마다 독립된 난수 스트림 (청크 i <- SeedSequence(seed).spawn의 i번째)"""
+    n_chunks = -(-n_samples // chunk_size)
+    seqs = np.random.SeedSequence(seed).spawn(n_chunks)
+    for i, ss in enumerate(seqs):
+        start = i * chunk_size
+        yield start, min(chunk_size, n_samples - start), np.random.default_rng(ss)
+
+
+def _latent(rng: np.random.Generator, n: int) -> np.ndarray:
+    # 청크 스트림의 첫 난수 -> 두 번째 패스에서 같은 시드로 같은 Z를 다시 만들 수 있음
+    return rng.standard_normal((n, 3)) @ np.linalg.cholesky(LATENT_COV).T
+
+
+def latent_bounds(
+    n_samples: int,
+    chunk_size: int,
+    seed: int,
+    normalization: str = "analytic"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정규화 범위 (lo, hi):
+      analytic — 표준정규의 1-1/n 분위수로 고정 (전체 n개의 기대 최댓값 수준, 벗어난 값은 잘라냄).
+                 데이터를 보지 않으므로 한 번에 생성 가능
+      two_pass — 잠재 변수만 먼저 한 번 생성해 전체 min/max를 구함 (기존 전역 min/max와 같은 의미)
+    """
+    if normalization == "analytic":
+        z = NormalDist().inv_cdf(1.0 - 1.0 / max(n_samples, 2))
+        return np.full(3, -z), np.full(3, z)
+    if normalization != "two_pass":
+        raise ValueError(f"unknown normalization: {normalization} (expected one of {NORMALIZATIONS})")
+
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for _, n, rng in chunk_generators(n_samples, chunk_size, seed):
+        Z = _latent(rng, n)
+        lo = np.minimum(lo, Z.min(axis=0))
+        hi = np.maximum(hi, Z.max(axis=0))
+    return lo, hi
+
+
+def iter_synthetic_chunks(
+    n_samples: int,
+    chunk_size: int = 1_000_000,
+    seed: int = 42,
+    normalization: str = "analytic",
+    bounds: Tuple[np.ndarray, np.ndarray] = None
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """(시작 행, X (m, 5) uint8, y (m, 3) uint8) 청크를 차례로 생성"""
+    lo, hi = bounds if bounds is not None else latent_bounds(n_samples, chunk_size, seed, normalization)
+    for start, n, rng in chunk_generators(n_samples, chunk_size, seed):
+        Z = _latent(rng, n)
+        U = np.clip((Z - lo) / (hi - lo + 1e-9), 0.0, 1.0)
+        X, suicidal, depression, stress = simulate_from_unit(U, rng.integers, rng.random, rng.normal)
+        yield start, X.astype(np.uint8), np.column_stack([suicidal, depression, stress]).astype(np.uint8)
+
+
+# ---------------- 디스크 ----------------
+def write_synthetic_dataset(
+    path: Path,
+    n_samples: int,
+    chunk_size: int = 1_000_000,
+    seed: int = 42,
+    normalization: str = "analytic"
+) -> Path:
+    """청크를 X.npy / y.npy 메모리 맵에 바로 기록 (1억 행 = X 500MB + y 300MB)"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    lo, hi = latent_bounds(n_samples, chunk_size, seed, normalization)
+
+    X_out = np.lib.format.open_memmap(path / "X.npy", mode="w+", dtype=np.uint8, shape=(n_samples, 5))
+    y_out = np.lib.format.open_memmap(path / "y.npy", mode="w+", dtype=np.uint8, shape=(n_samples, len(LABELS)))
+    positives = np.zeros(len(LABELS), dtype=np.int64)
+    for start, X, y in iter_synthetic_chunks(n_samples, chunk_size, seed, bounds=(lo, hi)):
+        X_out[start:start + len(X)] = X
+        y_out[start:start + len(y)] = y
+        positives += y.sum(axis=0, dtype=np.int64)
+    X_out.flush()
+    y_out.flush()
+    del X_out, y_out
+
+    prevalence = {k: float(p) / n_samples for k, p in zip(LABELS, positives)}
+    meta = {
+        "n_samples": n_samples,
+        "chunk_size": chunk_size,
+        "seed": seed,
+        "normalization": normalization,
+        "latent_bounds": {"lo": lo.tolist(), "hi": hi.tolist()},
+        "feature_order": ["phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes"],
+        "labels": list(LABELS),
+        "prevalence": prevalence,
+    }
+    (path / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(
+        f"[data] wrote n={n_samples:,} -> {path}  "
+        + "  ".join(f"{k}={100 * v:.2f}%" for k, v in prevalence.items())
+    )
+    return path
+
+
+def open_synthetic_dataset(path: Path, mmap_mode: str = "r") -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict]:
+    """(X (n, 5), {라벨: y (n,)}, meta) — 기본은 읽기 전용 메모리 맵 (라벨 열도 복사 없는 뷰)"""
+    path = Path(path)
+    X = np.load(path / "X.npy", mmap_mode=mmap_mode)
+    y = np.load(path / "y.npy", mmap_mode=mmap_mode)
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    return X, {k: y[:, j] for j, k in enumerate(meta["labels"])}, meta
+
+
+def iter_dataset_chunks(path: Path, chunk_size: int = 1_000_000):
+    """디스크 데이터셋을 (X, {라벨: y}) 청크로 순서대로 읽음"""
+    X, ys, _ = open_synthetic_dataset(path)
+    for start in range(0, len(X), chunk_size):
+        stop = start + chunk_size
+        yield np.asarray(X[start:stop]), {k: np.asarray(y[start:stop]) for k, y in ys.items()}
+
+
+if __name__ == "__main__":
+    write_synthetic_dataset(_PROJECT_ROOT / "data" / "synthetic", n_samples=10_000_000)
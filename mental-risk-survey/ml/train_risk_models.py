@@ -1,9 +1,15 @@
 # ml/train_risk_models_prob.py
 # 확률 라벨링(로지스틱 링크) + 학습(LogReg vs RF) + 캘리브레이션 + 저장
 
+import json
+import os
+import shutil
+import sys
+import time
 import warnings
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Union
 
 import numpy as np
 import joblib
@@ -13,17 +19,24 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import average_precision_score, roc_auc_score
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.calibration import CalibratedClassifierCV
 
-RANDOM_STATE = 42
-np.random.seed(RANDOM_STATE)
+# `python ml/train_risk_models.py`로 실행해도 ml 패키지를 임포트할 수 있도록
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
 
-# ---------- 0) helpers ----------
-def sigmoid(z):
-    return 1.0 / (1.0 + np.exp(-z))
+from ml.risk_table import (
+    build_risk_table, save_risk_table, feature_grid, in_bounds, flat_index, cell_features, N_CELLS, LABELS,
+)
+from ml.fused_model import FusedRiskModel, affine_from_preprocessor
+from ml.model_registry import model_sources, publish_version
+from ml.synthetic_dataset import LATENT_COV, simulate_from_unit
 
+RANDOM_STATE = 42
+np.random.seed(RANDOM_STATE)
 
 # ---------- 1) Synthetic data with probabilistic labels ----------
 def generate_synthetic_data(
@@ -32,63 +45,18 @@ def generate_synthetic_data(
     """
     상관 구조를 가진 PHQ/GAD/K10을 만들고,
     라벨은 logit=... -> p=sigmoid(logit) -> y~Bernoulli(p) 방식으로 확률적으로 생성.
+    전체를 메모리에 한 번에 만듦 — 큰 데이터는 ml.synthetic_dataset.write_synthetic_dataset (청크/디스크)
     """
 
     # 상관 구조
-    mean = np.zeros(3)
-    cov = np.array([
-        [1.0, 0.6, 0.5],
-        [0.6, 1.0, 0.5],
-        [0.5, 0.5, 1.0]
-    ])
-    Z = np.random.multivariate_normal(mean, cov, size=n_samples)
+    Z = np.random.multivariate_normal(np.zeros(3), LATENT_COV, size=n_samples)
 
     # 0~1 스케일로 정규화
     U = (Z - Z.min(axis=0)) / (Z.max(axis=0) - Z.min(axis=0) + 1e-9)
 
-    phq_total = np.round(U[:, 0] * 27).astype(int)      # 0~27
-    gad_total = np.round(U[:, 1] * 21).astype(int)      # 0~21
-    k10_total = np.round(10 + U[:, 2] * 40).astype(int) # 10~50
-
-    # 약간의 잡음
-    phq_total = np.clip(phq_total + np.random.randint(-1, 2, size=n_samples), 0, 27)
-    gad_total = np.clip(gad_total + np.random.randint(-1, 2, size=n_samples), 0, 21)
-    k10_total = np.clip(k10_total + np.random.randint(-2, 3, size=n_samples), 10, 50)
-
-    # item9/ASQ 생성 (PHQ와 느슨히 연동)
-    phq_item9 = np.clip((phq_total // 7) + np.random.randint(-1, 2, size=n_samples), 0, 3)
-    base_prob = 0.03 + 0.03*(phq_total/27) + 0.20*(phq_item9/3)
-    base_prob = np.clip(base_prob + np.random.normal(0, 0.02, size=n_samples), 0, 0.85)
-    asq_any_yes = (np.random.rand(n_samples) < base_prob).astype(int)
-
-    # ---- 확률 라벨링 (로지스틱 링크) ----
-    suic_logit = (
-        -3.2
-        + 0.12 * phq_total
-        + 0.85 * phq_item9
-        + 1.10 * asq_any_yes
-        + np.random.normal(0, 0.25, size=n_samples)
-    )
-    suicidal = (np.random.rand(n_samples) < sigmoid(suic_logit)).astype(int)
-
-    depr_logit = (
-        -2.6
-        + 0.11 * phq_total
-        + 0.10 * gad_total
-        + np.random.normal(0, 0.25, size=n_samples)
+    X, suicidal, depression, stress = simulate_from_unit(
+        U, np.random.randint, np.random.rand, np.random.normal
     )
-    depression = (np.random.rand(n_samples) < sigmoid(depr_logit)).astype(int)
-
-    stress_logit = (
-        -3.0
-        + 0.09 * k10_total
-        + 0.05 * gad_total
-        + np.random.normal(0, 0.25, size=n_samples)
-    )
-    stress = (np.random.rand(n_samples) < sigmoid(stress_logit)).astype(int)
-
-    # 피처: [PHQ, GAD, K10, item9, ASQ]
-    X = np.column_stack([phq_total, gad_total, k10_total, phq_item9, asq_any_yes])
 
     print(
         "[prevalence] suicidal={:.2f}%  depression={:.2f}%  stress={:.2f}%".format(
@@ -109,66 +77,201 @@ def make_preprocessor() -> ColumnTransformer:
     ])
 
 
+# ---------- 2b) Sufficient statistics ----------
+def compress_by_tuple(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    같은 피처 조합의 행을 (조합, 라벨, 개수)로 합침 -> (X_c, y_c, sample_weight, groups).
+    조합마다 양성/음성 행을 하나씩(개수 0이면 생략) 남기므로 가중 손실은 원래 데이터와 같다.
+    groups: 행이 속한 조합 번호 (CV에서 한 조합의 양성/음성 행을 같은 fold에 두는 데 사용)
+    입력 공간이 202,048칸이라 행 수가 아무리 많아도 결과는 그 2배를 넘지 않음.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y).astype(np.int64)
+    if in_bounds(X).all():
+        # 테이블 인덱스로 bincount (정렬 없이 O(n))
+        idx = flat_index(X)
+        total = np.bincount(idx, minlength=N_CELLS)
+        pos = np.bincount(idx, weights=y, minlength=N_CELLS).astype(np.int64)
+        cells = np.flatnonzero(total)
+        Xu, total, pos = cell_features(cells).astype(X.dtype), total[cells], pos[cells]
+    else:
+        Xu, inv = np.unique(X, axis=0, return_inverse=True)
+        total = np.bincount(inv.ravel())
+        pos = np.bincount(inv.ravel(), weights=y).astype(np.int64)
+    neg = total - pos
+
+    has_pos, has_neg = pos > 0, neg > 0
+    X_c = np.concatenate([Xu[has_pos], Xu[has_neg]])
+    y_c = np.concatenate([np.ones(has_pos.sum(), dtype=np.int64), np.zeros(has_neg.sum(), dtype=np.int64)])
+    w = np.concatenate([pos[has_pos], neg[has_neg]]).astype(np.float64)
+    groups = np.concatenate([np.flatnonzero(has_pos), np.flatnonzero(has_neg)])
+    return X_c, y_c, w, groups
+
+
+def group_folds(groups: np.ndarray, n_splits: int = 3, random_state: int = RANDOM_STATE):
+    """
+    조합 단위 CV 분할 [(train_idx, test_idx), ...].
+    행 단위로 나누면 한 조합의 양성 행은 학습, 음성 행은 검증 쪽에 가서 (RF처럼 조합을 외우는 모델은)
+    검증 점수가 라벨과 반대로 움직이고 캘리브레이션 기울기가 뒤집힘
+    """
+    fold_of_group = np.random.default_rng(random_state).permutation(groups.max() + 1) % n_splits
+    fold = fold_of_group[groups]
+    return [(np.flatnonzero(fold != k), np.flatnonzero(fold == k)) for k in range(n_splits)]
+
+
+def balanced_class_weight(y: np.ndarray, sample_weight: np.ndarray) -> Dict[int, float]:
+    """
+    class_weight="balanced"를 행 개수(가중치 합) 기준으로 계산 — 압축된 행 수로 세면 틀어짐.
+    한 클래스의 가중치 합이 0이면 (부분표본/fold에 그 클래스가 없음) inf 대신 ValueError
+    (sklearn compute_class_weight와 같은 처리)
+    """
+    sums = {c: float(np.sum(sample_weight[y == c])) for c in (0, 1)}
+    missing = [c for c, s in sums.items() if not s > 0]
+    if missing:
+        raise ValueError(
+            f"balanced class_weight needs both classes with positive weight, got per-class weight sums {sums}"
+        )
+    n = sums[0] + sums[1]
+    return {c: n / (2.0 * s) for c, s in sums.items()}
+
+
 # ---------- 3) Train single label ----------
-def train_one_label(
-    label_name: str,
-    X: np.ndarray,
-    y: np.ndarray,
-    outdir: Path,
-    test_size: float = 0.2
-) -> Path:
+CANDIDATES = ("cal_logreg", "cal_rf")
+# 모델 선택(successive halving)에서 고를 수 있는 후보, 단순한 것부터 (동점이면 앞쪽 선호)
+ALL_CANDIDATES = ("cal_logreg", "cal_rf", "cal_hgb")
+# compress=True일 때 압축해서 학습하는 후보: 가중 손실이 원래 데이터와 같은 LogReg만
+# (RF/HGB는 부트스트랩/분할이 조합 단위가 되어 근사 -> compress=("cal_logreg", "cal_rf")처럼 명시할 때만)
+EXACT_COMPRESS = ("cal_logreg",)
+Compress = Union[bool, Tuple[str, ...]]
+
+
+def compress_kinds(compress: Compress) -> Tuple[str, ...]:
+    """compress 인자(False / True / 후보 이름 목록) -> 압축 학습할 후보"""
+    if compress is True:
+        return EXACT_COMPRESS
+    return tuple(compress) if compress else ()
+
+
+def make_pipeline(
+    kind: str,
+    n_jobs: int = -1,
+    random_state: int = RANDOM_STATE,
+    class_weight: Dict[int, float] = None
+) -> Pipeline:
+    """캘리브레이션 전 Pipeline(pre, clf)"""
     pre = make_preprocessor()
-
-    # base estimators (fit은 calibration이 내부에서 수행)
-    logreg = Pipeline([
-        ("pre", pre),
-        ("clf", LogisticRegression(
+    if kind == "cal_logreg":
+        clf = LogisticRegression(
             max_iter=2000,
             solver="liblinear",
-            class_weight="balanced",
-            random_state=RANDOM_STATE
-        ))
-    ])
-    rf = Pipeline([
-        ("pre", pre),
-        ("clf", RandomForestClassifier(
+            class_weight=class_weight or "balanced",
+            random_state=random_state
+        )
+    elif kind == "cal_rf":
+        clf = RandomForestClassifier(
             n_estimators=250,
-            random_state=RANDOM_STATE,
-            n_jobs=-1,
-            class_weight="balanced_subsample"
-        ))
-    ])
+            random_state=random_state,
+            n_jobs=n_jobs,
+            class_weight=class_weight or "balanced_subsample"
+        )
+    elif kind == "cal_hgb":
+        clf = HistGradientBoostingClassifier(
+            max_iter=200,
+            early_stopping=True,
+            random_state=random_state,
+            class_weight=class_weight or "balanced"
+        )
+    else:
+        raise ValueError(f"unknown candidate: {kind}")
+    return Pipeline([("pre", pre), ("clf", clf)])
+
+
+def make_candidate(
+    kind: str,
+    n_jobs: int = -1,
+    random_state: int = RANDOM_STATE,
+    class_weight: Dict[int, float] = None,
+    cv=None
+) -> CalibratedClassifierCV:
+    """후보 추정기 (fit은 calibration이 내부에서 수행), n_jobs는 RF 트리 병렬 수
+    class_weight / cv: 압축 데이터로 학습할 때 넘기는 명시적 가중치와 조합 단위 분할
+    (None이면 balanced 계열 / StratifiedKFold)"""
+    # calibration CV (재현성 강화)
+    if cv is None:
+        cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=random_state)
+    return CalibratedClassifierCV(
+        estimator=make_pipeline(kind, n_jobs, random_state, class_weight), method="sigmoid", cv=cv
+    )
 
-    # 라벨별 stratify split
+
+def split_label(X: np.ndarray, y: np.ndarray, test_size: float = 0.2, random_state: int = RANDOM_STATE):
+    """라벨별 stratify split (같은 시드면 후보끼리 같은 분할)"""
     idx = np.arange(len(X))
     tr_idx, te_idx = train_test_split(
         idx, test_size=test_size,
-        random_state=RANDOM_STATE,
+        random_state=random_state,
         stratify=y
     )
-    Xtr, Xte = X[tr_idx], X[te_idx]
-    ytr, yte = y[tr_idx], y[te_idx]
+    return X[tr_idx], X[te_idx], y[tr_idx], y[te_idx]
 
-    # calibration CV (재현성 강화)
-    cv3 = StratifiedKFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE)
 
-    cal_logreg = CalibratedClassifierCV(estimator=logreg, method="sigmoid", cv=cv3)
-    cal_rf     = CalibratedClassifierCV(estimator=rf,     method="sigmoid", cv=cv3)
-
-    cal_logreg.fit(Xtr, ytr)
-    cal_rf.fit(Xtr, ytr)
+def fit_candidate(
+    label_name: str,
+    kind: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    test_size: float = 0.2,
+    n_jobs: int = -1,
+    random_state: int = RANDOM_STATE,
+    compress: Compress = False
+) -> Dict:
+    """
+    후보 하나 학습 + 평가 (프로세스 풀에서도 그대로 실행되도록 모듈 수준 함수).
+    compress가 이 후보를 포함하면(compress_kinds) 학습 분할을 compress_by_tuple로 줄여 sample_weight로 학습
+    (평가는 원래 행 그대로). LogReg는 가중 손실이 같아 결과가 거의 같고, RF는 부트스트랩이 행 대신 조합 단위가 되어 근사.
+    """
+    t0 = time.perf_counter()
+    Xtr, Xte, ytr, yte = split_label(X, y, test_size, random_state)
+    n_train_rows = len(Xtr)
+    if kind in compress_kinds(compress):
+        Xtr, ytr, w, groups = compress_by_tuple(Xtr, ytr)
+        est = make_candidate(
+            kind, n_jobs, random_state, balanced_class_weight(ytr, w), group_folds(groups, 3, random_state)
+        )
+        with warnings.catch_warnings():
+            # Pipeline.fit에는 sample_weight 인자가 없다는 경고 — clf__sample_weight로 따로 넘김
+            warnings.filterwarnings("ignore", message=".*sample weights will only be used.*")
+            est.fit(Xtr, ytr, sample_weight=w, clf__sample_weight=w)
+    else:
+        est = make_candidate(kind, n_jobs, random_state)
+        est.fit(Xtr, ytr)
+
+    p = est.predict_proba(Xte)[:, 1]
+    pr = average_precision_score(yte, p)
+    try:
+        roc = roc_auc_score(yte, p)
+    except ValueError:
+        roc = float("nan")
+
+    return {
+        "label": label_name,
+        "kind": kind,
+        "model": est,
+        "pr_auc": pr,
+        "roc_auc": roc,
+        "fit_seconds": time.perf_counter() - t0,
+        "n_jobs": n_jobs,
+        "train_rows": n_train_rows,
+        "fit_rows": len(Xtr),
+        "pid": os.getpid(),
+    }
 
-    def eval_model(est):
-        p = est.predict_proba(Xte)[:, 1]
-        pr = average_precision_score(yte, p)
-        try:
-            roc = roc_auc_score(yte, p)
-        except ValueError:
-            roc = float("nan")
-        return pr, roc
 
-    lg_pr, lg_roc = eval_model(cal_logreg)
-    rf_pr, rf_roc = eval_model(cal_rf)
+def select_and_save(label_name: str, results: Dict[str, Dict], outdir: Path) -> Path:
+    """후보 평가 결과로 최종 모델을 고르고 저장"""
+    lg, rf = results["cal_logreg"], results["cal_rf"]
+    lg_pr, lg_roc = lg["pr_auc"], lg["roc_auc"]
+    rf_pr, rf_roc = rf["pr_auc"], rf["roc_auc"]
 
     print(
         f"[{label_name}] Cal-LogReg PR-AUC={lg_pr:.4f} ROC-AUC={lg_roc:.4f}  |  "
@@ -177,13 +280,20 @@ def train_one_label(
 
     # PR-AUC 우선, 근소하면 LogReg 선호
     if (rf_pr - lg_pr) > 0.005 or (np.isfinite(rf_roc) and np.isfinite(lg_roc) and rf_roc > lg_roc + 0.005):
-        best = cal_rf
         tag = "cal_rf"
     else:
-        best = cal_logreg
         tag = "cal_logreg"
+    best = results[tag]["model"]
 
     print(f"[{label_name}] >>> selected={tag}")
+    return save_selected(label_name, best, tag, outdir)
+
+
+def save_selected(label_name: str, best: CalibratedClassifierCV, tag: str, outdir: Path) -> Path:
+    if tag == "cal_rf":
+        # 학습용 n_jobs가 서빙(1행 예측)까지 따라가지 않도록
+        for cc in best.calibrated_classifiers_:
+            cc.estimator.named_steps["clf"].n_jobs = None
 
     outdir.mkdir(exist_ok=True, parents=True)
     final_path = outdir / f"{label_name}_model.joblib"
@@ -191,29 +301,549 @@ def train_one_label(
     return final_path
 
 
-# ---------- 4) Orchestrator ----------
-def train_and_save_all(n_samples: int = 100_000, outdir: Path = None) -> Dict[str, Path]:
-    if outdir is None:
-        PROJECT_ROOT = Path(__file__).resolve().parents[1]
-        outdir = PROJECT_ROOT / "models"
+def train_one_label(
+    label_name: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    outdir: Path,
+    test_size: float = 0.2,
+    n_jobs: int = -1,
+    compress: Compress = False
+) -> Path:
+    results = {
+        kind: fit_candidate(label_name, kind, X, y, test_size, n_jobs, compress=compress)
+        for kind in CANDIDATES
+    }
+    return select_and_save(label_name, results, outdir)
+
+
+# ---------- 3b) Parallel training ----------
+def plan_core_budget(n_tasks: int, n_forest_tasks: int, n_cores: int = None) -> Tuple[int, int]:
+    """
+    (동시 프로세스 수, RF 하나당 n_jobs).
+    LogReg(liblinear)는 코어 1개만 쓰므로 남는 코어를 RF끼리 나눠 가짐 -> 합계가 n_cores를 넘지 않음
+    (프로세스마다 n_jobs=-1이면 RF 3개가 각자 전체 코어를 잡아 과다 구독)
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    workers = max(1, min(n_tasks, n_cores))
+    if n_forest_tasks == 0:
+        return workers, 1
+    n_linear = min(n_tasks - n_forest_tasks, max(workers - n_forest_tasks, 0))
+    forest_jobs = max(1, (n_cores - n_linear) // min(n_forest_tasks, workers))
+    return workers, forest_jobs
+
+
+def _init_worker():
+    # 각 워커의 BLAS/OpenMP 스레드는 1개로 (병렬은 프로세스와 RF n_jobs로만)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+
+def train_labels_parallel(
+    X: np.ndarray,
+    ys: Dict[str, np.ndarray],
+    outdir: Path,
+    n_cores: int = None,
+    test_size: float = 0.2,
+    report: Dict = None,
+    compress: Compress = False
+) -> Dict[str, Path]:
+    """라벨 x 후보 조합을 프로세스 풀에서 동시에 학습 (시드는 조합마다 고정이라 결과는 직렬과 동일)"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    tasks = [(label, kind) for kind in ("cal_rf", "cal_logreg") for label in ys]  # 오래 걸리는 RF 먼저
+    workers, forest_jobs = plan_core_budget(
+        len(tasks), sum(kind == "cal_rf" for _, kind in tasks), n_cores
+    )
+    print(f"[train] parallel: {len(tasks)} fits, {workers} processes, RF n_jobs={forest_jobs}")
+
+    results = {label: {} for label in ys}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(
+                fit_candidate, label, kind, X, ys[label], test_size,
+                forest_jobs if kind == "cal_rf" else 1, compress=compress,
+            )
+            for label, kind in tasks
+        ]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results[res["label"]][res["kind"]] = res
+            print(f"[train] {res['label']}/{res['kind']} done in {res['fit_seconds']:.2f}s (pid {res['pid']})")
+
+    if report is not None:
+        report["budget"] = {
+            "n_cores": n_cores or os.cpu_count(), "processes": workers, "forest_n_jobs": forest_jobs,
+        }
+        report["fits"] = [
+            {
+                "label": r["label"], "kind": r["kind"], "n_jobs": r["n_jobs"],
+                "train_rows": r["train_rows"], "fit_rows": r["fit_rows"],
+                "fit_seconds": round(r["fit_seconds"], 3),
+                "pr_auc": round(float(r["pr_auc"]), 4), "roc_auc": round(float(r["roc_auc"]), 4),
+            }
+            for label in ys for r in results[label].values()
+        ]
+    return {label: select_and_save(label, results[label], outdir) for label in ys}
+
+
+# ---------- 3c) Model selection (successive halving) ----------
+def select_label_halving(
+    label_name: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    candidates: Tuple[str, ...] = ALL_CANDIDATES,
+    eta: int = 2,
+    min_rows: int = 20_000,
+    test_size: float = 0.2,
+    n_jobs: int = -1,
+    random_state: int = RANDOM_STATE,
+    compress: Compress = False,
+    simplicity_margin: float = 0.005
+) -> Dict:
+    """
+    후보 전부를 캘리브레이션 없이 작은 부분표본에서 먼저 학습해 검증 PR-AUC로 순위를 매기고
+    상위 1/eta만 남겨 표본을 eta배로 늘리며 반복 -> 마지막 한 후보만 전체 데이터로 캘리브레이션 학습.
+    순위 점수 = PR-AUC - simplicity_margin * (후보 순서) — 기존 규칙처럼 근소한 차이면 단순한 모델 선호.
+    (PR/ROC-AUC는 순위 지표라 단조 캘리브레이션 전후로 거의 같으므로 탈락 판정에는 캘리브레이션 불필요)
+    """
+    timing = {kind: 0.0 for kind in candidates}
+    Xtr, Xte, ytr, yte = split_label(X, y, test_size, random_state)
+    order = np.random.default_rng(random_state).permutation(len(Xtr))  # 단계마다 같은 순서의 앞부분 사용
+
+    n_rounds = int(np.ceil(np.log(len(candidates)) / np.log(eta))) if len(candidates) > 1 else 0
+    survivors = list(candidates)
+    rungs = []
+    for r in range(n_rounds):
+        if len(survivors) == 1:
+            break
+        n_rows = min(len(Xtr), max(min_rows, len(Xtr) // eta ** (n_rounds - r)))
+        sub = order[:n_rows]
+        Xs, ys_ = Xtr[sub], ytr[sub]
+        # 후보별 학습 데이터: 압축 대상(compress_kinds)은 (조합, 가중치), 나머지는 행 그대로
+        fit_data = {"rows": (Xs, ys_, {}, balanced_class_weight(ys_, np.ones(len(ys_))))}
+        if any(kind in compress_kinds(compress) for kind in survivors):
+            Xc, yc, w, _ = compress_by_tuple(Xs, ys_)
+            fit_data["compressed"] = (Xc, yc, {"clf__sample_weight": w}, balanced_class_weight(yc, w))
+
+        scores, fit_rows = {}, {}
+        for kind in survivors:
+            t0 = time.perf_counter()
+            Xf, yf, fit_params, class_weight = fit_data["compressed" if kind in compress_kinds(compress) else "rows"]
+            fit_rows[kind] = len(Xf)
+            pipe = make_pipeline(kind, n_jobs, random_state, class_weight).fit(Xf, yf, **fit_params)
+            scores[kind] = float(average_precision_score(yte, pipe.predict_proba(Xte)[:, 1]))
+            timing[kind] += time.perf_counter() - t0
+
+        rank = sorted(survivors, key=lambda k: scores[k] - simplicity_margin * candidates.index(k), reverse=True)
+        survivors = rank[:-(-len(rank) // eta)]
+        rungs.append({
+            "rows": n_rows,
+            "fit_rows": fit_rows,
+            "pr_auc": {k: round(v, 4) for k, v in scores.items()},
+            "survivors": list(survivors),
+        })
+        print(
+            f"[{label_name}] rung {r}: rows={n_rows:,} "
+            + "  ".join(f"{k}={v:.4f}" for k, v in scores.items())
+            + f"  -> {survivors}"
+        )
+
+    # 남은 후보만 전체 데이터로 캘리브레이션 학습
+    best = survivors[0]
+    final = fit_candidate(label_name, best, X, y, test_size, n_jobs, random_state, compress)
+    timing[best] += final["fit_seconds"]
+    print(
+        f"[{label_name}] >>> selected={best} PR-AUC={final['pr_auc']:.4f} ROC-AUC={final['roc_auc']:.4f}  "
+        + "time: " + "  ".join(f"{k}={v:.2f}s" for k, v in timing.items())
+    )
+    final["rungs"] = rungs
+    final["candidate_seconds"] = {k: round(v, 3) for k, v in timing.items()}
+    return final
 
-    print(f"[train] generate n={n_samples:,}")
-    X, y_suic, y_dep, y_str = generate_synthetic_data(n_samples)
 
-    paths = {
-        "suicidal":   train_one_label("suicidal",   X, y_suic, outdir),
-        "depression": train_one_label("depression", X, y_dep,  outdir),
-        "stress":     train_one_label("stress",     X, y_str,  outdir),
+def select_labels(
+    X: np.ndarray,
+    ys: Dict[str, np.ndarray],
+    outdir: Path,
+    candidates: Tuple[str, ...] = ALL_CANDIDATES,
+    n_cores: int = None,
+    compress: Compress = False,
+    report: Dict = None,
+    **halving_kwargs
+) -> Dict[str, Path]:
+    """라벨별 successive halving (코어가 여럿이면 라벨마다 프로세스 하나, 남는 코어는 트리 병렬로)"""
+    n_cores = n_cores or os.cpu_count() or 1
+    workers = max(1, min(len(ys), n_cores))
+    n_jobs = max(1, n_cores // workers)
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                label: pool.submit(
+                    select_label_halving, label, X, y, candidates,
+                    n_jobs=n_jobs, compress=compress, **halving_kwargs,
+                )
+                for label, y in ys.items()
+            }
+            results = {label: fut.result() for label, fut in futures.items()}
+    else:
+        results = {
+            label: select_label_halving(label, X, y, candidates, n_jobs=n_jobs, compress=compress, **halving_kwargs)
+            for label, y in ys.items()
+        }
+
+    if report is not None:
+        report["halving"] = {
+            label: {
+                "selected": r["kind"],
+                "pr_auc": round(float(r["pr_auc"]), 4),
+                "roc_auc": round(float(r["roc_auc"]), 4),
+                "rungs": r["rungs"],
+                "candidate_seconds": r["candidate_seconds"],
+            }
+            for label, r in results.items()
+        }
+    return {label: save_selected(label, r["model"], r["kind"], outdir) for label, r in results.items()}
+
+
+@contextmanager
+def stage(timing: Dict, name: str):
+    """with stage(timing, "fit"): ... -> timing[name] = 걸린 초"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing[name] = round(time.perf_counter() - t0, 3)
+
+
+# ---------- 4) Fused export ----------
+def export_fused_model(paths: Dict[str, Path], outdir: Path) -> Path:
+    """라벨별 선택 모델 3개 -> 전처리를 공유하는 단일 아티팩트(fused_risk_model.joblib)"""
+    models = {k: joblib.load(paths[k]) for k in LABELS}
+    fused = FusedRiskModel(models)
+
+    # 원본 모델과 결과가 같은지 입력 공간 전체에서 확인
+    X_chk = feature_grid()
+    ref = np.column_stack([models[k].predict_proba(X_chk)[:, 1] for k in LABELS])
+    diff = float(np.max(np.abs(fused.predict_proba(X_chk) - ref)))
+    print(f"[fused] folds={fused.n_folds} max|diff|={diff:.2e}")
+    if diff > 1e-6:
+        raise RuntimeError(f"fused model mismatch: {diff}")
+
+    fused.sources = model_sources({k: paths[k] for k in LABELS})
+    final_path = outdir / "fused_risk_model.joblib"
+    joblib.dump(fused, final_path)
+    return final_path
+
+
+# ---------- 5) Compiled (numpy) export ----------
+def compile_calibrated_logreg(model: CalibratedClassifierCV) -> Dict[str, np.ndarray]:
+    """
+    CalibratedClassifierCV(Pipeline(pre, LogisticRegression)) -> fold별 계수 배열.
+    (같은 구조를 흉내 내는 ml.incremental_training의 SGD 모델도 그대로 처리)
+    표준화를 계수에 접어 넣음: coef·((x - mu)/sd) + b0 = (coef/sd)·x + (b0 - coef·mu/sd)
+    """
+    n_features = model.n_features_in_
+    W, c, a, b = [], [], [], []
+    for cc in model.calibrated_classifiers_:
+        clf = cc.estimator.named_steps["clf"]
+        if not isinstance(clf, (LogisticRegression, SGDClassifier)):
+            raise ValueError(f"선형 모델(cal_logreg / 증분 SGD)만 numpy로 컴파일 가능: {type(clf).__name__}")
+        src, scale, offset = affine_from_preprocessor(cc.estimator.named_steps["pre"], n_features)
+        coef = clf.coef_.ravel()
+        w = np.zeros(n_features)
+        np.add.at(w, src, coef * scale)
+        W.append(w)
+        c.append(float(clf.intercept_[0]) + float(coef @ offset))
+        a.append(float(cc.calibrators[0].a_))
+        b.append(float(cc.calibrators[0].b_))
+    return {"W": np.array(W), "c": np.array(c), "a": np.array(a), "b": np.array(b)}
+
+
+def compile_calibrated_forest(
+    model: CalibratedClassifierCV,
+    max_trees: int = None
+) -> Dict[str, np.ndarray]:
+    """
+    CalibratedClassifierCV(Pipeline(pre, RandomForestClassifier)) -> 모든 fold/트리를 이어 붙인 노드 배열.
+    max_trees: fold별로 앞에서부터 이 개수의 트리만 남김 (부트스트랩 트리는 서로 독립이라 부분집합도
+    같은 분포의 더 작은 숲; 캘리브레이션은 전체 숲 기준이므로 근사가 됨)
+    """
+    n_features = model.n_features_in_
+    scale, offset, a, b = [], [], [], []
+    feature, threshold, left, right, value = [], [], [], [], []
+    roots, tree_fold = [], []
+    src0 = None
+    n_nodes = 0
+    depth = 0
+
+    for f, cc in enumerate(model.calibrated_classifiers_):
+        clf = cc.estimator.named_steps["clf"]
+        if not isinstance(clf, RandomForestClassifier):
+            raise ValueError(f"cal_rf만 forest로 컴파일 가능: {type(clf).__name__}")
+        src, sc, off = affine_from_preprocessor(cc.estimator.named_steps["pre"], n_features)
+        if src0 is not None and np.any(src != src0):
+            raise ValueError("fold마다 전처리 열 배치가 다름")
+        src0 = src
+        scale.append(sc)
+        offset.append(off)
+        a.append(float(cc.calibrators[0].a_))
+        b.append(float(cc.calibrators[0].b_))
+        pos = int(np.flatnonzero(clf.classes_ == 1)[0])
+
+        for est in clf.estimators_[:max_trees]:
+            t = est.tree_
+            ids = np.arange(t.node_count)
+            is_leaf = t.children_left < 0
+            # 리프는 자기 자신을 가리키게 해서 고정 횟수 반복만으로 순회가 끝나도록
+            left.append(np.where(is_leaf, ids, t.children_left) + n_nodes)
+            right.append(np.where(is_leaf, ids, t.children_right) + n_nodes)
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(np.where(is_leaf, 0.0, t.threshold))
+            v = t.value[:, 0, :]
+            value.append(v[:, pos] / v.sum(axis=1))
+            roots.append(n_nodes)
+            tree_fold.append(f)
+            n_nodes += t.node_count
+            depth = max(depth, t.max_depth)
+
+    return {
+        "src": src0,
+        "scale": np.stack(scale),
+        "offset": np.stack(offset),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value),
+        "roots": np.array(roots, dtype=np.int32),
+        "tree_fold": np.array(tree_fold, dtype=np.int32),
+        "depth": np.array(depth),
+        "a": np.array(a),
+        "b": np.array(b),
     }
 
+
+def export_compiled_models(
+    paths: Dict[str, Path],
+    outdir: Path,
+    max_trees: int = None
+) -> Path:
+    """라벨별 선택 모델 -> models/compiled/ (sklearn 없이 backend.compiled_engine으로 서빙)"""
+    from backend.compiled_engine import CompiledRiskModel, save_compiled
+
+    models = {k: joblib.load(paths[k]) for k in LABELS}
+    parts = {}
+    for k in LABELS:
+        clf = models[k].calibrated_classifiers_[0].estimator.named_steps["clf"]
+        if isinstance(clf, RandomForestClassifier):
+            parts[k] = ("forest", compile_calibrated_forest(models[k], max_trees))
+        elif isinstance(clf, (LogisticRegression, SGDClassifier)):
+            parts[k] = ("linear", compile_calibrated_logreg(models[k]))
+        else:
+            raise NotImplementedError(f"[{k}] {type(clf).__name__}는 numpy 컴파일 미지원")
+    compiled_dir = save_compiled(
+        outdir / "compiled",
+        parts,
+        feature_order=["phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes"],
+        sources=model_sources({k: paths[k] for k in LABELS}),
+    )
+
+    # 원본 모델과 결과가 같은지 입력 공간 전체에서 확인 (트리 가지치기 시에는 차이만 보고)
+    X_chk = feature_grid()
+    ref = np.column_stack([models[k].predict_proba(X_chk)[:, 1] for k in LABELS])
+    diff = np.max(np.abs(CompiledRiskModel.load(compiled_dir).predict_proba(X_chk) - ref), axis=0)
+    print("[compiled] " + "  ".join(
+        f"{k}={parts[k][0]} max|diff|={d:.2e}" for k, d in zip(LABELS, diff)
+    ))
+    if max_trees is None and diff.max() > 1e-6:
+        shutil.rmtree(compiled_dir)
+        raise RuntimeError(f"compiled model mismatch: {diff.max()}")
+    return compiled_dir
+
+
+# ---------- 6) ONNX export ----------
+def export_onnx_model(paths: Dict[str, Path], outdir: Path) -> Path:
+    """라벨별 선택 모델 3개 -> 그래프 하나(risk_model.onnx, 서버 RISK_SERVING_MODE=onnx 용)"""
+    import onnxruntime as ort
+    from ml.onnx_export import build_risk_onnx
+    from backend.onnx_engine import ONNX_FILE
+
+    models = {k: joblib.load(paths[k]) for k in LABELS}
+    # 변환에 쓴 joblib 모델의 sha256을 그래프 속성으로 남김 (ModelBundle.load가 비교해 다르면 거부)
+    sources = model_sources({k: paths[k] for k in LABELS})
+    onx = build_risk_onnx(models, metadata={"sources": json.dumps(sources, sort_keys=True)})
+    final_path = outdir / ONNX_FILE
+    final_path.write_bytes(onx.SerializeToString())
+
+    # 원본 모델과 결과가 같은지 입력 공간 전체에서 확인
+    X_chk = feature_grid().astype(np.float64)
+    ref = np.column_stack([models[k].predict_proba(X_chk)[:, 1] for k in LABELS])
+    session = ort.InferenceSession(str(final_path), providers=["CPUExecutionProvider"])
+    out = session.run(None, {session.get_inputs()[0].name: X_chk})[0]
+    diff = np.max(np.abs(out - ref), axis=0)
+    print(f"[onnx] {final_path.stat().st_size / 1024:.0f}KB  " + "  ".join(
+        f"{k} max|diff|={d:.2e}" for k, d in zip(LABELS, diff)
+    ))
+    if diff.max() > 1e-6:
+        final_path.unlink()
+        raise RuntimeError(f"onnx model mismatch: {diff.max()}")
+    return final_path
+
+
+# ---------- 7) Orchestrator ----------
+def _short_error(e: Exception) -> str:
+    """건너뜀 로그용: 예외 타입 + 메시지 첫 줄 (변환기 예외는 그래프 덤프가 붙어 수백 줄이 됨)"""
+    lines = str(e).strip().splitlines()
+    first = lines[0][:200] if lines else ""
+    return f"{type(e).__name__}: {first}" if first else type(e).__name__
+
+
+def export_serving_artifacts(
+    paths: Dict[str, Path],
+    outdir: Path,
+    build_table: bool = True,
+    fuse: bool = True,
+    compile_numpy: bool = True,
+    compile_max_trees: int = None,
+    timing: Dict = None,
+    export_onnx: bool = True,
+    skipped: Dict[str, str] = None
+) -> Dict[str, Path]:
+    """라벨별 모델(paths[label])로부터 서빙용 아티팩트를 만들어 paths에 추가
+    skipped: 만들지 못한 아티팩트 -> 이유 (training_report.json에 남김)"""
+    timing = timing if timing is not None else {}
+    skipped = skipped if skipped is not None else {}
+
     # feature order 저장(프론트/서버 alignment용)
     feat_order = ["phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes"]
     joblib.dump(feat_order, outdir / "feature_order.joblib")
 
-    print("\n[train] saved:")
+    # 세 모델을 하나로 합친 서빙용 아티팩트 (서버 RISK_SERVING_MODE=fused 용)
+    if fuse:
+        with stage(timing, "fuse"):
+            paths["fused"] = export_fused_model(paths, outdir)
+    elif (outdir / "fused_risk_model.joblib").exists():
+        # 이전 학습에서 합친 모델은 지금 모델과 다름 -> 서빙/버전 등록되지 않도록 삭제
+        (outdir / "fused_risk_model.joblib").unlink()
+        print(f"[fused] 이전 아티팩트 삭제: {outdir / 'fused_risk_model.joblib'}")
+
+    # sklearn 없이 서빙하는 numpy 계수 아티팩트 (서버 RISK_SERVING_MODE=numpy 용)
+    if compile_numpy:
+        with stage(timing, "compile"):
+            try:
+                paths["compiled"] = export_compiled_models(paths, outdir, compile_max_trees)
+            except NotImplementedError as e:
+                skipped["compiled"] = _short_error(e)
+                print(f"[compiled] 건너뜀: {skipped['compiled']}")
+    if "compiled" not in paths and (outdir / "compiled").exists():
+        # 컴파일할 수 없는 모델(HGB 등)로 다시 학습했으면 이전 계수는 지금 모델과 다름 -> 삭제
+        shutil.rmtree(outdir / "compiled")
+        print(f"[compiled] 이전 아티팩트 삭제: {outdir / 'compiled'}")
+
+    # skl2onnx로 변환한 단일 ONNX 그래프 (서버 RISK_SERVING_MODE=onnx 용, 변환기 미설치/미지원 모델은 건너뜀)
+    if export_onnx:
+        with stage(timing, "onnx"):
+            try:
+                paths["onnx"] = export_onnx_model(paths, outdir)
+            except (ImportError, NotImplementedError, RuntimeError) as e:
+                skipped["onnx"] = _short_error(e)
+                print(f"[onnx] 건너뜀: {skipped['onnx']}")
+    if "onnx" not in paths:
+        # 이전 학습에서 남은 그래프는 지금 모델과 다름 -> 서빙/버전 등록되지 않도록 삭제
+        from backend.onnx_engine import ONNX_FILE
+        stale = outdir / ONNX_FILE
+        if stale.exists():
+            stale.unlink()
+            print(f"[onnx] 이전 아티팩트 삭제: {stale}")
+
+    # 전체 이산 입력 공간 사전 평가 (서버 RISK_SERVING_MODE=table 용)
+    if build_table:
+        with stage(timing, "risk_table"):
+            models = {k: joblib.load(paths[k]) for k in LABELS}
+            paths["risk_table"] = save_risk_table(
+                build_risk_table(models), outdir / "risk_table.npy",
+                sources=model_sources({k: paths[k] for k in LABELS}),
+            )
+    return paths
+
+
+def train_and_save_all(
+    n_samples: int = 100_000,
+    outdir: Path = None,
+    build_table: bool = True,
+    fuse: bool = True,
+    compile_numpy: bool = True,
+    compile_max_trees: int = None,
+    publish: bool = False,
+    n_cores: int = None,
+    compress: Compress = False,
+    selection: str = "fixed",
+    candidates: Tuple[str, ...] = ALL_CANDIDATES,
+    export_onnx: bool = True
+) -> Dict[str, Path]:
+    """
+    n_cores: 학습에 쓸 코어 예산 (None = 전체). 2 이상이면 라벨 x 후보를 프로세스 풀에서 동시에 학습,
+    1이면 예전처럼 순서대로 학습. 단계별 소요 시간은 outdir/training_report.json에 남김.
+    compress: 같은 피처 조합을 (조합, 양성 수, 전체 수)로 합쳐 sample_weight로 학습 (fit 비용 ~ 조합 수).
+              True면 LogReg만 (EXACT_COMPRESS), RF까지 압축하려면 ("cal_logreg", "cal_rf")처럼 명시
+    publish: 학습 후 models/versions/<ts>/로 등록하고 CURRENT 교체 (기본은 models/ 바로 아래에만 저장)
+    selection: "fixed"(LogReg/RF 둘 다 캘리브레이션 학습 후 PR-AUC 규칙) |
+               "halving"(candidates를 부분표본에서 successive halving, 남은 하나만 캘리브레이션 학습)
+    """
+    if selection not in ("fixed", "halving"):
+        raise ValueError(f"unknown selection: {selection} (expected 'fixed' or 'halving')")
+    if outdir is None:
+        PROJECT_ROOT = Path(__file__).resolve().parents[1]
+        outdir = PROJECT_ROOT / "models"
+    outdir.mkdir(exist_ok=True, parents=True)
+    n_cores = n_cores or os.cpu_count() or 1
+    timing = {}
+    report = {
+        "n_samples": n_samples, "random_state": RANDOM_STATE, "compress": list(compress_kinds(compress)),
+        "selection": selection, "timing": timing,
+    }
+    t_start = time.perf_counter()
+
+    with stage(timing, "generate"):
+        print(f"[train] generate n={n_samples:,}")
+        X, y_suic, y_dep, y_str = generate_synthetic_data(n_samples)
+    ys = {"suicidal": y_suic, "depression": y_dep, "stress": y_str}
+
+    with stage(timing, "fit"):
+        if selection == "halving":
+            paths = select_labels(X, ys, outdir, tuple(candidates), n_cores, compress, report)
+        elif n_cores > 1:
+            paths = train_labels_parallel(X, ys, outdir, n_cores, report=report, compress=compress)
+        else:
+            paths = {k: train_one_label(k, X, y, outdir, n_jobs=1, compress=compress) for k, y in ys.items()}
+
+    export_serving_artifacts(
+        paths, outdir, build_table, fuse, compile_numpy, compile_max_trees, timing,
+        export_onnx=export_onnx, skipped=report.setdefault("skipped", {})
+    )
+
+    timing["total"] = round(time.perf_counter() - t_start, 3)
+    fit_sum = sum(f["fit_seconds"] for f in report.get("fits", []))
+    if fit_sum:
+        report["fit_speedup"] = round(fit_sum / timing["fit"], 2)
+    paths["report"] = outdir / "training_report.json"
+    paths["report"].write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print("\n[train] timing: " + "  ".join(f"{k}={v:.2f}s" for k, v in timing.items()))
+    print("[train] saved:")
     for k, v in paths.items():
         print(f" - {k}: {v}")
 
+    # 버전 폴더(models/versions/<ts>/)로 등록하고 CURRENT 교체 -> 서버가 무중단으로 교체 로드
+    if publish:
+        paths["version"] = publish_version(outdir)
+
     return paths
 
 
@@ -0,0 +1,47 @@
+# tests/conftest.py
+# `python -m pytest tests` (mental-risk-survey 폴더에서) — ml / backend 패키지를 임포트할 수 있도록
+# + 내보내기 테스트(compiled / onnx)가 같이 쓰는 작은 합성 데이터와 모델 저장 픽스처
+import sys
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+from ml.risk_table import LABELS  # noqa: E402  (sys.path 설정 뒤)
+from ml.synthetic_dataset import iter_synthetic_chunks  # noqa: E402
+from ml.train_risk_models import make_candidate  # noqa: E402
+
+N_EXPORT_ROWS = 5_000
+
+
+@pytest.fixture(scope="session")
+def export_data():
+    """내보내기 테스트용 작은 합성 데이터: (X (n, 5) float64, {라벨: y})"""
+    _, X, Y = next(iter_synthetic_chunks(N_EXPORT_ROWS, N_EXPORT_ROWS, seed=11))
+    return X.astype(np.float64), {k: Y[:, j] for j, k in enumerate(LABELS)}
+
+
+@pytest.fixture
+def save_models(export_data):
+    """save_models(outdir, kind, **params) -> {라벨: joblib 경로} (후보를 학습해 outdir에 저장)"""
+    X, ys = export_data
+
+    def save(outdir, kind, **params):
+        paths = {}
+        for k in LABELS:
+            model = make_candidate(kind, n_jobs=1)
+            if params:
+                model.set_params(**params)
+            paths[k] = outdir / f"{k}_model.joblib"
+            joblib.dump(model.fit(X, ys[k]), paths[k])
+        return paths
+
+    return save
@@ -0,0 +1,74 @@
+# tests/test_binary_codec.py
+# u8 / msgpack 요청: 디코딩 규칙(잘못된 본문은 400, 값 오류는 422)과 JSON 응답과의 일치
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.binary_codec import F32_TYPE, OUTPUT_FIELDS, U8_TYPE, decode_msgpack, decode_u8
+
+msgpack = pytest.importorskip("msgpack")
+
+ROWS = [[12, 9, 25, 1, 0], [3, 2, 14, 0, 1], [27, 21, 50, 3, 1]]
+
+
+def _status(fn, *args) -> int:
+    with pytest.raises(HTTPException) as err:
+        fn(*args)
+    return err.value.status_code
+
+
+def test_decode_u8():
+    X = decode_u8(bytes(np.array(ROWS, dtype=np.uint8)), single=False)
+    assert X.shape == (3, 5) and X.tolist() == ROWS
+    assert decode_u8(bytes(ROWS[0]), single=True).tolist() == [ROWS[0]]
+    assert _status(decode_u8, bytes(7), False) == 400            # 5의 배수가 아님
+    assert _status(decode_u8, bytes(10), True) == 400            # 단건은 정확히 5바이트
+    assert _status(decode_u8, bytes([1, 1, 10, 0, 2]), True) == 422  # asq는 0/1
+
+
+def test_decode_msgpack():
+    fields = dict(zip(("phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes"), ROWS[0]))
+    assert decode_msgpack(msgpack.packb(ROWS), single=False).tolist() == ROWS
+    assert decode_msgpack(msgpack.packb(fields), single=True).tolist() == [ROWS[0]]
+    assert _status(decode_msgpack, b"\xc1", False) == 400                    # 잘못된 msgpack
+    assert _status(decode_msgpack, msgpack.packb(ROWS) + b"\x00", False) == 400  # 뒤에 남는 바이트
+    assert _status(decode_msgpack, msgpack.packb({"phq_total": 1}), True) == 422
+    assert _status(decode_msgpack, msgpack.packb([[1.5, 0, 10, 0, 0]]), False) == 422
+    assert _status(decode_msgpack, msgpack.packb({"rows": ROWS}), False) == 422
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as c:
+        yield c
+
+
+def _json_batch(client) -> np.ndarray:
+    body = [dict(zip(("phq_total", "gad_total", "k10_total", "phq_item9", "asq_any_yes"), r)) for r in ROWS]
+    for b in body:
+        b["asq_any_yes"] = bool(b["asq_any_yes"])
+    out = client.post("/predict_risk/batch", json=body).json()
+    return np.column_stack([out[k] for k in OUTPUT_FIELDS])
+
+
+def test_binary_requests_match_json(client):
+    ref = _json_batch(client)
+
+    resp = client.post("/predict_risk/batch", content=bytes(np.array(ROWS, dtype=np.uint8)),
+                       headers={"Content-Type": U8_TYPE})
+    assert resp.status_code == 200 and resp.headers["content-type"] == F32_TYPE
+    np.testing.assert_allclose(np.frombuffer(resp.content, dtype="<f4").reshape(-1, 3), ref, rtol=1e-6)
+
+    resp = client.post("/predict_risk", content=msgpack.packb(ROWS[0]),
+                       headers={"Content-Type": "application/msgpack"})
+    single = msgpack.unpackb(resp.content)
+    np.testing.assert_allclose([single[k] for k in OUTPUT_FIELDS], ref[0], rtol=1e-12)
+
+
+def test_malformed_binary_body_is_400(client):
+    resp = client.post("/predict_risk/batch", content=b"\x01\x02\x03", headers={"Content-Type": U8_TYPE})
+    assert resp.status_code == 400
+    resp = client.post("/predict_risk", content=b"\xc1", headers={"Content-Type": "application/msgpack"})
+    assert resp.status_code == 400
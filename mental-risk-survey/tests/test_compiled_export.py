@@ -0,0 +1,36 @@
+# tests/test_compiled_export.py
+# numpy 컴파일 아티팩트(models/compiled/)가 predict_proba와 같은지, 이전 학습의 계수가 남지 않는지
+import joblib
+import numpy as np
+import pytest
+
+from backend.compiled_engine import CompiledRiskModel
+from backend.model_bundle import ModelBundle
+from ml.risk_table import LABELS, feature_grid
+from ml.train_risk_models import export_compiled_models, export_serving_artifacts
+
+
+def test_compiled_matches_predict_proba(tmp_path, save_models):
+    paths = save_models(tmp_path, "cal_logreg")
+    compiled_dir = export_compiled_models(paths, tmp_path)
+
+    X = feature_grid().astype(np.float64)
+    ref = np.column_stack([joblib.load(paths[k]).predict_proba(X)[:, 1] for k in LABELS])
+    np.testing.assert_allclose(CompiledRiskModel.load(compiled_dir).predict_proba(X), ref, rtol=0, atol=1e-6)
+
+
+def test_stale_compiled_is_removed_and_refused(tmp_path, save_models):
+    paths = save_models(tmp_path, "cal_logreg")
+    export_compiled_models(paths, tmp_path)
+
+    # 다시 학습한 모델로 로드하면 manifest의 sha256이 달라 거부
+    save_models(tmp_path, "cal_logreg", estimator__clf__C=0.01)
+    with pytest.raises(ValueError, match="not built from the current models"):
+        ModelBundle(tmp_path, mode="numpy").load()
+
+    # 컴파일할 수 없는 모델(HGB)로 학습하면 이전 계수를 지움
+    paths = save_models(tmp_path, "cal_hgb", estimator__clf__max_iter=10)
+    out = export_serving_artifacts(dict(paths), tmp_path, build_table=False, fuse=False,
+                                   compile_numpy=True, export_onnx=False)
+    assert "compiled" not in out
+    assert not (tmp_path / "compiled").exists()
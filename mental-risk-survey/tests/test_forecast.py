@@ -0,0 +1,90 @@
+# tests/test_forecast.py
+# map/forecast.py: 행렬 한 번에 적합한 결과가 시계열마다 따로 적합한 결과(기존 루프)와 같은지
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import theilslopes
+
+MAP_DIR = Path(__file__).resolve().parents[1] / "map"  # map/ 모듈은 `from forecast import ...`로 서로 임포트
+if str(MAP_DIR) not in sys.path:
+    sys.path.insert(0, str(MAP_DIR))
+
+from forecast import forecast_frame, forecast_matrix, series_matrix  # noqa: E402  (sys.path 설정 뒤)
+
+YEARS = np.arange(2012, 2022)
+HORIZONS = (1, 2, 3)
+
+
+@pytest.fixture(scope="module")
+def Y() -> np.ndarray:
+    rng = np.random.default_rng(3)
+    Y = 20 + rng.normal(0, 1, (40, 1)) * np.arange(len(YEARS)) + rng.normal(0, 2, (40, len(YEARS)))
+    Y[rng.random(Y.shape) < 0.15] = np.nan   # 빠진 해
+    Y[0] = np.nan                             # 관측 없음
+    Y[1, 1:] = np.nan                         # 관측 1개 (min_points 미만)
+    return Y
+
+
+def _per_series(Y: np.ndarray, fit) -> np.ndarray:
+    """기존 방식: 시계열마다 관측된 해만 골라 따로 적합"""
+    x = YEARS - YEARS[-1]
+    out = np.full((len(Y), len(HORIZONS)), np.nan)
+    for r, y in enumerate(Y):
+        ok = ~np.isnan(y)
+        if ok.sum() >= 2:
+            slope, intercept = fit(x[ok], y[ok])
+            out[r] = np.maximum(intercept + slope * np.asarray(HORIZONS), 0.0)
+    return out
+
+
+@pytest.mark.parametrize("method, fit", [
+    ("linear", lambda x, y: np.polyfit(x, y, 1)),
+    ("theil_sen", lambda x, y: theilslopes(y, x)[:2]),
+])
+def test_matrix_matches_per_series_fit(Y, method, fit):
+    pred = forecast_matrix(Y, YEARS, HORIZONS, method)
+    np.testing.assert_allclose(pred, _per_series(Y, fit), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("method, params", [
+    ("linear", {}), ("theil_sen", {}), ("holt", {"alpha": 0.4, "beta": 0.2}),
+    ("rf", {"n_estimators": 5, "random_state": 0}),
+])
+def test_rows_are_independent(Y, method, params):
+    # 행렬 전체 적합 == 한 행씩 적합 (다른 시계열의 결측/값이 섞이지 않음)
+    rows = Y[:12]
+    pred = forecast_matrix(rows, YEARS, HORIZONS, method, **params)
+    one_by_one = np.vstack([forecast_matrix(y[None, :], YEARS, HORIZONS, method, **params) for y in rows])
+    np.testing.assert_allclose(pred, one_by_one, rtol=1e-12, atol=1e-12, equal_nan=True)
+    assert np.isnan(pred[:2]).all()
+    assert (pred[2:] >= 0).all()
+
+
+@pytest.mark.parametrize("method", ["linear", "theil_sen", "holt"])
+def test_parallel_matches_serial(Y, method):
+    serial = forecast_matrix(Y, YEARS, HORIZONS, method, n_jobs=1)
+    parallel = forecast_matrix(Y, YEARS, HORIZONS, method, n_jobs=3)
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_forecast_frame_layout():
+    df = pd.DataFrame({
+        "year": [2019, 2020, 2021] * 2,
+        "region": ["A"] * 3 + ["B"] * 3,
+        "rate": [1.0, 2.0, 3.0, 5.0, np.nan, np.nan],
+    })
+    keys, years, Y = series_matrix(df, {"비율": "rate"})
+    assert keys == [("비율", "A"), ("비율", "B")] and years.tolist() == [2019, 2020, 2021]
+
+    out = forecast_frame(df, {"비율": "rate"}, horizons=(1, 2), method="linear")
+    assert set(out) == {"2022", "2023"}
+    assert out["2022"]["비율"]["A"] == pytest.approx(4.0) and out["2023"]["비율"]["A"] == pytest.approx(5.0)
+    assert out["2022"]["비율"]["B"] is None
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        forecast_matrix(np.ones((1, 3)), YEARS[:3], method="arima")
@@ -0,0 +1,22 @@
+# tests/test_fused_export.py
+# 합친 모델(fused_risk_model.joblib)이 이전 학습의 것이면 로드를 거부하고, fuse를 건너뛴 학습은 지우는지
+import pytest
+
+from backend.model_bundle import ModelBundle
+from ml.train_risk_models import export_fused_model, export_serving_artifacts
+
+
+def test_stale_fused_is_removed_and_refused(tmp_path, save_models):
+    paths = save_models(tmp_path, "cal_logreg")
+    export_fused_model(paths, tmp_path)
+    assert ModelBundle(tmp_path, mode="fused").load().joint_model.sources
+
+    # 다시 학습한 모델로 로드하면 기록된 sha256이 달라 거부
+    save_models(tmp_path, "cal_logreg", estimator__clf__C=0.01)
+    with pytest.raises(ValueError, match="not built from the current models"):
+        ModelBundle(tmp_path, mode="fused").load()
+
+    # fuse를 건너뛴 학습은 이전 아티팩트를 지움
+    export_serving_artifacts(dict(paths), tmp_path, build_table=False, fuse=False,
+                             compile_numpy=False, export_onnx=False)
+    assert not (tmp_path / "fused_risk_model.joblib").exists()
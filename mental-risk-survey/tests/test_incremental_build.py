@@ -0,0 +1,83 @@
+# tests/test_incremental_build.py
+# map/incremental.py: 바뀐 연도/시계열만 다시 계산하고, 출력과 HTML이 그대로면 다시 쓰지 않는지
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+MAP_DIR = Path(__file__).resolve().parents[1] / "map"  # map/ 모듈은 `from forecast import ...`로 서로 임포트
+if str(MAP_DIR) not in sys.path:
+    sys.path.insert(0, str(MAP_DIR))
+
+from incremental import IncrementalBuild  # noqa: E402  (sys.path 설정 뒤)
+
+METRICS = {"자살률": "suicide_rate", "우울감": "depression_rate"}
+REGIONS = ["서울", "부산", "대구"]
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    rows = [
+        {"year": year, "region": region, "suicide_rate": 20.0 + i + 0.5 * t, "depression_rate": 5.0 + 0.1 * t * i}
+        for t, year in enumerate(range(2017, 2022))
+        for i, region in enumerate(REGIONS)
+    ]
+    return pd.DataFrame(rows)
+
+
+def _build(cache_dir: Path, df: pd.DataFrame, html: Path, write: bool = True):
+    build = IncrementalBuild(cache_dir)
+    data = build.observed(df, METRICS)
+    data.update(build.forecast(df, METRICS, horizons=(1, 2), method="linear"))
+    changed = build.emit(data, "geo-v1", output_path=html)
+    if write:
+        if changed:
+            html.write_text(str(sorted(data)), encoding="utf-8")
+        build.save(html)
+    return build, data, changed
+
+
+def test_unchanged_input_skips_everything(tmp_path, df):
+    cache, html = tmp_path / "cache", tmp_path / "map.html"
+    first, data, changed = _build(cache, df, html)
+    assert changed
+    assert first.stats["years_rebuilt"] == ["2017", "2018", "2019", "2020", "2021"]
+    assert first.stats["series_recomputed"] == first.stats["series"] == len(METRICS) * len(REGIONS)
+
+    again, same, changed = _build(cache, df, html)
+    assert not changed and same == data
+    assert again.stats["rows_changed"] == 0
+    assert again.stats["years_rebuilt"] == [] and again.stats["series_recomputed"] == 0
+
+
+def test_one_changed_value_rebuilds_its_year_and_series(tmp_path, df):
+    cache, html = tmp_path / "cache", tmp_path / "map.html"
+    _build(cache, df, html)
+
+    df.loc[(df["year"] == 2019) & (df["region"] == "부산"), "suicide_rate"] = 40.0
+    build, data, changed = _build(cache, df, html)
+    assert changed
+    assert build.stats["rows_changed"] == 1
+    assert build.stats["years_rebuilt"] == ["2019"] and build.stats["series_recomputed"] == 1
+    assert data["2019"]["자살률"]["부산"] == 40.0
+
+    # 캐시를 거친 결과 == 처음부터 다시 만든 결과
+    _, fresh, _ = _build(tmp_path / "fresh", df, tmp_path / "fresh.html")
+    assert data == fresh
+
+
+def test_html_edited_deleted_or_never_saved_is_rebuilt(tmp_path, df):
+    cache, html = tmp_path / "cache", tmp_path / "map.html"
+    _build(cache, df, html)
+
+    html.write_text("누가 고친 파일", encoding="utf-8")
+    assert _build(cache, df, html, write=False)[2]
+    html.unlink()
+    assert _build(cache, df, html)[2]
+
+    # 데이터가 바뀐 실행이 HTML을 쓰다가 멈추면(save 전) 다음 실행이 다시 생성
+    df.loc[0, "depression_rate"] = 9.0
+    assert _build(cache, df, html, write=False)[2]
+    assert _build(cache, df, html)[2]
+    assert not _build(cache, df, html)[2]
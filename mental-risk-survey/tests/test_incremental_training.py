@@ -0,0 +1,50 @@
+# tests/test_incremental_training.py
+# 증분 SGD 모델이 전체 재학습(cal_logreg)을 대신할 수 있는지: 같은 학습/검증 분할에서 검증 ROC-AUC 비교
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from ml.incremental_training import IncrementalRiskModel, _run_passes
+from ml.risk_table import LABELS
+from ml.synthetic_dataset import iter_synthetic_chunks
+from ml.train_risk_models import make_candidate
+
+N_ROWS = 100_000
+CHUNK = 20_000
+AUC_TOLERANCE = 0.01
+
+
+@pytest.fixture(scope="module")
+def split():
+    X, Y = [], []
+    for _, x, y in iter_synthetic_chunks(N_ROWS, CHUNK, seed=7):
+        X.append(x)
+        Y.append(y)
+    X, Y = np.concatenate(X).astype(np.int64), np.concatenate(Y)
+    idx = np.random.default_rng(0).permutation(N_ROWS)
+    train, test = idx[: int(0.8 * N_ROWS)], idx[int(0.8 * N_ROWS):]
+    ys = {k: Y[:, j] for j, k in enumerate(LABELS)}
+    return X, ys, train, test
+
+
+@pytest.fixture(scope="module")
+def incremental_models(split):
+    X, ys, train, _ = split
+
+    def chunks():
+        for s in range(0, len(train), CHUNK):
+            i = train[s:s + CHUNK]
+            yield X[i], {k: ys[k][i] for k in LABELS}
+
+    models = {k: IncrementalRiskModel() for k in LABELS}
+    _run_passes(models, chunks)
+    return models
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_holdout_auc_matches_cal_logreg(split, incremental_models, label):
+    X, ys, train, test = split
+    baseline = make_candidate("cal_logreg", n_jobs=1).fit(X[train], ys[label][train])
+    auc_batch = roc_auc_score(ys[label][test], baseline.predict_proba(X[test])[:, 1])
+    auc_incremental = roc_auc_score(ys[label][test], incremental_models[label].predict_proba(X[test])[:, 1])
+    assert auc_incremental >= auc_batch - AUC_TOLERANCE, (label, auc_incremental, auc_batch)
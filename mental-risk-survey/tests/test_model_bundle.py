@@ -0,0 +1,40 @@
+# tests/test_model_bundle.py
+# 워밍업(합성 입력)은 서빙 지연 지표에 남지 않는지, 로드가 게시된 버전 폴더를 바꾸지 않는지
+from backend.metrics import MODEL_PREDICT_SECONDS
+from backend.model_bundle import ModelBundle
+from ml.model_registry import derived_dir, publish_version, verify_version, version_dir
+from ml.risk_table import feature_grid
+
+
+def _observations() -> int:
+    with MODEL_PREDICT_SECONDS._lock:
+        return sum(sum(counts) for counts, _ in MODEL_PREDICT_SECONDS._series.values())
+
+
+def test_warmup_does_not_record_predict_latency(tmp_path, save_models):
+    save_models(tmp_path, "cal_logreg")
+    bundle = ModelBundle(tmp_path, mode="model").load()
+
+    before = _observations()
+    bundle.warmup()
+    assert _observations() == before
+
+    bundle.score(feature_grid()[:8])
+    assert _observations() > before
+
+
+def test_load_does_not_modify_published_version(tmp_path, save_models):
+    src = tmp_path / "src"
+    src.mkdir()
+    save_models(src, "cal_logreg")
+    version = publish_version(src, tmp_path / "models", make_current=False)
+    vdir = version_dir(tmp_path / "models", version)
+    before = sorted(p.relative_to(vdir) for p in vdir.rglob("*"))
+
+    cache = derived_dir(tmp_path / "models", version)
+    for mode in ("numpy", "table"):
+        ModelBundle(vdir, mode, version, cache_dir=cache).load()
+    # 파생 아티팩트는 derived/<버전>/에만 생기고 버전 폴더는 manifest와 그대로 일치
+    assert sorted(p.relative_to(vdir) for p in vdir.rglob("*")) == before
+    assert (cache / "compiled" / "manifest.json").exists() and (cache / "risk_table.npy").exists()
+    verify_version(tmp_path / "models", version)
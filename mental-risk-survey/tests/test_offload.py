@@ -0,0 +1,53 @@
+# tests/test_offload.py
+# 전용 계산 풀: 한도(workers + max_queue)를 넘는 작업은 바로 거절, 엔드포인트는 503 + Retry-After
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.offload import ScoringExecutor, ScoringPoolSaturated
+
+PAYLOAD = {"phq_total": 12, "gad_total": 9, "k10_total": 25, "phq_item9": 1, "asq_any_yes": False}
+
+
+def test_executor_rejects_beyond_capacity():
+    ex = ScoringExecutor(workers=1, max_queue=1, retry_after=3)
+    ex.start()
+    release = threading.Event()
+
+    async def scenario():
+        held = [asyncio.ensure_future(ex.run(release.wait)) for _ in range(ex.capacity)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ScoringPoolSaturated) as err:
+            await ex.run(lambda: None)
+        assert err.value.retry_after == 3
+        release.set()
+        await asyncio.gather(*held)
+        return await ex.run(lambda: 42)  # 슬롯이 반납되면 다시 받아들임
+
+    try:
+        assert asyncio.run(scenario()) == 42
+    finally:
+        ex.stop()
+    stats = ex.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == ex.capacity + 1 and stats["in_flight"] == 0
+
+
+def test_async_endpoint_returns_503_with_retry_after():
+    with TestClient(main.app) as client:
+        assert client.post("/predict_risk/async", json=PAYLOAD).status_code == 200
+
+        saturated = ScoringExecutor(workers=1, max_queue=0, retry_after=7)
+        saturated.start()
+        saturated.in_flight = saturated.capacity  # 실행 중 작업이 한도만큼 있는 상태
+        running, main.executor = main.executor, saturated
+        try:
+            resp = client.post("/predict_risk/async", json=PAYLOAD)
+        finally:
+            main.executor = running
+            saturated.stop()
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "7"
+        assert client.post("/predict_risk/async", json=PAYLOAD).status_code == 200
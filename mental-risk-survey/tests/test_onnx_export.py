@@ -0,0 +1,42 @@
+# tests/test_onnx_export.py
+# 작은 모델을 ONNX로 내보내 onnxruntime 결과가 predict_proba와 같은지, 이전 학습의 그래프가 남지 않는지
+import joblib
+import numpy as np
+import pytest
+
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxruntime")
+
+from backend.model_bundle import ModelBundle
+from backend.onnx_engine import ONNX_FILE, OnnxRiskModel
+from ml.risk_table import LABELS, feature_grid
+from ml.train_risk_models import export_onnx_model, export_serving_artifacts
+
+
+@pytest.mark.parametrize("kind, params", [
+    ("cal_logreg", {}),
+    ("cal_rf", {"estimator__clf__n_estimators": 5, "estimator__clf__max_depth": 6}),
+])
+def test_onnx_matches_predict_proba(tmp_path, save_models, export_data, kind, params):
+    paths = save_models(tmp_path, kind, **params)
+    onnx_path = export_onnx_model(paths, tmp_path)
+
+    X = np.vstack([feature_grid(), export_data[0][:500]]).astype(np.float64)
+    ref = np.column_stack([joblib.load(paths[k]).predict_proba(X)[:, 1] for k in LABELS])
+    out = OnnxRiskModel.load(onnx_path).predict_proba(X)
+    np.testing.assert_allclose(out, ref, rtol=0, atol=1e-6)
+
+
+def test_stale_onnx_is_removed_and_refused(tmp_path, save_models):
+    paths = save_models(tmp_path, "cal_logreg")
+    export_onnx_model(paths, tmp_path)
+
+    # 다시 학습한 모델로 로드하면 기록된 sha256이 달라 거부
+    save_models(tmp_path, "cal_logreg", estimator__clf__C=0.01)
+    with pytest.raises(ValueError, match="not built from the current models"):
+        ModelBundle(tmp_path, mode="onnx").load()
+
+    # 내보내기를 건너뛴 학습은 이전 그래프를 지움
+    export_serving_artifacts(dict(paths), tmp_path, build_table=False, fuse=False,
+                             compile_numpy=False, export_onnx=False)
+    assert not (tmp_path / ONNX_FILE).exists()
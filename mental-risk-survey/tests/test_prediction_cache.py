@@ -0,0 +1,63 @@
+# tests/test_prediction_cache.py
+# 결과 캐시: LRU 퇴출 순서, 모델 지문별 분리, 공유 블록의 세대 무효화 / 찢어진 칸 / 부모만 지우기
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from backend.prediction_cache import LRUCache, PredictionCache, SharedGridCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # a가 최근 -> b가 먼저 퇴출
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_lru_keys_include_fingerprint():
+    cache = PredictionCache(maxsize=10)
+    row = np.array([30, 1, 10, 0, 0])  # PHQ 범위 밖 -> 공유 블록이 아니라 LRU
+    cache.put("v1", row, (0.1, 0.2, 0.3))
+    assert cache.get("v1", row) == (0.1, 0.2, 0.3)
+    assert cache.get("v2", row) is None
+    cache.invalidate()
+    assert cache.get("v1", row) is None
+
+
+@pytest.fixture
+def shared():
+    grid = SharedGridCache(f"risk-test-{uuid.uuid4().hex[:8]}", create=True)
+    yield grid
+    grid.close()
+    assert not os.path.exists(f"/dev/shm/{grid.name}")  # 만든 프로세스가 닫으면 지워짐
+
+
+def test_shared_generation_and_torn_record(shared):
+    cache = PredictionCache(maxsize=10, shared=shared)
+    row = np.array([5, 4, 20, 1, 0])
+    cache.put("v1", row, (0.1, 0.2, 0.3))
+    assert cache.get("v1", row) == (0.1, 0.2, 0.3)
+    assert cache.get("v2", row) is None        # 다른 모델 세대는 실패
+
+    # 값만 바뀌고 체크섬은 예전 그대로인 칸 (쓰는 도중 읽힌 경우) -> 적중이 아니라 실패
+    idx = int(np.flatnonzero(shared.records["gen"] == SharedGridCache.generation("v1"))[0])
+    shared.records["values"][idx, 0] = 0.9
+    assert cache.get("v1", row) is None
+    assert shared.hits == 1 and shared.misses == 2
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm") or not hasattr(os, "fork"), reason="Linux 전용 (fork, /dev/shm)")
+def test_shared_block_unlinked_only_by_creating_process(shared):
+    pid = os.fork()
+    if pid == 0:
+        # fork로 물려받은 owner 객체를 자식이 닫아도 블록은 남아야 함
+        shared.close()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.path.exists(f"/dev/shm/{shared.name}")
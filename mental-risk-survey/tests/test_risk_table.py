@@ -0,0 +1,31 @@
+# tests/test_risk_table.py
+# 조회 테이블은 만든 모델의 sha256이 같을 때만 재사용 (수정 시각이 아니라 내용으로 판단)
+import os
+
+import joblib
+import numpy as np
+
+from backend.model_bundle import ModelBundle
+from ml.risk_table import LABELS, feature_grid
+
+
+def test_risk_table_follows_model_content(tmp_path, save_models, capsys):
+    save_models(tmp_path, "cal_logreg")
+    ModelBundle(tmp_path, mode="table").load()
+    assert "building lookup table" in capsys.readouterr().out
+
+    # 모델 파일이 테이블보다 새것처럼 보여도(checkout / 복사) 내용이 같으면 재사용
+    for k in LABELS:
+        os.utime(tmp_path / f"{k}_model.joblib")
+    ModelBundle(tmp_path, mode="table").load()
+    assert "[table] load" in capsys.readouterr().out
+
+    # 테이블이 더 새것이어도 모델 내용이 바뀌면 다시 만듦
+    paths = save_models(tmp_path, "cal_logreg", estimator__clf__C=0.01)
+    os.utime(tmp_path / "risk_table.npy")
+    bundle = ModelBundle(tmp_path, mode="table").load()
+    assert "building lookup table" in capsys.readouterr().out
+
+    X = feature_grid()[::997]
+    ref = np.column_stack([joblib.load(paths[k]).predict_proba(X)[:, 1] for k in LABELS])
+    np.testing.assert_allclose(bundle.score(X), ref, rtol=0, atol=1e-6)